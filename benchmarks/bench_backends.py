@@ -0,0 +1,81 @@
+"""
+Бенчмарк тика объектного и массивного бэкендов на одних и тех же мирах
+
+Миры строятся как в benchmarks/suite.py (тот же сид, состав видов и группы).
+Для каждого размера и плотности из --worlds печатаются секунды на тик
+бэкенда 'objects', бэкенда 'arrays' с поэлементными ходами (plant_mode и
+animal_mode 'entity') и с пакетными шагами world.plant_kernel и
+world.animal_kernel (по умолчанию), а также ускорение пакетного тика
+относительно объектного. С --output замеры сохраняются в JSON.
+
+Примеры:
+    python benchmarks/bench_backends.py
+    python benchmarks/bench_backends.py --worlds 300:0.3,1000:0.1 --ticks 5 --output backends.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from suite import build_world
+
+# (сторона сетки, доля занятых клеток)
+WORLDS = [(300, 0.1), (300, 0.3), (1000, 0.01), (1000, 0.1)]
+
+# (имя столбца, бэкенд, режим шагов ArrayGrid)
+VARIANTS = [('objects', 'objects', None), ('arrays/entity', 'arrays', 'entity'),
+            ('arrays/batched', 'arrays', 'batched')]
+
+
+def seconds_per_tick(size, density, backend, mode, ticks):
+    world, timer = build_world(size, size, density, 'default', backend)
+    if mode is not None:
+        world.plant_mode = world.animal_mode = mode
+    timer.current_phase = 'day'
+    # Первый тик заполняет таблицы видов и групп и в замер не входит
+    world.tick()
+    timer.advance_time()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        world.tick()
+        timer.advance_time()
+    return (time.perf_counter() - start) / ticks
+
+
+def parse_worlds(text):
+    return [(int(size), float(density)) for size, density in (item.split(':') for item in text.split(','))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Тик объектного и массивного бэкендов")
+    parser.add_argument('--worlds', type=parse_worlds, default=WORLDS,
+                        help="Миры через запятую в виде сторона:плотность (например 300:0.3,1000:0.01)")
+    parser.add_argument('--ticks', type=int, default=5)
+    parser.add_argument('--output', help="JSON для замеров")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    names = [name for name, _, _ in VARIANTS]
+    print(f"{'world':>16} " + ' '.join(f'{name:>15}' for name in names) + f" {'speedup':>8}")
+    rows = []
+    for size, density in args.worlds:
+        row = {'size': size, 'density': density}
+        for name, backend, mode in VARIANTS:
+            row[name] = seconds_per_tick(size, density, backend, mode, args.ticks)
+        row['speedup'] = row['objects'] / row['arrays/batched']
+        label = f'{size}x{size} {density:.0%}'
+        print(f"{label:>16} " + ' '.join(f"{row[name]:>13.4f} s" for name in names)
+              + f" {row['speedup']:>7.1f}x")
+        rows.append(row)
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump({'ticks': args.ticks, 'rows': rows}, stream, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Бенчмарк рождений: сравнивает старое копирование через copy.deepcopy
+с протоколом clone при разных размерах сетки
+
+Запуск: python benchmarks/bench_clone.py
+"""
+import copy
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from world.grid import Grid
+from world.time_manager import TimeManager
+from entities.plants.lumiere import Lumiere
+from entities.animals.pauvre import Pauvre
+from entities.group import Group
+
+GRID_SIZES = [(40, 12), (200, 200), (1000, 1000)]
+DENSITY = 0.05
+TIME_BUDGET = 1.0  # секунд на один замер
+
+
+def build_world(width, height):
+    """Создает мир с заданной плотностью растений и животных"""
+    world = Grid(width, height, [[None for _ in range(width)] for _ in range(height)])
+    timer = TimeManager(6)
+    group = Group(1)
+    for _ in range(int(width * height * DENSITY)):
+        x, y = random.randint(0, width - 1), random.randint(0, height - 1)
+        if world.cells[y][x] is None:
+            if random.random() < 0.5:
+                entity = Lumiere(x, y, None, world, timer)
+            else:
+                entity = Pauvre(x, y, world, timer, group)
+                group.add_member(entity)
+            world.place_entity(entity, x, y)
+    return world
+
+
+def births_per_second(world, make_child):
+    """Считает, сколько потомков успевает создать make_child за TIME_BUDGET"""
+    parents = [cell for row in world.cells for cell in row if cell is not None]
+    births = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < TIME_BUDGET:
+        make_child(parents[births % len(parents)])
+        births += 1
+    return births / (time.perf_counter() - start)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    random.seed(0)
+    print(f"{'grid':>12} {'entities':>9} {'deepcopy/s':>12} {'clone/s':>12} {'speedup':>9}")
+    for width, height in GRID_SIZES:
+        world = build_world(width, height)
+        entities = sum(1 for row in world.cells for cell in row if cell is not None)
+        old = births_per_second(world, copy.deepcopy)
+        new = births_per_second(world, lambda entity: entity.clone())
+        print(f"{width:>5}x{height:<6} {entities:>9} {old:>12.1f} {new:>12.1f} {new / old:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Бенчмарк масштабирования ансамбля реплик (ensemble.py) по числу процессов
+
+Прогоняет одно и то же число реплик сценария по умолчанию на пуле из
+1, 2, 4, ... процессов (--workers) и печатает реплики в секунду, ускорение
+относительно одного процесса и эффективность (долю линейного ускорения).
+Число процессов больше числа ядер помечается как oversubscribed: такой
+замер показывает только накладные расходы пула. С --stream строки сводки
+идут из процессов по тикам через очередь, как с on_tick в run_ensemble,
+и в замер входит стоимость этой передачи. С --output замеры сохраняются
+в JSON, чтобы сравнивать машины с разным числом ядер.
+
+Примеры:
+    python benchmarks/bench_ensemble.py --runs 32 --ticks 100
+    python benchmarks/bench_ensemble.py --workers 1,2,4,8,16 --stream --output ensemble.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import default_scenario, run_ensemble
+from bench_tiled import default_workers
+
+
+def measure(scenario, runs, workers, stream):
+    """Реплик в секунду на пуле из workers процессов"""
+    on_tick = (lambda *row: None) if stream else None
+    start = time.perf_counter()
+    run_ensemble(scenario, range(runs), workers=workers, on_tick=on_tick)
+    return runs / (time.perf_counter() - start)
+
+
+def scaling_report(scenario, runs, worker_counts, stream):
+    """Печатает и возвращает скорость ансамбля по числу процессов"""
+    cores = os.cpu_count() or 1
+    rows = []
+    single = None
+    print(f"{'workers':>8} {'runs/s':>9} {'speedup':>9} {'efficiency':>11}")
+    for workers in worker_counts:
+        rate = measure(scenario, runs, workers, stream)
+        single = single or rate
+        speedup = rate / single
+        note = '  oversubscribed' if workers > cores else ''
+        print(f"{workers:>8} {rate:>9.2f} {speedup:>8.2f}x {speedup / workers:>10.0%}{note}")
+        rows.append({'workers': workers, 'runs_per_sec': rate, 'efficiency': speedup / workers})
+    return {'cores': cores, 'runs': runs, 'ticks': scenario['ticks'], 'stream': stream, 'rows': rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Масштабирование ансамбля реплик по числу процессов")
+    parser.add_argument('--runs', type=int, default=16, help="Число реплик в каждом замере")
+    parser.add_argument('--ticks', type=int, default=50)
+    parser.add_argument('--workers', type=lambda text: [int(n) for n in text.split(',')],
+                        default=default_workers(),
+                        help="Числа процессов через запятую (по умолчанию 1, 2, 4, ... до числа ядер)")
+    parser.add_argument('--stream', action='store_true', help="Передавать строки сводки по тикам")
+    parser.add_argument('--output', help="JSON для замеров")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    scenario = default_scenario()
+    scenario['ticks'] = args.ticks
+    report = scaling_report(scenario, args.runs, args.workers, args.stream)
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(report, stream, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
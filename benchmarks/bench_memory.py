@@ -0,0 +1,98 @@
+"""
+Бенчмарк памяти: сколько байт занимает одна особь при прежней раскладке
+(__dict__ на экземпляр, список еды и условия в каждой особи) и при слотах
+с константами вида в классе. Прежняя раскладка воспроизводится классами-
+двойниками с теми же полями экземпляра
+
+Запуск: python benchmarks/bench_memory.py [число особей]
+"""
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from world.time_manager import TimeManager
+from entities.plants.lumiere import Lumiere
+from entities.animals.pauvre import Pauvre
+from entities.animals.malheureux import Malheureux
+from entities.group import Group
+from entity_factory import create_plant_class, create_animal_class
+
+ENTITIES = 100_000
+
+
+class DictPlant:
+    """Растение в прежней раскладке: все поля в __dict__"""
+    def __init__(self, x, y, symbol, world, timer):
+        self.x = x
+        self.y = y
+        self.symbol = symbol
+        self.world = world
+        self.timer = timer
+        self.is_growing = 0
+        self.active = 0
+
+
+class DictAnimal:
+    """Животное в прежней раскладке: список еды и условия хранились в каждой особи"""
+    def __init__(self, x, y, symbol, world, timer, group, eatable_entities):
+        self.x = x
+        self.y = y
+        self.symbol = symbol
+        self.world = world
+        self.timer = timer
+        self.hunger = 100
+        self.group = group
+        self.eatable_entities = eatable_entities
+        self.reproduce_condition = None
+        self.eat_condition = None
+
+
+def bytes_per_entity(make, count):
+    """Средний прирост памяти на одну созданную особь"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [make(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Список-контейнер не относится к особям
+    size = (after - before - sys.getsizeof(entities)) / count
+    del entities
+    return size
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ENTITIES
+    timer = TimeManager(6)
+    group = Group(1)
+    Fougere = create_plant_class('Fougere', 'F', ['night'], ['day'])
+    Renard = create_animal_class('Renard', 'R', ['night'], ['Pauvre', 'Fougere'])
+
+    # (вид, особь в прежней раскладке, особь со слотами)
+    cases = [
+        ('Lumiere', lambda i: DictPlant(i, i, 'L', None, timer),
+         lambda i: Lumiere(i, i, None, None, timer)),
+        ('Pauvre', lambda i: DictAnimal(i, i, 'P', None, timer, group, ['Lumiere']),
+         lambda i: Pauvre(i, i, None, timer, group)),
+        ('Malheureux', lambda i: DictAnimal(i, i, 'M', None, timer, group, ['Demi', 'Obscurite', 'Pauvre']),
+         lambda i: Malheureux(i, i, None, timer, group)),
+        ('Fougere*', lambda i: DictPlant(i, i, 'F', None, timer),
+         lambda i: Fougere(i, i, None, None, timer)),
+        ('Renard*', lambda i: DictAnimal(i, i, 'R', None, timer, group, ['Pauvre', 'Fougere']),
+         lambda i: Renard(i, i, None, timer, group)),
+    ]
+    print(f"{count} особей на вид; * - вид из entity_factory")
+    print(f"{'species':>12} {'dict B':>9} {'slots B':>9} {'saved':>7}")
+    for name, make_dict, make_slots in cases:
+        before = bytes_per_entity(make_dict, count)
+        after = bytes_per_entity(make_slots, count)
+        print(f"{name:>12} {before:9.1f} {after:9.1f} {1 - after / before:7.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Микробенчмарк запросов соседей: прежний Grid.get_neighbors (список списков
+с проверкой границ на каждого соседа) против таблицы смещений Grid.neighbor_offsets
+
+Запуск: python benchmarks/bench_neighbors.py
+"""
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from world.grid import Grid
+
+GRID_SIZES = [(40, 12), (500, 500), (2000, 2000)]
+QUERIES = 200_000
+
+
+def legacy_get_neighbors(grid, x, y):
+    """Реализация get_neighbors до введения таблицы соседей"""
+    neighbors = []
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    for dx, dy in directions:
+        nx, ny = x + dx, y + dy
+        if grid.is_in_bounds(nx, ny):
+            neighbors.append([grid.cells[ny][nx], nx, ny])
+    return neighbors
+
+
+def bench_legacy(grid, points):
+    start = time.perf_counter()
+    for x, y in points:
+        for neighbor in legacy_get_neighbors(grid, x, y):
+            entity = neighbor[0]
+    return len(points) / (time.perf_counter() - start)
+
+
+def bench_table(grid, points):
+    start = time.perf_counter()
+    get_entity = grid.get_entity
+    for x, y in points:
+        for dx, dy in grid.neighbor_offsets(x, y):
+            entity = get_entity(x + dx, y + dy)
+    return len(points) / (time.perf_counter() - start)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    random.seed(0)
+    print(f"{'grid':>12} {'before q/s':>14} {'after q/s':>14} {'speedup':>9}")
+    for width, height in GRID_SIZES:
+        grid = Grid(width, height, [[None] * width for _ in range(height)])
+        points = [(random.randrange(width), random.randrange(height)) for _ in range(QUERIES)]
+        before = bench_legacy(grid, points)
+        after = bench_table(grid, points)
+        print(f"{width:>5}x{height:<6} {before:>14,.0f} {after:>14,.0f} {after / before:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
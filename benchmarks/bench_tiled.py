@@ -0,0 +1,154 @@
+"""
+Бенчмарк многопроцессного тика по плиткам (world/tiled_tick.py)
+
+Замеряет тики в секунду поэлементного тика ArrayGrid и TiledTicker для каждого
+числа процессов из --workers (по умолчанию 1, 2, 4, ... до числа ядер):
+ускорение относительно обычного тика и эффективность на процесс
+относительно одного процесса. Число процессов больше числа ядер
+помечается как oversubscribed: такой замер показывает только накладные
+расходы, а не выигрыш. С --output замеры сохраняются в JSON, чтобы
+сравнивать машины с разным числом ядер. Затем проверяется статистическая
+эквивалентность: для каждого сида мир прогоняется последовательно и по
+плиткам, и итоговая численность каждого вида сравнивается t-статистикой
+Уэлча. Если |t| больше --threshold хотя бы для одного вида, скрипт
+завершается с кодом 1.
+
+Примеры:
+    python benchmarks/bench_tiled.py --size 400 --ticks 30
+    python benchmarks/bench_tiled.py --workers 1,2,4,8,16 --skip-check --output tiled.json
+    python benchmarks/bench_tiled.py --skip-speed --seeds 20
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from world.tiled_tick import TiledTicker
+
+
+def make_scenario(size, ticks, density):
+    """Сценарий по умолчанию на сетке size x size с заданной долей занятых клеток"""
+    scenario = dict(default_scenario(), backend='arrays', width=size, height=size, ticks=ticks)
+    species = len(scenario['plants']) + len(scenario['animals'])
+    per_species = int(size * size * density / species)
+    scenario['plants'] = {name: per_species for name in scenario['plants']}
+    scenario['animals'] = {name: per_species for name in scenario['animals']}
+    return scenario
+
+
+def run(scenario, seed, workers=0, tile_size=32):
+    """Прогон одного мира; workers=0 - обычный тик. Возвращает (секунды, численность по видам)"""
+    world, time_manager = build_world(scenario, seed)
+    # Плитки ходят поэлементно, поэтому и обычный тик для сравнения поэлементный
+    world.plant_mode = world.animal_mode = 'entity'
+    tiler = TiledTicker(world, workers=workers, tile_size=tile_size, seed=seed) if workers else None
+    start = time.perf_counter()
+    for _ in range(scenario['ticks']):
+        world.tick()
+        time_manager.advance_time()
+    elapsed = time.perf_counter() - start
+    if tiler is not None:
+        tiler.close()
+    counts = world.count_by_species()
+    return elapsed, [counts.get(name, 0) for name in list(scenario['plants']) + list(scenario['animals'])]
+
+
+def welch_t(a, b):
+    """t-статистика Уэлча для двух выборок; 0, если обе выборки постоянны и совпадают"""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    error = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+    difference = a.mean() - b.mean()
+    if error == 0:
+        return 0.0 if difference == 0 else float('inf')
+    return float(difference / error)
+
+
+def default_workers():
+    """1, 2, 4, ... до числа ядер (и само число ядер, если оно не степень двойки)"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def speed_report(scenario, tile_size, worker_counts):
+    """Печатает и возвращает тики в секунду по числу процессов"""
+    cores = os.cpu_count() or 1
+    elapsed, _ = run(scenario, seed=0)
+    serial = scenario['ticks'] / elapsed
+    rows = [{'workers': 0, 'ticks_per_sec': serial}]
+    print(f"{'mode':>10} {'ticks/s':>10} {'speedup':>9} {'efficiency':>11}")
+    print(f"{'serial':>10} {serial:>10.2f} {1:>8.2f}x")
+    single = None
+    for workers in worker_counts:
+        elapsed, _ = run(scenario, seed=0, workers=workers, tile_size=tile_size)
+        rate = scenario['ticks'] / elapsed
+        single = single or rate
+        # Эффективность: доля линейного ускорения относительно одного процесса
+        efficiency = rate / (single * workers)
+        note = '  oversubscribed' if workers > cores else ''
+        print(f"{f'tiled x{workers}':>10} {rate:>10.2f} {rate / serial:>8.2f}x {efficiency:>10.0%}{note}")
+        rows.append({'workers': workers, 'ticks_per_sec': rate, 'efficiency': efficiency})
+    return {'cores': cores, 'size': scenario['width'], 'ticks': scenario['ticks'], 'rows': rows}
+
+
+def equivalence_check(scenario, seeds, workers, tile_size, threshold):
+    """Сравнивает итоговую численность видов; возвращает True, если |t| <= threshold для всех"""
+    species = list(scenario['plants']) + list(scenario['animals'])
+    serial = np.array([run(scenario, seed)[1] for seed in seeds])
+    tiled = np.array([run(scenario, seed, workers=workers, tile_size=tile_size)[1] for seed in seeds])
+    print(f"{'species':>12} {'serial':>10} {'tiled':>10} {'t':>7}")
+    passed = True
+    for column, name in enumerate(species):
+        t = welch_t(serial[:, column], tiled[:, column])
+        passed = passed and abs(t) <= threshold
+        print(f"{name:>12} {serial[:, column].mean():>10.1f} {tiled[:, column].mean():>10.1f} {t:>7.2f}")
+    return passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк многопроцессного тика по плиткам")
+    parser.add_argument('--size', type=int, default=400, help="Сторона квадратной сетки")
+    parser.add_argument('--ticks', type=int, default=30)
+    parser.add_argument('--density', type=float, default=0.3, help="Доля занятых клеток в начале")
+    parser.add_argument('--tile-size', type=int, default=32)
+    parser.add_argument('--workers', type=lambda text: [int(n) for n in text.split(',')],
+                        default=default_workers(),
+                        help="Числа процессов через запятую (по умолчанию 1, 2, 4, ... до числа ядер)")
+    parser.add_argument('--seeds', type=int, default=10, help="Число сидов в проверке эквивалентности")
+    parser.add_argument('--threshold', type=float, default=3.0, help="Допустимый |t| Уэлча")
+    parser.add_argument('--skip-speed', action='store_true')
+    parser.add_argument('--skip-check', action='store_true', help="Не проверять эквивалентность")
+    parser.add_argument('--output', help="JSON для замеров скорости")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    scenario = make_scenario(args.size, args.ticks, args.density)
+    if not args.skip_speed:
+        report = speed_report(scenario, args.tile_size, args.workers)
+        if args.output:
+            with open(args.output, 'w') as stream:
+                json.dump(report, stream, indent=2)
+        print()
+    if args.skip_check:
+        return 0
+    # Сравнение идет на меньшем мире, чтобы набрать выборку по сидам за разумное время
+    small = make_scenario(min(args.size, 128), args.ticks, args.density)
+    if not equivalence_check(small, range(args.seeds), max(args.workers), args.tile_size, args.threshold):
+        print(f"Tiled tick differs from serial tick: |t| > {args.threshold}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
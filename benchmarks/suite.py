@@ -0,0 +1,275 @@
+"""
+Набор бенчмарков масштабирования Grid.tick
+
+Сценарии с фиксированным сидом перебирают размеры сетки (от 40x12 до
+2000x2000, а в разреженном бэкенде 'chunked' - до 20000x20000), плотность
+и состав видов, включая динамические виды из entity_factory. Для каждого сценария измеряются тики в секунду, обновления
+сущностей в секунду и пиковая память; отдельно замеряются get_neighbors,
+duplicate_entity и инжектированные поведения растений и животных.
+
+Результаты сохраняются в JSON и сравниваются с сохраненной базовой линией:
+если метрика хуже базовой больше чем на --tolerance, скрипт завершается с кодом 1.
+
+Примеры:
+    python benchmarks/suite.py --quick --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --quick --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from world import create_grid
+from world.time_manager import TimeManager
+from entities.animals.malheureux import Malheureux
+from entities.animals.pauvre import Pauvre
+from entities.plants.lumiere import Lumiere
+from entities.plants.obscurite import Obscurite
+from entities.plants.demi import Demi
+from entities.group import Group
+from entity_factory import create_plant_class, create_animal_class
+
+NightFlower = create_plant_class(
+    name="NightFlower", symbol="N",
+    active_phases=['night'], inactive_phases=['day'], semi_active_phases=['evening'],
+)
+Hunter = create_animal_class(
+    name="Hunter", symbol="H",
+    active_phases=['evening', 'night'], food_sources=['NightFlower', 'Pauvre'],
+    movement_pattern='hungry', reproduction_strategy='any',
+)
+
+# Доли видов среди занятых клеток
+MIXES = {
+    'default': {Lumiere: 0.125, Obscurite: 0.125, Demi: 0.125, Pauvre: 0.3125, Malheureux: 0.3125},
+    'plants': {Lumiere: 0.34, Obscurite: 0.33, Demi: 0.33},
+    'dynamic': {Lumiere: 0.2, NightFlower: 0.3, Pauvre: 0.2, Hunter: 0.3},
+}
+
+# (имя, ширина, высота, плотность, состав, бэкенд, тиков)
+SCENARIOS = [
+    ('default-40x12', 40, 12, 0.15, 'default', 'objects', 200),
+    ('dynamic-40x12', 40, 12, 0.15, 'dynamic', 'objects', 200),
+    ('default-200x200-sparse', 200, 200, 0.02, 'default', 'objects', 30),
+    ('default-200x200-dense', 200, 200, 0.3, 'default', 'objects', 10),
+    ('plants-200x200-arrays', 200, 200, 0.3, 'plants', 'arrays', 10),
+    ('dynamic-500x500', 500, 500, 0.05, 'dynamic', 'objects', 5),
+    ('default-1000x1000-sparse', 1000, 1000, 0.01, 'default', 'objects', 3),
+    ('default-2000x2000-sparse', 2000, 2000, 0.005, 'default', 'objects', 2),
+    ('default-2000x2000-chunked', 2000, 2000, 0.005, 'default', 'chunked', 2),
+    ('default-20000x20000-chunked', 20000, 20000, 0.0005, 'default', 'chunked', 1),
+]
+
+# В быстром режиме пропускаем самые большие сетки
+QUICK_MAX_CELLS = 250_000
+
+# Метрики, для которых меньшее значение лучше
+LOWER_IS_BETTER = {'peak_memory_mb'}
+
+SEED = 12345
+GROUP_SIZE = 4
+
+
+def build_world(width, height, density, mix, backend):
+    random.seed(SEED)
+    world = create_grid(width, height, backend)
+    timer = TimeManager(6)
+    total = int(width * height * density)
+    cells = random.sample(range(width * height), total)
+    classes = list(MIXES[mix])
+    weights = list(MIXES[mix].values())
+    # Как и в config.py, в среднем по GROUP_SIZE животных на группу
+    groups = [Group(i) for i in range(max(1, total // GROUP_SIZE))]
+    for i, (cell, cls) in enumerate(zip(cells, random.choices(classes, weights, k=total))):
+        x, y = cell % width, cell // width
+        if hasattr(cls, 'FOOD_SOURCES'):
+            # Группы заполняются по кругу, чтобы размеры групп в начале были
+            # одинаковыми и не зависели от размера мира
+            group = groups[i % len(groups)]
+            entity = cls(x, y, world, timer, group)
+            world.place_entity(entity, x, y)
+            group.add_member(entity)
+        else:
+            world.place_entity(cls(x, y, None, world, timer), x, y)
+    return world, timer
+
+
+def live_entities(world):
+    return sum(world.count_by_species().values())
+
+
+def run_scenario(name, width, height, density, mix, backend, ticks):
+    # Память замеряется отдельно, чтобы tracemalloc не искажал время тиков
+    tracemalloc.start()
+    world, timer = build_world(width, height, density, mix, backend)
+    world.tick()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del world, timer
+
+    world, timer = build_world(width, height, density, mix, backend)
+    updates = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        updates += live_entities(world)
+        world.tick()
+        timer.advance_time()
+    elapsed = time.perf_counter() - start
+    return {
+        'ticks_per_sec': ticks / elapsed,
+        'entity_updates_per_sec': updates / elapsed,
+        'peak_memory_mb': peak / 2**20,
+    }
+
+
+def _rate(operation, items, budget=0.5):
+    """Повторяет operation над items не меньше budget секунд, возвращает операций в секунду"""
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < budget:
+        for item in items:
+            operation(item)
+        done += len(items)
+    return done / (time.perf_counter() - start)
+
+
+# Микробенчмарки: (имя для --filter, метрика в результатах 'micro')
+MICRO = [
+    ('micro_neighbors', 'get_neighbors_per_sec'),
+    ('micro_clone', 'duplicate_entity_per_sec'),
+    ('micro_grow', 'plant_grow_per_sec'),
+    ('micro_act', 'animal_act_per_sec'),
+]
+
+
+def run_micro(name_filter=None):
+    selected = [metric for name, metric in MICRO if not name_filter or name_filter in name]
+    if not selected:
+        return {}
+    print("running micro ...", file=sys.stderr)
+    world, timer = build_world(200, 200, 0.2, 'default', 'objects')
+    random.seed(SEED)
+    points = [(random.randrange(200), random.randrange(200)) for _ in range(10_000)]
+    plants = [e for e in world.iter_entities() if isinstance(e, (Lumiere, Obscurite, Demi))][:2000]
+    timer.current_phase = 'evening'
+
+    empty = [p for p in points if world.is_empty(*p)]
+    source = plants[0]
+
+    def duplicate(point):
+        world.duplicate_entity(source, *point)
+        world.remove_entity(world.get_entity(*point))
+
+    def animal_act():
+        # Поведение животных меняет мир, поэтому замеряется на свежей копии сценария
+        world, timer = build_world(200, 200, 0.2, 'default', 'objects')
+        timer.current_phase = 'evening'
+        return _act_rate(world)
+
+    benchmarks = {
+        'get_neighbors_per_sec': lambda: _rate(lambda p: world.get_neighbors(*p), points),
+        'duplicate_entity_per_sec': lambda: _rate(duplicate, empty),
+        'plant_grow_per_sec': lambda: _rate(lambda e: e.grow(), plants),
+        'animal_act_per_sec': animal_act,
+    }
+    return {'micro': {metric: benchmarks[metric]() for metric in selected}}
+
+
+def _act_rate(world, budget=0.5):
+    """
+    Ходы живых животных в секунду. Съеденные, вытесненные и умершие животные
+    выбывают из мира, поэтому список пересобирается каждый круг (вне замера),
+    а выбывшие в течение круга пропускаются
+    """
+    done, elapsed = 0, 0.0
+    while elapsed < budget:
+        animals = [e for e in world.iter_entities() if isinstance(e, (Pauvre, Malheureux))][:2000]
+        if not animals:
+            break
+        start = time.perf_counter()
+        for animal in animals:
+            if animal.world is not None:
+                animal.act()
+                done += 1
+        elapsed += time.perf_counter() - start
+    return done / elapsed if elapsed else 0.0
+
+
+def run_suite(quick=False, name_filter=None):
+    results = {}
+    for scenario in SCENARIOS:
+        name, width, height = scenario[:3]
+        if quick and width * height > QUICK_MAX_CELLS:
+            continue
+        if name_filter and name_filter not in name:
+            continue
+        print(f"running {name} ...", file=sys.stderr)
+        results[name] = run_scenario(*scenario)
+    results.update(run_micro(name_filter))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Сравнивает результаты с базовой линией и возвращает список регрессий"""
+    regressions = []
+    print(f"{'benchmark':<28} {'metric':<26} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get('results', {}).get(name, {}).get(metric)
+            if base is None:
+                continue
+            change = (value - base) / base if base else 0.0
+            worse = change > tolerance if metric in LOWER_IS_BETTER else change < -tolerance
+            mark = '  REGRESSION' if worse else ''
+            print(f"{name:<28} {metric:<26} {base:>14.1f} {value:>14.1f} {change:>+7.0%}{mark}")
+            if worse:
+                regressions.append((name, metric, base, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки масштабирования Grid.tick")
+    parser.add_argument('--quick', action='store_true', help="Пропустить сетки больше 500x500")
+    parser.add_argument('--filter', help="Запускать только сценарии и микробенчмарки (micro_*), в имени которых есть подстрока")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="JSON с базовой линией для сравнения")
+    parser.add_argument('--save-baseline', help="Сохранить результаты как базовую линию")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Допустимое ухудшение метрики относительно базовой линии (доля)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': run_suite(args.quick, args.filter),
+    }
+    with open(args.output, 'w') as stream:
+        json.dump(report, stream, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+        regressions = compare(report['results'], baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    else:
+        for name, metrics in report['results'].items():
+            print(name, {metric: round(value, 1) for metric, value in metrics.items()})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,30 @@
 GRID_WIDTH = 40
 GRID_HEIGHT = 12
 
+# Бэкенд хранения мира: 'objects' (world.grid.Grid), 'arrays' (world.array_grid.ArrayGrid)
+# или 'chunked' (world.chunked_grid.ChunkedGrid - разреженные чанки для огромных пустых миров)
+GRID_BACKEND = 'objects'
+
+# Сторона чанка ChunkedGrid в клетках (степень двойки)
+CHUNK_SIZE = 64
+
+# Шаг растений в бэкенде 'arrays': 'entity' (по одному, как grow из метакласса)
+# или 'batched' (векторизованный шаг всего слоя растений, world/plant_kernel.py)
+PLANT_STEP = 'batched'
+
+# Шаг животных в бэкенде 'arrays': 'entity' (по одному, как act из метакласса)
+# или 'batched' (векторизованный шаг всех животных, world/animal_kernel.py)
+ANIMAL_STEP = 'batched'
+
+# Многопроцессный тик бэкенда 'arrays' по плиткам (world/tiled_tick.py):
+# число рабочих процессов (0 - обычный последовательный тик) и сторона плитки в клетках
+TILED_WORKERS = 0
+TILE_SIZE = 32
+
+# Сид прогона: расстановка сущностей и поток случайных чисел мира (world/rng.py).
+# None - случайный прогон
+SEED = None
+
 # Начальное количество сущностей
 INITIAL_LUMIERE_COUNT = 5
 INITIAL_OBSCURITE_COUNT = 5
@@ -15,9 +39,38 @@ INITIAL_MALHEUREUX_COUNT = 20
 # Длительность симуляции
 SIMULATION_TICKS = 100
 
+# Снимки мира (world/snapshot.py): main.py сохраняет снимок каждые SNAPSHOT_EVERY тиков
+# (0 - не сохранять) и, если задан RESUME_SNAPSHOT, продолжает прогон с этого снимка
+SNAPSHOT_EVERY = 0
+SNAPSHOT_PATH = "simulation_snapshot.npz"
+RESUME_SNAPSHOT = None
+
+# Лента времени GUI (timeline.py): ключевой кадр каждые KEYFRAME_INTERVAL тиков,
+# кадры хранятся в памяти в пределах KEYFRAME_MEMORY_MB
+KEYFRAME_INTERVAL = 25
+KEYFRAME_MEMORY_MB = 64
+
+# Временные ряды популяции (recorder.py): не больше SERIES_CAPACITY строк в памяти,
+# старые тики огрубляются. main.py сохраняет ряды в SERIES_CSV и SERIES_NPZ (None - не сохранять)
+SERIES_CAPACITY = 4096
+SERIES_CSV = None
+SERIES_NPZ = None
+
+# Профилирование действий по видам (world/profiler.py); таблица выводится в main.py
+PROFILE_TICKS = False
+
 # Настройки времени суток
 TICKS_PER_PHASE = 6  # Каждая фаза длится 6 тиков
 
 # Логгирование
 LOG_TO_FILE = True
 LOG_FILE_NAME = "simulation.log"
+LOG_QUEUE_SIZE = 100000           # Размер очереди записей для фонового потока
+LOG_MAX_BYTES = 50 * 1024 * 1024  # Размер сегмента, после которого он сжимается в .gz
+LOG_MAX_SEGMENTS = 0              # Сколько сжатых сегментов хранить (0 - все)
+
+# Уровень логов симуляции; события отдельных сущностей пишутся только на DEBUG
+LOG_LEVEL = 'INFO'
+
+# Категории событий, которые пишутся при уровне DEBUG
+LOG_CATEGORIES = ['movement', 'feeding', 'reproduction', 'plant_spread', 'grouping', 'lifecycle']
@@ -0,0 +1,262 @@
+"""
+Параллельный прогон ансамбля реплик одного сценария без GUI
+
+Каждая реплика - отдельный мир в отдельном процессе со своим сидом.
+Между процессами передаются только небольшие сводки по тикам (численность
+видов и средний голод), мир целиком никогда не сериализуется. С on_tick
+строки сводки идут из процессов через очередь сразу после каждого тика,
+а итоговые массивы реплики сливаются в статистику по ее завершении.
+
+Пример:
+    python ensemble.py --runs 200 --workers 8 --ticks 300
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import config
+from world import create_grid
+from world.time_manager import TimeManager
+from entities.animals.malheureux import Malheureux
+from entities.animals.pauvre import Pauvre
+from entities.plants.lumiere import Lumiere
+from entities.plants.obscurite import Obscurite
+from entities.plants.demi import Demi
+from entities.group import Group
+from meta_classes import entity_registry
+from logger import setup_logger, set_log_level
+
+logger = setup_logger("ensemble")
+
+# Количество групп, создаваемых для каждого вида животных
+GROUPS_PER_SPECIES = 5
+
+
+def default_scenario():
+    """Сценарий по умолчанию, собранный из config.py"""
+    return {
+        'width': config.GRID_WIDTH,
+        'height': config.GRID_HEIGHT,
+        'ticks': config.SIMULATION_TICKS,
+        'ticks_per_phase': config.TICKS_PER_PHASE,
+        'backend': config.GRID_BACKEND,
+        'plants': {
+            'Lumiere': config.INITIAL_LUMIERE_COUNT,
+            'Obscurite': config.INITIAL_OBSCURITE_COUNT,
+            'Demi': config.INITIAL_DEMI_COUNT,
+        },
+        'animals': {
+            'Pauvre': config.INITIAL_PAUVRE_COUNT,
+            'Malheureux': config.INITIAL_MALHEUREUX_COUNT,
+        },
+    }
+
+
+def _random_empty_cell(world):
+    for _ in range(100):
+        x = random.randint(0, world.width - 1)
+        y = random.randint(0, world.height - 1)
+        if world.is_empty(x, y):
+            return x, y
+    return None
+
+
+def build_world(scenario, seed):
+    """Создает мир сценария; все случайные решения зависят только от seed"""
+    random.seed(seed)
+    world = create_grid(scenario['width'], scenario['height'], scenario.get('backend'), seed=seed)
+    time_manager = TimeManager(scenario['ticks_per_phase'])
+
+    for name, count in scenario['plants'].items():
+        cls = entity_registry['plants'][name]
+        for _ in range(count):
+            cell = _random_empty_cell(world)
+            if cell is not None:
+                world.place_entity(cls(cell[0], cell[1], None, world, time_manager), *cell)
+
+    group_number = 1
+    for name, count in scenario['animals'].items():
+        cls = entity_registry['animals'][name]
+        groups = [Group(group_number + i) for i in range(GROUPS_PER_SPECIES)]
+        group_number += GROUPS_PER_SPECIES
+        for _ in range(count):
+            cell = _random_empty_cell(world)
+            if cell is not None:
+                group = random.choice(groups)
+                entity = cls(cell[0], cell[1], world, time_manager, group)
+                world.place_entity(entity, *cell)
+                group.add_member(entity)
+
+    return world, time_manager
+
+
+def mean_hunger(world):
+    """Средний голод животных в мире (0, если животных нет)"""
+    total, count = 0, 0
+    for species in world.population_stats().values():
+        if not species.is_plant:
+            total += species.total_hunger
+            count += species.count
+    return total / count if count else 0.0
+
+
+def run_replicate(scenario, seed, on_tick=None):
+    """
+    Прогоняет одну реплику и возвращает сводку: массив численностей
+    (тики x виды) и средний голод по тикам. Тик 0 - начальное состояние.
+    on_tick(seed, tick, counts, hunger) получает строку сводки после каждого тика
+    """
+    world, time_manager = build_world(scenario, seed)
+    species = list(scenario['plants']) + list(scenario['animals'])
+    counts = np.zeros((scenario['ticks'] + 1, len(species)), dtype=np.int32)
+    hunger = np.zeros(scenario['ticks'] + 1, dtype=np.float32)
+
+    for tick in range(scenario['ticks'] + 1):
+        if tick > 0:
+            world.tick()
+            time_manager.advance_time()
+        by_species = world.count_by_species()
+        counts[tick] = [by_species.get(name, 0) for name in species]
+        hunger[tick] = mean_hunger(world)
+        if on_tick is not None:
+            on_tick(seed, tick, counts[tick].tolist(), float(hunger[tick]))
+
+    return seed, counts, hunger
+
+
+# Очередь строк сводки рабочего процесса (задается в _init_worker)
+_rows = None
+
+
+def _init_worker(rows=None):
+    global _rows
+    # Рабочие процессы не пишут поэлементные события и информационные сообщения
+    set_log_level('WARNING')
+    _rows = rows
+
+
+def _send_row(*row):
+    _rows.put(row)
+
+
+def _run_streamed(scenario, seed):
+    return run_replicate(scenario, seed, on_tick=_send_row)
+
+
+class EnsembleStats:
+    """
+    Накопитель сводок реплик: численности (реплики x тики x виды) и
+    средний голод (реплики x тики)
+    """
+    def __init__(self, species):
+        self.species = species
+        self.seeds = []
+        self._counts = []
+        self._hunger = []
+
+    def add(self, seed, counts, hunger):
+        self.seeds.append(seed)
+        self._counts.append(counts)
+        self._hunger.append(hunger)
+
+    @property
+    def counts(self):
+        return np.stack(self._counts)
+
+    @property
+    def hunger(self):
+        return np.stack(self._hunger)
+
+    def mean(self):
+        return self.counts.mean(axis=0)
+
+    def percentiles(self, q=(5, 50, 95)):
+        """Перцентили численности по репликам: массив (len(q) x тики x виды)"""
+        return np.percentile(self.counts, q, axis=0)
+
+    def extinction_probability(self):
+        """Доля реплик, в которых вид вымер к каждому тику: (тики x виды)"""
+        return (self.counts == 0).mean(axis=0)
+
+    def summary(self, tick=-1):
+        """Текстовая таблица по одному тику (по умолчанию последнему)"""
+        mean = self.mean()[tick]
+        p5, p50, p95 = self.percentiles()[:, tick]
+        extinct = self.extinction_probability()[tick]
+        lines = [f"{'species':<12} {'mean':>8} {'p5':>7} {'p50':>7} {'p95':>7} {'P(extinct)':>11}"]
+        for i, name in enumerate(self.species):
+            lines.append(f"{name:<12} {mean[i]:>8.1f} {p5[i]:>7.1f} {p50[i]:>7.1f} {p95[i]:>7.1f} {extinct[i]:>11.2f}")
+        lines.append(f"{'mean hunger':<12} {self.hunger[:, tick].mean():>8.1f}")
+        return "\n".join(lines)
+
+
+def run_ensemble(scenario, seeds, workers=None, on_result=None, on_tick=None):
+    """
+    Прогоняет реплики сценария для каждого сида на пуле процессов и сливает
+    сводки по мере готовности. on_result(seed, counts, hunger) вызывается
+    для каждой завершенной реплики, on_tick(seed, tick, counts, hunger) -
+    для каждой строки сводки, пока реплики еще идут
+    """
+    species = list(scenario['plants']) + list(scenario['animals'])
+    stats = EnsembleStats(species)
+    seeds = list(seeds)
+    rows = multiprocessing.Queue() if on_tick is not None else None
+    expected = len(seeds) * (scenario['ticks'] + 1) if rows is not None else 0
+    received = 0
+
+    def drain(timeout):
+        nonlocal received
+        try:
+            row = rows.get(timeout=timeout)
+            while True:
+                on_tick(*row)
+                received += 1
+                row = rows.get_nowait()
+        except queue.Empty:
+            pass
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rows,)) as executor:
+        task = run_replicate if rows is None else _run_streamed
+        pending = {executor.submit(task, scenario, seed) for seed in seeds}
+        while pending:
+            done, pending = wait(pending, timeout=0.05 if rows is not None else None,
+                                 return_when=FIRST_COMPLETED)
+            if rows is not None:
+                drain(0)
+            for future in done:
+                seed, counts, hunger = future.result()
+                stats.add(seed, counts, hunger)
+                if on_result is not None:
+                    on_result(seed, counts, hunger)
+    # Строки последних тиков могут прийти после результата реплики
+    while received < expected:
+        drain(1.0)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Параллельный прогон ансамбля реплик сценария")
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--ticks', type=int, default=config.SIMULATION_TICKS)
+    parser.add_argument('--seed', type=int, default=0, help="Сид первой реплики")
+    args = parser.parse_args(argv)
+
+    scenario = default_scenario()
+    scenario['ticks'] = args.ticks
+    seeds = range(args.seed, args.seed + args.runs)
+
+    start = time.perf_counter()
+    stats = run_ensemble(scenario, seeds, args.workers)
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"Ensemble: {args.runs} runs x {args.ticks} ticks on {args.workers} workers in {elapsed:.2f}s")
+    logger.info("\n" + stats.summary())
+
+
+if __name__ == '__main__':
+    main()
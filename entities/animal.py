@@ -1,17 +1,33 @@
 from entities.base_entity import Entity
-import random
 import copy
-from logger import setup_logger
+import warnings
+from logger import setup_logger, LIFECYCLE
 from meta_classes import EvalAnimalMeta
 
 logger = setup_logger(__name__)
 
 class Animal(Entity, metaclass=EvalAnimalMeta):
-    def __init__(self, x, y, symbol, world, timer, group, eatable_entities, reproduce_condition, eat_condition, hunger=100):
+    __slots__ = ('hunger', 'group')
+    CLONE_FIELDS = Entity.CLONE_FIELDS + ('hunger', 'group')
+
+    # Константы вида (одни на весь вид, а не на особь). eatable_entities
+    # метакласс берет из FOOD_SOURCES; условие None отключает размножение и
+    # поедание своего вида. Правила по стратегии вида лежат в reproduce_rule и
+    # eat_rule: вид включает действие, присвоив правило условию
+    eatable_entities = ()
+    reproduce_condition = None
+    eat_condition = None
+
+    def __init__(self, x, y, symbol, world, timer, group, eatable_entities=None,
+                 reproduce_condition=None, eat_condition=None, hunger=100):
+        # eatable_entities, reproduce_condition и eat_condition остались в сигнатуре
+        # для совместимости со старыми подклассами и игнорируются: это константы вида
+        if eatable_entities is not None or reproduce_condition is not None or eat_condition is not None:
+            warnings.warn("eatable_entities, reproduce_condition and eat_condition are species constants; "
+                          "set them on the class (FOOD_SOURCES, reproduce_condition, eat_condition) "
+                          "instead of passing them to Animal.__init__", DeprecationWarning, stacklevel=2)
         super().__init__(x, y, symbol, world, timer)
         self.hunger = hunger
         self.group = group
-        self.eatable_entities = eatable_entities
-        self.reproduce_condition = reproduce_condition
-        self.eat_condition = eat_condition
-        logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) has arrived.")
\ No newline at end of file
+        if LIFECYCLE.enabled:
+            LIFECYCLE.log(self, "Animal %s at (%s, %s) has arrived.", self.symbol, self.x, self.y)
\ No newline at end of file
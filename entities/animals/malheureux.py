@@ -20,4 +20,4 @@ class Malheureux(Animal):
     BEHAVIOR_TRAITS = ['cannibalism']
     
     def __init__(self, x, y, world, timer, group):
-        super().__init__(x, y, 'M', world, timer, group, ['Demi', 'Obscurite', 'Pauvre'], None, None)
\ No newline at end of file
+        super().__init__(x, y, 'M', world, timer, group)
\ No newline at end of file
@@ -17,4 +17,4 @@ class Pauvre(Animal):
     REPRODUCTION_STRATEGY = 'same_group'  # same_group, different_group, any
     
     def __init__(self, x, y, world, timer, group):
-        super().__init__(x, y, 'P', world, timer, group, ['Lumiere'], None, None)
\ No newline at end of file
+        super().__init__(x, y, 'P', world, timer, group)
\ No newline at end of file
@@ -1,4 +1,13 @@
 class Entity:
+    # Слоты вместо __dict__: на миллионах особей словарь на экземпляр - основная
+    # статья расхода памяти. Подклассы добавляют слоты своего состояния, а
+    # одинаковые для всего вида значения хранят в атрибутах класса
+    __slots__ = ('x', 'y', 'symbol', 'world', 'timer')
+
+    # Поля, которые переносятся в клон. Ссылки на мир и таймер общие,
+    # подклассы дополняют кортеж своим состоянием
+    CLONE_FIELDS = ('x', 'y', 'symbol', 'world', 'timer')
+
     def __init__(self, x, y, symbol, world, timer):
         self.x = x
         self.y = y
@@ -6,5 +15,17 @@ class Entity:
         self.world = world
         self.timer = timer
 
+    def clone(self):
+        """
+        Создает новую сущность того же вида без вызова __init__ и без deepcopy:
+        ссылки на мир, таймер и группу остаются общими, копируется только
+        собственное состояние сущности
+        """
+        cls = type(self)
+        new_entity = cls.__new__(cls)
+        for field in self.CLONE_FIELDS:
+            setattr(new_entity, field, getattr(self, field))
+        return new_entity
+
     def act(self):
         pass
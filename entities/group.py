@@ -1,43 +1,196 @@
 class Group:
     def __init__(self, group_number):
-        self.members = []
+        # Члены группы - словарь как упорядоченное множество: проверка, добавление
+        # и удаление за O(1), а порядок вступления сохраняется для split
+        self.members = {}
         self.group_number = group_number
         self.aggression = 0
+        # Число членов по классам видов (для статистики без обхода особей)
+        self.species = {}
+        # Реестр групп мира (GroupRegistry), в котором состоит группа
+        self.registry = None
 
     def add_member(self, animal):
-        if animal not in self.members:
-            self.members.append(animal)
-            self.update_aggression_level()
+        """
+        Принимает животное в группу. Если оно состояло в другой группе, то
+        уходит из нее, а animal.group начинает указывать на эту группу
+        """
+        if animal in self.members:
+            return
+        old_group = getattr(animal, 'group', None)
+        if old_group is not self and old_group is not None:
+            old_group.remove_member(animal)
+            # Группа, в которую переходят из группы мира, тоже попадает в его реестр
+            if self.registry is None and old_group.registry is not None:
+                old_group.registry.register(self)
+        self._add(animal)
+        if old_group is not self:
+            animal.group = self
+            world = getattr(animal, 'world', None)
+            if world is not None:
+                world.group_changed(animal, old_group)
 
     def remove_member(self, animal):
         if animal in self.members:
-            self.members.remove(animal)
+            del self.members[animal]
+            cls = type(animal)
+            self.species[cls] -= 1
+            if not self.species[cls]:
+                del self.species[cls]
+            if not self.members and self.registry is not None:
+                self.registry._forget(self)
             self.update_aggression_level()
 
+    def _add(self, animal):
+        if not self.members and self.registry is not None:
+            self.registry._remember(self)
+        self.members[animal] = None
+        cls = type(animal)
+        self.species[cls] = self.species.get(cls, 0) + 1
+        self.update_aggression_level()
+
     def update_aggression_level(self):
         group_size = len(self.members)
         if group_size > 5:
-            self.aggression = 1 
+            self.aggression = 1
         else:
             self.aggression = 0
 
     def get_group_size(self):
         return len(self.members)
-    
+
     def split(self):
-        mid = len(self.members) // 2
-        members1 = self.members[:mid]
-        members2 = self.members[mid:]
+        """Делит группу пополам; вторая половина членов уходит в новую группу реестра"""
+        registry = self.registry
+        if registry is None:
+            registry = GroupRegistry()
+            registry.register(self)
+        registry.split(self)
 
-        new_group = Group(self.group_type)
 
-        for member in members2:
-            new_group.add_member(member)
-            member.group = new_group
+class GroupRegistry:
+    """
+    Реестр групп мира. Хранит непустые группы, поэтому перебор групп и их
+    размеров не обходит сетку; выдает номера новым группам и выполняет
+    массовые деления и слияния. Состав групп мир поддерживает сам: особь
+    вступает в свою группу при размещении и выходит из нее при удалении
+    """
+    def __init__(self):
+        self.groups = {}  # непустые группы в порядке появления (упорядоченное множество)
+        self.last_number = 0
 
-        self.members = members1
-        for member in self.members:
-            member.group = self
+    def register(self, group):
+        if group.registry is self:
+            return
+        group.registry = self
+        self.last_number = max(self.last_number, group.group_number)
+        if group.members:
+            self.groups[group] = None
 
-        self.update_aggression_level()
-        new_group.update_aggression_level()
+    def _remember(self, group):
+        self.groups[group] = None
+
+    def _forget(self, group):
+        self.groups.pop(group, None)
+
+    def __iter__(self):
+        return iter(list(self.groups))
+
+    def __len__(self):
+        return len(self.groups)
+
+    def new_group(self):
+        self.last_number += 1
+        group = Group(self.last_number)
+        self.register(group)
+        return group
+
+    # --- Членство особей мира ---
+
+    def add(self, animal):
+        """Особь появилась в мире: она вступает в свою группу"""
+        group = animal.group
+        if group.registry is not self:
+            self.register(group)
+        if animal not in group.members:
+            group._add(animal)
+
+    def discard(self, animal):
+        """Особь ушла из мира (гибель, поедание, вытеснение): она выходит из группы"""
+        animal.group.remove_member(animal)
+
+    def restore(self, group, members, aggression=None):
+        """
+        Заполняет группу сразу списком членов (загрузка снимка). aggression -
+        сохраненная агрессивность группы (она поднимается и от голода членов);
+        None - пересчитать по размеру
+        """
+        self.register(group)
+        group.members = dict.fromkeys(members)
+        group.species = {}
+        for animal in members:
+            group.species[type(animal)] = group.species.get(type(animal), 0) + 1
+        if members:
+            self._remember(group)
+        if aggression is None:
+            group.update_aggression_level()
+        else:
+            group.aggression = aggression
+
+    # --- Массовые операции ---
+
+    def _move(self, animals, target):
+        for animal in animals:
+            target.add_member(animal)
+
+    def split(self, group, parts=2):
+        """
+        Делит группу на parts почти равных частей по порядку вступления:
+        первая часть остается в группе, остальные уходят в новые группы.
+        Возвращает список новых групп
+        """
+        members = list(group.members)
+        size = len(members)
+        new_groups = []
+        for k in range(1, parts):
+            moved = members[size * k // parts:size * (k + 1) // parts]
+            if moved:
+                new_group = self.new_group()
+                self._move(moved, new_group)
+                new_groups.append(new_group)
+        return new_groups
+
+    def split_oversized(self, limit=10):
+        """Делит все группы больше limit на части не больше limit; возвращает новые группы"""
+        new_groups = []
+        for group in self:
+            size = len(group.members)
+            if size > limit:
+                new_groups.extend(self.split(group, -(-size // limit)))
+        return new_groups
+
+    def merge(self, target, groups):
+        """Переводит всех членов groups в target"""
+        self.register(target)
+        for group in groups:
+            if group is not target:
+                self._move(list(group.members), target)
+        return target
+
+    # --- Статистика ---
+
+    def sizes(self):
+        """{номер группы: число членов} по непустым группам"""
+        result = {}
+        for group in self.groups:
+            result[group.group_number] = result.get(group.group_number, 0) + len(group.members)
+        return result
+
+    def species_sizes(self):
+        """{имя вида: {номер группы: число членов этого вида}} по непустым группам"""
+        result = {}
+        for group in self.groups:
+            for cls, count in group.species.items():
+                groups = result.setdefault(cls.__name__, {})
+                groups[group.group_number] = groups.get(group.group_number, 0) + count
+        return result
@@ -1,12 +1,16 @@
 from entities.base_entity import Entity
-from logger import setup_logger
+from logger import setup_logger, LIFECYCLE
 from meta_classes import EvalPlantMeta
 
 logger = setup_logger(__name__)
 
 class Plant(Entity, metaclass=EvalPlantMeta):
+    __slots__ = ('is_growing', 'active')
+    CLONE_FIELDS = Entity.CLONE_FIELDS + ('is_growing', 'active')
+
     def __init__(self, x, y, symbol, world, timer, is_growing=0, active=0):
         super().__init__(x, y, symbol, world, timer)
         self.is_growing = is_growing
         self.active = active
-        logger.debug(f"Plant created at ({x}, {y})")
\ No newline at end of file
+        if LIFECYCLE.enabled:
+            LIFECYCLE.log(self, "Plant created at (%s, %s)", x, y)
\ No newline at end of file
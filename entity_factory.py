@@ -67,7 +67,7 @@ def create_animal_class(name, symbol, active_phases, food_sources,
         'REPRODUCTION_STRATEGY': reproduction_strategy,
         'BEHAVIOR_TRAITS': behavior_traits,
         '__init__': lambda self, x, y, world, timer, group: 
-            Animal.__init__(self, x, y, symbol, world, timer, group, food_sources, None, None)
+            Animal.__init__(self, x, y, symbol, world, timer, group)
     }
     
     # Создаем новый класс с использованием метакласса , metaclass=EvalAnimalMeta
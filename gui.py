@@ -1,8 +1,14 @@
 import PySimpleGUI as sg
 import random
 from config import GRID_WIDTH, GRID_HEIGHT, SIMULATION_TICKS, INITIAL_LUMIERE_COUNT, INITIAL_OBSCURITE_COUNT, INITIAL_DEMI_COUNT, INITIAL_PAUVRE_COUNT, INITIAL_MALHEUREUX_COUNT, TICKS_PER_PHASE
-from world.grid import Grid
+from world import create_grid
 from world.time_manager import TimeManager
+from world.profiler import TickProfiler
+from world.snapshot import save_snapshot, load_snapshot
+from timeline import Timeline
+from map_renderer import MapRenderer
+from sim_worker import SimulationWorker
+from recorder import TimeSeriesRecorder
 from entities.animals.malheureux import Malheureux
 from entities.animals.pauvre import Pauvre
 from entities.plants.lumiere import Lumiere
@@ -18,6 +24,7 @@ logger = setup_logger("gui")
 CELL_SIZE = 30
 CANVAS_WIDTH = GRID_WIDTH * CELL_SIZE
 CANVAS_HEIGHT = GRID_HEIGHT * CELL_SIZE
+CHART_HEIGHT = 120
 MAX_SIMULATION_TICKS = 2000  # Максимальное количество тиков симуляции
 
 # Цвета для различных типов сущностей
@@ -34,13 +41,9 @@ HIGHLIGHT_COLORS = {
     'action_cell': '#DDDDDD'  # Светло-серый цвет для клеток возможных действий
 }
 
-def create_empty_grid(width, height):
-    return [[None for _ in range(width)] for _ in range(height)]
-
 def setup_world():
     """Создает и инициализирует мир симуляции"""
-    cells = create_empty_grid(GRID_WIDTH, GRID_HEIGHT)
-    world = Grid(GRID_WIDTH, GRID_HEIGHT, cells)
+    world = create_grid(GRID_WIDTH, GRID_HEIGHT)
     time_manager = TimeManager(ticks_per_phase=TICKS_PER_PHASE)  
     
     # Создаем группы для животных
@@ -64,7 +67,7 @@ def spawn_plants(world, time_manager, entity_class, count):
             x = random.randint(0, world.width - 1)
             y = random.randint(0, world.height - 1)
             
-            if world.cells[y][x] is None:
+            if world.is_empty(x, y):
                 entity = entity_class(x, y, symbol=None, world=world, timer=time_manager)
                 world.place_entity(entity, x, y)
                 logger.info(f"Spawned {entity_class.__name__} at ({x}, {y})")
@@ -78,7 +81,7 @@ def spawn_animals(world, time_manager, entity_class, groups, count):
             
             group = random.choice(groups)
             
-            if world.cells[y][x] is None:
+            if world.is_empty(x, y):
                 entity = entity_class(x, y, world, time_manager, group)
                 world.place_entity(entity, x, y)
                 group.add_member(entity)
@@ -86,181 +89,154 @@ def spawn_animals(world, time_manager, entity_class, groups, count):
                 break
 
 def calculate_stats(world):
-    """Подсчитывает статистику по количеству сущностей в мире"""
-    counts = {}
-    for row in world.cells:
-        for cell in row:
-            if cell is not None:
-                entity_type = type(cell).__name__
-                if entity_type in counts:
-                    counts[entity_type] += 1
-                else:
-                    counts[entity_type] = 1
+    """Подсчитывает статистику популяции по накопителю мира, не обходя клетки"""
+    population = world.population_stats()
     
     # Форматируем статистику для отображения
     stats_text = "Статистика популяции:\n"
-    for entity_type, count in counts.items():
-        stats_text += f"{entity_type}: {count}\n"
+    for entity_type, species in population.items():
+        if species.is_plant:
+            stats_text += f"{entity_type}: {species.count} (растут: {species.growing})\n"
+        else:
+            stats_text += f"{entity_type}: {species.count} (голод: {species.avg_hunger:.1f})\n"
+    
+    # Профиль последнего тика, если профилирование включено
+    if world.profiler is not None and world.profiler.ticks:
+        stats_text += "\n" + world.profiler.table(last_tick=True) + "\n"
     
     return stats_text
 
-def update_canvas(window, world, selected_entity=None):
-    """Обновляет отображение мира на канвасе"""
-    graph = window['-MAP-']
-    graph.erase()
-    
-    # Отрисовываем сетку
-    for x in range(0, CANVAS_WIDTH + 1, CELL_SIZE):
-        graph.draw_line((x, 0), (x, CANVAS_HEIGHT), color='gray')
-    for y in range(0, CANVAS_HEIGHT + 1, CELL_SIZE):
-        graph.draw_line((0, y), (CANVAS_WIDTH, y), color='gray')
-    
-    # Если есть выбранное животное, подсвечиваем клетки действия
-    action_cells = []
-    if selected_entity and type(selected_entity).__name__ in ['Pauvre', 'Malheureux']:
-        # Соседние клетки - потенциальные клетки действия
-        action_cells = [(selected_entity.x + dx, selected_entity.y + dy) 
-                         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
-                         if 0 <= selected_entity.x + dx < world.width and 0 <= selected_entity.y + dy < world.height]
-        
-        # Сначала отрисовываем подсветку для клеток действия
-        for ax, ay in action_cells:
-            pixel_x = ax * CELL_SIZE
-            pixel_y = ay * CELL_SIZE
-            graph.draw_rectangle(
-                (pixel_x, pixel_y),
-                (pixel_x + CELL_SIZE, pixel_y + CELL_SIZE),
-                fill_color=HIGHLIGHT_COLORS['action_cell'],
-                line_color=None
-            )
-    
-    # Отрисовываем сущности
-    for y in range(world.height):
-        for x in range(world.width):
-            entity = world.cells[y][x]
-            if entity is not None:
-                entity_type = type(entity).__name__
-                pixel_x = x * CELL_SIZE
-                pixel_y = y * CELL_SIZE
-                
-                # Отрисовка в зависимости от типа
-                if entity_type in ['Lumiere', 'Obscurite', 'Demi']:
-                    # Растения отображаются квадратами
-                    graph.draw_rectangle(
-                        (pixel_x, pixel_y), 
-                        (pixel_x + CELL_SIZE, pixel_y + CELL_SIZE),
-                        fill_color=COLORS[entity_type],
-                        line_color='black'
-                    )
-                else:
-                    # Животные отображаются кругами
-                    # Размер круга зависит от "масштаба" (условно от уровня голода)
-                    scale = 1.0
-                    if hasattr(entity, 'hunger'):
-                        scale = min(1.0, entity.hunger / 100.0)
-                    
-                    radius = (CELL_SIZE / 2) * scale
-                    center_x = pixel_x + CELL_SIZE / 2
-                    center_y = pixel_y + CELL_SIZE / 2
-                    
-                    # Если это выбранное животное - делаем обводку толще
-                    line_width = 3 if entity == selected_entity else 1
-                    
-                    graph.draw_circle(
-                        (center_x, center_y),
-                        radius,
-                        fill_color=COLORS[entity_type],
-                        line_color='black',
-                        line_width=line_width
-                    )
+# Отрисовщики карты по элементам Graph: фигуры живут между кадрами
+_renderers = {}
 
-def highlight_animal_and_actions(window, world, mouse_x, mouse_y):
-    """Подсвечивает выбранное животное и клетки, куда оно может совершить действие"""
+# Частота обновления интерфейса: окно ждет событий не дольше одного кадра
+FRAME_MS = 16
+
+def get_renderer(window):
     graph = window['-MAP-']
+    renderer = _renderers.get(graph)
+    if renderer is None:
+        renderer = _renderers[graph] = MapRenderer(
+            graph, GRID_WIDTH, GRID_HEIGHT, CELL_SIZE, COLORS,
+            plant_types=['Lumiere', 'Obscurite', 'Demi'],
+            highlight_color=HIGHLIGHT_COLORS['action_cell'],
+        )
+    return renderer
+
+def update_canvas(window, world, selected_entity=None):
+    """Обновляет отображение мира на канвасе: перерисовываются только изменившиеся клетки"""
+    # Подсвечиваются только клетки действия животных
+    if selected_entity is not None and type(selected_entity).__name__ not in ['Pauvre', 'Malheureux']:
+        selected_entity = None
+    get_renderer(window).update(world, selected_entity)
+
+def describe_animal(world, entity):
+    """Текст о выбранном животном и действиях, возможных на соседних клетках"""
+    action_cells = [(entity.x + dx, entity.y + dy) for dx, dy in world.neighbor_offsets(entity.x, entity.y)]
     
-    # Преобразуем координаты мыши в координаты сетки
-    grid_x = int(mouse_x / CELL_SIZE)
-    grid_y = int(mouse_y / CELL_SIZE)
+    neighbor_info = f"Животное: {type(entity).__name__} в группе {entity.group.group_number}\n"
+    neighbor_info += f"Голод: {entity.hunger}\n"
+    neighbor_info += f"Активно: {'Да' if entity.timer.current_phase in getattr(entity, 'ACTIVE_PHASES', []) else 'Нет'}\n"
+    neighbor_info += "\nВозможные действия на соседних клетках:\n"
     
-    # Проверяем границы
-    if 0 <= grid_x < world.width and 0 <= grid_y < world.height:
-        entity = world.cells[grid_y][grid_x]
-        if entity is not None and type(entity).__name__ in ['Pauvre', 'Malheureux']:
-            # Получаем клетки, на которые может воздействовать животное
-            action_cells = []
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = grid_x + dx, grid_y + dy
-                if 0 <= nx < world.width and 0 <= ny < world.height:
-                    action_cells.append((nx, ny))
-            
-            # Обновляем канвас с выделенным животным и клетками действия
-            update_canvas(window, world, entity)
-            
-            # Добавляем информацию об окружении этого животного
-            neighbors = world.get_neighbors(grid_x, grid_y)
-            neighbor_info = f"Животное: {type(entity).__name__} в группе {entity.group.group_number}\n"
-            neighbor_info += f"Голод: {entity.hunger}\n"
-            neighbor_info += f"Активно: {'Да' if entity.timer.current_phase in getattr(entity, 'ACTIVE_PHASES', []) else 'Нет'}\n"
-            neighbor_info += "\nВозможные действия на соседних клетках:\n"
+    # Анализируем возможные действия
+    for i, (nx, ny) in enumerate(action_cells):
+        cell = world.get_entity(nx, ny)
+        actions = []
+        
+        # Клетка для перемещения
+        actions.append("Перемещение")
+        
+        # Проверка на еду
+        if cell is not None:
+            cell_type = type(cell).__name__
+            if hasattr(entity, 'eatable_entities') and cell_type in getattr(entity, 'eatable_entities', []):
+                actions.append("Поедание")
             
-            # Анализируем возможные действия
-            for i, neighbor in enumerate(neighbors):
-                cell, nx, ny = neighbor
-                actions = []
+            # Проверка на размножение
+            if cell_type == type(entity).__name__:
+                can_reproduce = False
+                try:
+                    condition = type(entity).reproduce_condition
+                    if condition and condition(entity, cell):
+                        can_reproduce = True
+                except:
+                    pass
                 
-                # Клетка для перемещения
-                actions.append("Перемещение")
+                if can_reproduce:
+                    actions.append("Размножение")
                 
-                # Проверка на еду
-                if cell is not None:
-                    cell_type = type(cell).__name__
-                    if hasattr(entity, 'eatable_entities') and cell_type in getattr(entity, 'eatable_entities', []):
-                        actions.append("Поедание")
-                    
-                    # Проверка на размножение
-                    if cell_type == type(entity).__name__:
-                        can_reproduce = False
-                        try:
-                            if entity.reproduce_condition and entity.reproduce_condition(entity, cell):
-                                can_reproduce = True
-                        except:
-                            pass
-                        
-                        if can_reproduce:
-                            actions.append("Размножение")
-                        
-                        # Проверка на формирование группы
-                        if entity.group.aggression == 0 and cell.group.aggression == 0:
-                            actions.append("Формирование группы")
-                
-                direction = ["Сверху", "Снизу", "Слева", "Справа"][i]
-                neighbor_info += f"- {direction} ({nx}, {ny}): {', '.join(actions)}\n"
-                if cell is not None:
-                    neighbor_info += f"  Сущность: {type(cell).__name__}\n"
-                else:
-                    neighbor_info += f"  Пусто\n"
-                    
-            window['-INFO-'].update(neighbor_info)
-            
-            return entity
+                # Проверка на формирование группы
+                if entity.group.aggression == 0 and cell.group.aggression == 0:
+                    actions.append("Формирование группы")
+        
+        direction = ["Сверху", "Снизу", "Слева", "Справа"][i]
+        neighbor_info += f"- {direction} ({nx}, {ny}): {', '.join(actions)}\n"
+        if cell is not None:
+            neighbor_info += f"  Сущность: {type(cell).__name__}\n"
         else:
-            window['-INFO-'].update("Выберите животное для просмотра информации")
-            update_canvas(window, world)
+            neighbor_info += f"  Пусто\n"
     
-    return None
+    return neighbor_info
 
-def run_simulation_for_ticks(world, time_manager, target_tick, current_tick=0):
-    """Запускает симуляцию на указанное количество тиков"""
-    # Сохраняем текущее состояние в истории если нужно возвращаться назад
-    ticks_to_run = target_tick - current_tick
-    
-    if ticks_to_run > 0:
-        # Симуляция вперед
-        for _ in range(ticks_to_run):
-            world.tick()
-            time_manager.advance_time()
+def new_timeline(world, time_manager, start_tick=0, profile=False):
+    """Лента времени с ключевыми кадрами для перемотки ползунка в обе стороны"""
+    timeline = Timeline(world, time_manager, seed=random.getrandbits(32), start_tick=start_tick)
+    if profile:
+        TickProfiler().attach(timeline.world)
+    return timeline
+
+def replace_timeline(worker, timeline):
+    """Команда потока симуляции: заменяет ленту времени (сброс или загрузка)"""
+    old_world = worker.timeline.world
+    if old_world.profiler is not None:
+        old_world.profiler.detach(old_world)
+    worker.replace_timeline(timeline)
+
+def toggle_profiler(worker, enabled):
+    """Команда потока симуляции: включает или выключает профилирование тиков"""
+    world = worker.timeline.world
+    if enabled and world.profiler is None:
+        TickProfiler().attach(world)
+    elif not enabled and world.profiler is not None:
+        world.profiler.detach(world)
+
+def target_speed(values):
+    """Скорость для потока симуляции: тиков в секунду или None (как можно быстрее)"""
+    return None if values['-FAST-'] else int(values['-SPEED-'])
+
+def show_frame(window, frame, shown):
+    """Рисует кадр потока симуляции; shown - тексты, уже выведенные в окно"""
+    get_renderer(window).draw_frame(frame)
+    window['-TICKS-'].update(frame.tick)
+    window['-PHASE-'].update(frame.phase)
+    window['-START-'].update(disabled=frame.running)
+    window['-PAUSE-'].update(disabled=not frame.running)
+    window['-TPS-'].update(f"{frame.ticks_per_sec:.0f} тиков/с" if frame.running else "")
+    if frame.series is not None and shown.get('-CHART-') != frame.series[0]:
+        draw_chart(window['-CHART-'], frame.series)
+        shown['-CHART-'] = frame.series[0]
     
-    return world, time_manager, target_tick
+    # Многострочные поля обновляются только при изменении текста
+    info = frame.info or "Выберите животное для просмотра информации"
+    for key, text in (('-STATS-', frame.stats), ('-INFO-', info)):
+        if shown.get(key) != text:
+            window[key].update(text)
+            shown[key] = text
+
+def draw_chart(graph, series):
+    """Рисует график численности видов по данным recorder.TimeSeriesRecorder.chart()"""
+    ticks, counts = series
+    graph.erase()
+    if len(ticks) < 2:
+        return
+    first, span = ticks[0], max(1, ticks[-1] - ticks[0])
+    top = max(max(values) for values in counts.values()) or 1
+    for name, values in counts.items():
+        points = [((tick - first) * CANVAS_WIDTH / span, value * (CHART_HEIGHT - 5) / top)
+                  for tick, value in zip(ticks, values)]
+        graph.draw_lines(points, color=COLORS.get(name, 'black'), width=2)
+    graph.draw_text(f"{top}", (2, CHART_HEIGHT - 2), text_location=sg.TEXT_LOCATION_TOP_LEFT, font=('Arial', 8))
 
 def main():
     sg.theme('DefaultNoMoreNagging')  # Устанавливаем тему
@@ -268,110 +244,100 @@ def main():
     # Создаем макет окна
     layout = [
         [sg.Text('Тик симуляции:'), sg.Slider(range=(0, MAX_SIMULATION_TICKS), orientation='h', key='-TICKS-', enable_events=True, size=(50, 15))],
-        [sg.Text('Текущая фаза:'), sg.Text('morning', size=(10, 1), key='-PHASE-')],
+        [sg.Text('Текущая фаза:'), sg.Text('morning', size=(10, 1), key='-PHASE-'), sg.Text('', size=(15, 1), key='-TPS-')],
         [sg.Graph(canvas_size=(CANVAS_WIDTH, CANVAS_HEIGHT), 
                   graph_bottom_left=(0, 0), 
                   graph_top_right=(CANVAS_WIDTH, CANVAS_HEIGHT), 
                   key='-MAP-', 
                   enable_events=True,
                   background_color='white')],
+        [sg.Graph(canvas_size=(CANVAS_WIDTH, CHART_HEIGHT),
+                  graph_bottom_left=(0, 0),
+                  graph_top_right=(CANVAS_WIDTH, CHART_HEIGHT),
+                  key='-CHART-',
+                  background_color='white')],
         [sg.Text('Информация:', size=(15, 1)), sg.Multiline(size=(50, 8), key='-INFO-', disabled=True)],
         [sg.Multiline(size=(70, 10), key='-STATS-', disabled=True)],
         [sg.Button('Запустить симуляцию', key='-START-'), 
          sg.Button('Пауза', key='-PAUSE-', disabled=True),
          sg.Button('Сброс', key='-RESET-'),
-         sg.Text('Скорость:'), 
-         sg.Slider(range=(1, 10), default_value=5, orientation='h', key='-SPEED-', size=(20, 15))]
+         sg.Button('Сохранить', key='-SAVE-'),
+         sg.Button('Загрузить', key='-LOAD-'),
+         sg.Text('Тиков в секунду:'), 
+         sg.Slider(range=(1, 60), default_value=5, orientation='h', key='-SPEED-', size=(20, 15), enable_events=True),
+         sg.Checkbox('Как можно быстрее', key='-FAST-', enable_events=True),
+         sg.Checkbox('Профилирование', key='-PROFILE-', enable_events=True)]
     ]
     
     window = sg.Window('Ecosystem Simulator', layout, finalize=True, resizable=True)
     
-    # Инициализируем мир
-    world, time_manager = setup_world()
-    update_canvas(window, world)
-    window['-STATS-'].update(calculate_stats(world))
-    
-    # Переменные для управления симуляцией
-    running = False
-    speed = 5  # Скорость симуляции (обновлений в секунду)
-    current_tick = 0
-    selected_entity = None
+    # Мир принадлежит потоку симуляции; окно только отправляет команды и рисует кадры
+    worker = SimulationWorker(
+        new_timeline(*setup_world()),
+        describe=describe_animal,
+        stats=calculate_stats,
+        ticks_per_sec=5,
+        max_ticks=MAX_SIMULATION_TICKS,
+        recorder=TimeSeriesRecorder(),
+    )
+    worker.start()
+    shown = {}
     
     # Основной цикл обработки событий
     while True:
-        event, values = window.read(timeout=100 if running else None)
+        event, values = window.read(timeout=FRAME_MS)
         
         if event == sg.WINDOW_CLOSED:
             break
             
         if event == '-START-':
-            running = True
-            window['-START-'].update(disabled=True)
-            window['-PAUSE-'].update(disabled=False)
+            worker.start_running()
             
         if event == '-PAUSE-':
-            running = False
-            window['-START-'].update(disabled=False)
-            window['-PAUSE-'].update(disabled=True)
+            worker.pause()
             
         if event == '-RESET-':
-            running = False
-            window['-START-'].update(disabled=False)
-            window['-PAUSE-'].update(disabled=True)
-            world, time_manager = setup_world()
-            window['-TICKS-'].update(0)
-            current_tick = 0
-            update_canvas(window, world)
-            window['-STATS-'].update(calculate_stats(world))
-            window['-PHASE-'].update(time_manager.current_phase)
+            profile = values['-PROFILE-']
+            worker.submit(lambda worker: replace_timeline(worker, new_timeline(*setup_world(), profile=profile)))
             
-        if event == '-TICKS-':
-            target_tick = int(values['-TICKS-'])
+        if event == '-SAVE-':
+            path = sg.popup_get_file('Сохранить снимок мира', save_as=True, default_extension='.npz',
+                                     file_types=(('Снимок мира', '*.npz'),))
+            if path:
+                worker.submit(lambda worker: save_snapshot(path, worker.timeline.world, worker.timeline.time_manager,
+                                                           tick=worker.timeline.tick))
             
-            # Обновляем симуляцию до нужного тика
-            world, time_manager, current_tick = run_simulation_for_ticks(world, time_manager, target_tick, current_tick)
-                
-            window['-PHASE-'].update(time_manager.current_phase)
+        if event == '-LOAD-':
+            path = sg.popup_get_file('Загрузить снимок мира', file_types=(('Снимок мира', '*.npz'),))
+            if path:
+                profile = values['-PROFILE-']
+                # Перемотка назад возможна только до тика загруженного снимка
+                worker.submit(lambda worker: replace_timeline(worker, new_timeline(*load_snapshot(path), profile=profile)))
+            
+        if event == '-PROFILE-':
+            enabled = values['-PROFILE-']
+            worker.submit(lambda worker: toggle_profiler(worker, enabled))
             
-            # Обновляем отображение
-            update_canvas(window, world, selected_entity)
-            window['-STATS-'].update(calculate_stats(world))
+        if event in ('-SPEED-', '-FAST-'):
+            worker.set_speed(target_speed(values))
+            
+        if event == '-TICKS-':
+            # Лента времени перематывает мир до нужного тика (вперед или назад)
+            worker.seek(int(values['-TICKS-']))
             
         if event == '-MAP-':
             # Обработка клика мыши по карте для выбора животного
             mouse_x, mouse_y = values['-MAP-']
-            selected_entity = highlight_animal_and_actions(window, world, mouse_x, mouse_y)
-            
-        if running:
-            # Автоматическое обновление симуляции при работе
-            speed = values['-SPEED-']
-            
-            # Увеличиваем тик
-            current_tick += 1
-            if current_tick > MAX_SIMULATION_TICKS:
-                current_tick = MAX_SIMULATION_TICKS
-                running = False
-                window['-START-'].update(disabled=False)
-                window['-PAUSE-'].update(disabled=True)
-            
-            window['-TICKS-'].update(current_tick)
-            
-            # Обновляем симуляцию
-            world.tick()
-            time_manager.advance_time()
-            
-            window['-PHASE-'].update(time_manager.current_phase)
-            
-            # Обновляем отображение
-            if selected_entity and selected_entity.world:  # Проверяем, что выбранное животное все еще существует
-                update_canvas(window, world, selected_entity)
-            else:
-                selected_entity = None
-                update_canvas(window, world)
+            worker.select(int(mouse_x / CELL_SIZE), int(mouse_y / CELL_SIZE))
             
-            window['-STATS-'].update(calculate_stats(world))
+        # Рисуем самый свежий кадр; промежуточные кадры поток симуляции уже пропустил
+        frame = worker.frames.take()
+        if frame is not None:
+            show_frame(window, frame, shown)
             
+    worker.stop()
+    _renderers.pop(window['-MAP-'], None)
     window.close()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,71 @@
+"""
+Потоковое чтение лога симуляции вместе со сжатыми сегментами
+
+Пример:
+    python log_reader.py --from-tick 100 --to-tick 200 --entity Pauvre
+"""
+import argparse
+import gzip
+import os
+import re
+import sys
+import config
+from log_writer import segment_paths
+
+# Поля, которые добавляет logger.FILE_FORMAT
+CONTEXT_PATTERN = re.compile(r' tick=(\S+) entity=(\S+) ')
+
+
+def iter_log_files(path):
+    """Возвращает сжатые сегменты от старых к новым, затем текущий файл"""
+    files = segment_paths(path)
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def iter_lines(path):
+    """Построчно читает все сегменты лога, не распаковывая их на диск"""
+    for file_path in iter_log_files(path):
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'rt', encoding='utf-8') as stream:
+            yield from stream
+
+
+def iter_records(path, from_tick=None, to_tick=None, entity=None):
+    """
+    Фильтрует строки лога по диапазону тиков (включительно) и типу сущности.
+    Строки без тика проходят только если диапазон не задан
+    """
+    for line in iter_lines(path):
+        match = CONTEXT_PATTERN.search(line)
+        if match is None:
+            continue
+        tick, entity_type = match.groups()
+        if from_tick is not None or to_tick is not None:
+            if tick == '-':
+                continue
+            tick = int(tick)
+            if from_tick is not None and tick < from_tick:
+                continue
+            if to_tick is not None and tick > to_tick:
+                continue
+        if entity is not None and entity_type != entity:
+            continue
+        yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Фильтрация лога симуляции по тикам и типу сущности")
+    parser.add_argument('path', nargs='?', default=config.LOG_FILE_NAME)
+    parser.add_argument('--from-tick', type=int)
+    parser.add_argument('--to-tick', type=int)
+    parser.add_argument('--entity', help="Имя класса сущности, например Pauvre")
+    args = parser.parse_args(argv)
+
+    for line in iter_records(args.path, args.from_tick, args.to_tick, args.entity):
+        sys.stdout.write(line)
+
+
+if __name__ == '__main__':
+    main()
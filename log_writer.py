@@ -0,0 +1,135 @@
+import atexit
+import glob
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+
+# Маркер остановки фонового потока
+_STOP = object()
+
+
+class RotatingGzipWriter:
+    """
+    Пишет строки в файл и при превышении max_bytes закрывает сегмент:
+    simulation.log сжимается в simulation.log.000001.gz, .000002.gz и т.д.
+    (больший номер - более новый сегмент). Если max_segments > 0, самые старые
+    сжатые сегменты удаляются
+    """
+    def __init__(self, path, max_bytes, max_segments=0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self.stream = open(path, 'a', encoding='utf-8')
+        self.size = self.stream.tell()
+        self.segment = max([segment_number(p) for p in segment_paths(path)], default=0)
+
+    def write(self, text):
+        self.stream.write(text)
+        self.size += len(text)
+        if self.max_bytes and self.size >= self.max_bytes:
+            self.rotate()
+
+    def flush(self):
+        self.stream.flush()
+
+    def rotate(self):
+        self.stream.close()
+        self.segment += 1
+        with open(self.path, 'rb') as source, gzip.open(f"{self.path}.{self.segment:06d}.gz", 'wb') as target:
+            shutil.copyfileobj(source, target)
+        if self.max_segments:
+            for old in segment_paths(self.path)[:-self.max_segments]:
+                os.remove(old)
+        self.stream = open(self.path, 'w', encoding='utf-8')
+        self.size = 0
+
+    def close(self):
+        self.stream.close()
+
+
+def segment_paths(path):
+    """Возвращает сжатые сегменты лога от старых к новым"""
+    return sorted(glob.glob(f"{glob.escape(path)}.*.gz"), key=segment_number)
+
+
+def segment_number(segment_path):
+    return int(segment_path.rsplit('.', 2)[-2])
+
+
+class BoundedQueueHandler(logging.Handler):
+    """
+    Обработчик, который только кладет запись в ограниченную очередь.
+    Форматирование и запись выполняет фоновый поток; при переполнении очереди
+    запись отбрасывается, чтобы не тормозить поток симуляции
+    """
+    def __init__(self, record_queue):
+        super().__init__()
+        self.queue = record_queue
+        self.dropped = 0
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogWriterThread(threading.Thread):
+    """
+    Фоновый поток: забирает записи из очереди пачками до batch_size,
+    форматирует их и одной операцией дописывает в RotatingGzipWriter
+    """
+    def __init__(self, record_queue, writer, formatter, handler, batch_size=512):
+        super().__init__(name='log-writer', daemon=True)
+        self.queue = record_queue
+        self.writer = writer
+        self.formatter = formatter
+        self.handler = handler
+        self.batch_size = batch_size
+        self.reported_drops = 0
+
+    def run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for record in batch:
+                if record is _STOP:
+                    running = False
+                    continue
+                lines.append(self.formatter.format(record) + '\n')
+            if self.handler.dropped != self.reported_drops:
+                lines.append(f"[log-writer] dropped {self.handler.dropped - self.reported_drops} records: queue is full\n")
+                self.reported_drops = self.handler.dropped
+            if lines:
+                self.writer.write(''.join(lines))
+                self.writer.flush()
+        self.writer.close()
+
+    def stop(self):
+        self.queue.put(_STOP)
+        self.join()
+
+
+def start_file_pipeline(path, formatter, queue_size, max_bytes, max_segments=0):
+    """
+    Запускает конвейер записи лога в файл и возвращает обработчик для логгеров.
+    Поток останавливается и дописывает очередь при завершении процесса
+    """
+    record_queue = queue.Queue(maxsize=queue_size)
+    handler = BoundedQueueHandler(record_queue)
+    writer = RotatingGzipWriter(path, max_bytes, max_segments)
+    thread = LogWriterThread(record_queue, writer, formatter, handler)
+    thread.start()
+    atexit.register(thread.stop)
+    handler.writer_thread = thread
+    return handler
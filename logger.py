@@ -1,20 +1,137 @@
 import logging
-from config import LOG_TO_FILE, LOG_FILE_NAME
+import config
 
+# Общие обработчики создаются один раз на процесс и подключаются ко всем логгерам
+_handlers = None
+_loggers = {}
+_level = logging.getLevelName(config.LOG_LEVEL)
+_current_tick = None
+
+# Формат файла содержит тик и тип сущности, по ним фильтрует log_reader.py
+FILE_FORMAT = '%(asctime)s [%(levelname)s] tick=%(tick)s entity=%(entity)s %(name)s: %(message)s'
+
+
+class ContextFilter(logging.Filter):
+    """Добавляет к записи номер текущего тика и тип сущности (если он не задан)"""
+    def filter(self, record):
+        record.tick = '-' if _current_tick is None else _current_tick
+        if not hasattr(record, 'entity'):
+            record.entity = '-'
+        return True
+
+
+def set_current_tick(tick):
+    """Запоминает номер тика, который попадет во все следующие записи лога"""
+    global _current_tick
+    _current_tick = tick
 
-def setup_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
 
-    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+class LazyFileHandler(logging.Handler):
+    """
+    Файловый обработчик, который открывает файл лога и запускает фоновую
+    запись только при первой записи. Логгеры создаются при импорте модулей,
+    поэтому импорт ядра не создает файлов и потоков, пока ничего не логируется
+    """
+    def __init__(self, formatter):
+        super().__init__()
+        self.file_formatter = formatter
+        self.target = None
 
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    def emit(self, record):
+        if self.target is None:
+            # Запись в файл идет в фоновом потоке: поток симуляции только кладет запись в очередь
+            from log_writer import start_file_pipeline
+            self.target = start_file_pipeline(
+                config.LOG_FILE_NAME,
+                self.file_formatter,
+                queue_size=config.LOG_QUEUE_SIZE,
+                max_bytes=config.LOG_MAX_BYTES,
+                max_segments=config.LOG_MAX_SEGMENTS,
+            )
+        self.target.emit(record)
 
-    if LOG_TO_FILE:
-        file_handler = logging.FileHandler(LOG_FILE_NAME)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
 
+def _get_handlers():
+    global _handlers
+    if _handlers is None:
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+        context_filter = ContextFilter()
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        _handlers = [console_handler]
+
+        if config.LOG_TO_FILE:
+            file_handler = LazyFileHandler(logging.Formatter(FILE_FORMAT))
+            file_handler.addFilter(context_filter)
+            _handlers.append(file_handler)
+    return _handlers
+
+
+def setup_logger(name):
+    """
+    Возвращает логгер с общими обработчиками. Повторный вызов с тем же
+    именем не добавляет новых обработчиков
+    """
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = logging.getLogger(name)
+        logger.setLevel(_level)
+        logger.propagate = False
+        for handler in _get_handlers():
+            logger.addHandler(handler)
+        _loggers[name] = logger
     return logger
+
+
+class EventCategory:
+    """
+    Категория событий симуляции (перемещения, питание, размножение и т.д.).
+
+    В горячем пути проверяется только атрибут enabled, поэтому при выключенной
+    категории или уровне выше DEBUG сообщение не форматируется и не
+    собираются его аргументы:
+
+        if MOVEMENT.enabled:
+            MOVEMENT.log(self, "moved to (%s, %s)", new_x, new_y)
+    """
+    def __init__(self, name):
+        self.name = name
+        self.logger = setup_logger(f"events.{name}")
+        self.switched_on = name in config.LOG_CATEGORIES
+        self.enabled = False
+        self.refresh()
+
+    def refresh(self):
+        self.enabled = self.switched_on and self.logger.isEnabledFor(logging.DEBUG)
+
+    def log(self, entity, msg, *args):
+        self.logger.debug(msg, *args, extra={'entity': type(entity).__name__})
+
+
+MOVEMENT = EventCategory('movement')
+FEEDING = EventCategory('feeding')
+REPRODUCTION = EventCategory('reproduction')
+PLANT_SPREAD = EventCategory('plant_spread')
+GROUPING = EventCategory('grouping')
+LIFECYCLE = EventCategory('lifecycle')
+
+CATEGORIES = {category.name: category for category in
+              (MOVEMENT, FEEDING, REPRODUCTION, PLANT_SPREAD, GROUPING, LIFECYCLE)}
+
+
+def set_category_enabled(name, enabled):
+    """Включает или выключает отдельную категорию событий"""
+    category = CATEGORIES[name]
+    category.switched_on = enabled
+    category.refresh()
+
+
+def set_log_level(level):
+    """Меняет уровень всех логгеров симуляции и пересчитывает флаги категорий"""
+    global _level
+    _level = logging.getLevelName(level) if isinstance(level, str) else level
+    for logger in _loggers.values():
+        logger.setLevel(_level)
+    for category in CATEGORIES.values():
+        category.refresh()
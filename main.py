@@ -1,6 +1,10 @@
 import random
-from world.grid import Grid
+from world import create_grid
 from world.time_manager import TimeManager
+from world.profiler import TickProfiler
+from world.snapshot import save_snapshot, load_snapshot
+from world.tiled_tick import TiledTicker
+from recorder import TimeSeriesRecorder
 from entities.animals.malheureux import Malheureux
 from entities.animals.pauvre import Pauvre
 from entities.plants.lumiere import Lumiere
@@ -9,14 +13,11 @@ from entities.plants.demi import Demi
 from entities.group import Group
 from meta_classes import entity_registry
 import config
-from logger import setup_logger
+from logger import setup_logger, set_current_tick
 
 logger = setup_logger("main")
 
 
-def create_empty_grid(width, height):
-    return [[None for _ in range(width)] for _ in range(height)]
-
 
 def spawn_animals(world, time_manager, entity_class, count):
     pauvre_groups = [Group(i) for i in range(1, 6)]
@@ -32,7 +33,7 @@ def spawn_animals(world, time_manager, entity_class, count):
             elif entity_class.__name__ == 'Malheureux':
                 group = random.choice(malheureux_groups)
 
-            if world.cells[y][x] is None:
+            if world.is_empty(x, y):
                 entity = entity_class(x, y, world, time_manager, group)
                 world.place_entity(entity, x, y)
                 group.add_member(entity)
@@ -46,7 +47,7 @@ def spawn_plants(world, time_manager, entity_class, count):
             x = random.randint(0, world.width - 1)
             y = random.randint(0, world.height - 1)
 
-            if world.cells[y][x] is None:
+            if world.is_empty(x, y):
                 entity = entity_class(x, y, symbol=None, world=world, timer=time_manager)
                 world.place_entity(entity, x, y)
                 logger.info(f"Spawned {entity_class.__name__} at ({x}, {y})")
@@ -55,19 +56,14 @@ def spawn_plants(world, time_manager, entity_class, count):
 
 def log_entity_counts(world):
     """Подсчитывает и логирует количество каждого типа сущностей в мире"""
-    counts = {}
-    for row in world.cells:
-        for cell in row:
-            if cell is not None:
-                entity_type = type(cell).__name__
-                if entity_type in counts:
-                    counts[entity_type] += 1
-                else:
-                    counts[entity_type] = 1
+    population = world.population_stats()
     
     logger.info("--- Entity counts ---")
-    for entity_type, count in counts.items():
-        logger.info(f"{entity_type}: {count}")
+    for entity_type, species in population.items():
+        if species.is_plant:
+            logger.info(f"{entity_type}: {species.count} (growing: {species.growing})")
+        else:
+            logger.info(f"{entity_type}: {species.count} (avg hunger: {species.avg_hunger:.1f})")
     logger.info("---------------------")
 
 
@@ -108,36 +104,72 @@ def main():
     # Логирование информации о зарегистрированных классах
     log_registry_info()
     
-    # Создание мира и таймера
-    cells = create_empty_grid(config.GRID_WIDTH, config.GRID_HEIGHT)
-    world = Grid(config.GRID_WIDTH, config.GRID_HEIGHT, cells)
-    time_manager = TimeManager(config.TICKS_PER_PHASE)
-    
-    # Размещение растений
-    spawn_plants(world, time_manager, Lumiere, config.INITIAL_LUMIERE_COUNT)
-    spawn_plants(world, time_manager, Obscurite, config.INITIAL_OBSCURITE_COUNT)
-    spawn_plants(world, time_manager, Demi, config.INITIAL_DEMI_COUNT)
-    
-    # Размещение животных
-    spawn_animals(world, time_manager, Pauvre, config.INITIAL_PAUVRE_COUNT)
-    spawn_animals(world, time_manager, Malheureux, config.INITIAL_MALHEUREUX_COUNT)
+    random.seed(config.SEED)
+    if config.RESUME_SNAPSHOT:
+        # Продолжение прерванного прогона с сохраненного снимка
+        world, time_manager, start_tick = load_snapshot(config.RESUME_SNAPSHOT)
+        if config.SEED is not None:
+            # Продолжение с того же снимка и с тем же сидом воспроизводимо
+            world.rng.seed(config.SEED, start_tick)
+    else:
+        # Создание мира и таймера
+        world = create_grid(config.GRID_WIDTH, config.GRID_HEIGHT, seed=config.SEED)
+        time_manager = TimeManager(config.TICKS_PER_PHASE)
+        start_tick = 0
+        
+        # Размещение растений
+        spawn_plants(world, time_manager, Lumiere, config.INITIAL_LUMIERE_COUNT)
+        spawn_plants(world, time_manager, Obscurite, config.INITIAL_OBSCURITE_COUNT)
+        spawn_plants(world, time_manager, Demi, config.INITIAL_DEMI_COUNT)
+        
+        # Размещение животных
+        spawn_animals(world, time_manager, Pauvre, config.INITIAL_PAUVRE_COUNT)
+        spawn_animals(world, time_manager, Malheureux, config.INITIAL_MALHEUREUX_COUNT)
+    tiled = config.TILED_WORKERS and world.BACKEND == 'arrays'
+    if config.PROFILE_TICKS and tiled:
+        # Рабочие процессы ходят в своих копиях мира, профилировщик их не увидит
+        logger.warning("PROFILE_TICKS is ignored with TILED_WORKERS: tiled ticks run in worker processes")
+    profiler = TickProfiler().attach(world) if config.PROFILE_TICKS and not tiled else None
+    recorder = TimeSeriesRecorder()
+    recorder.record(start_tick, world)
+    tiler = None
+    if tiled:
+        tiler = TiledTicker(world, workers=config.TILED_WORKERS, tile_size=config.TILE_SIZE,
+                            seed=config.SEED or 0)
     
     # Логирование начального состояния
     log_entity_counts(world)
     
     # Главный цикл симуляции
-    for tick in range(config.SIMULATION_TICKS):
+    for tick in range(start_tick, config.SIMULATION_TICKS):
+        set_current_tick(tick + 1)
         logger.info(f"\n\n=== Tick {tick + 1} | Time phase: {time_manager.current_phase} ===")
         world.tick()
         time_manager.advance_time()
+        recorder.record(tick + 1, world)
         
         # Логирование каждые несколько тиков
         if (tick + 1) % 10 == 0:
             log_entity_counts(world)
+            if profiler is not None:
+                logger.info("\n" + profiler.table(last_tick=True))
+        
+        if config.SNAPSHOT_EVERY and (tick + 1) % config.SNAPSHOT_EVERY == 0:
+            save_snapshot(config.SNAPSHOT_PATH, world, time_manager, tick=tick + 1)
+    
+    if tiler is not None:
+        tiler.close()
     
     # Логирование финального состояния
     logger.info("\n=== Final state ===")
     log_entity_counts(world)
+    if profiler is not None:
+        logger.info("\n" + profiler.table())
+        profiler.detach(world)
+    if config.SERIES_CSV:
+        recorder.to_csv(config.SERIES_CSV)
+    if config.SERIES_NPZ:
+        recorder.to_npz(config.SERIES_NPZ)
     logger.info("Simulation completed.")
 
 
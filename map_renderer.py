@@ -0,0 +1,153 @@
+from logger import setup_logger
+
+logger = setup_logger("map_renderer")
+
+
+class MapRenderer:
+    """
+    Инкрементальная отрисовка карты на sg.Graph.
+
+    Линии сетки рисуются один раз. Для каждой занятой клетки хранится id ее
+    фигуры и то, как она нарисована; после тика перерисовываются только
+    клетки из world.dirty (их отмечает сам мир при изменениях), поэтому время
+    кадра зависит от числа изменений, а не от размера сетки. Фигура
+    перекрашивается на месте, если ее форма не изменилась, иначе удаляется
+    и рисуется заново. Подсветка клеток действия выбранного животного
+    обновляется так же - меняются только клетки, которые вошли в нее или вышли
+    """
+    def __init__(self, graph, width, height, cell_size, colors, plant_types, highlight_color):
+        self.graph = graph
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.colors = colors
+        self.plant_types = set(plant_types)
+        self.highlight_color = highlight_color
+        self.world = None
+        self.figures = {}     # (x, y) -> (вид отрисовки, id фигуры)
+        self.highlights = {}  # (x, y) -> id прямоугольника подсветки
+        self.selected = None  # клетка выбранного животного
+        self.cells = {}       # копия карты из кадров: (x, y) -> (имя вида, голод)
+        self._draw_grid_lines()
+
+    def _draw_grid_lines(self):
+        right, top = self.width * self.cell_size, self.height * self.cell_size
+        for x in range(0, right + 1, self.cell_size):
+            self.graph.draw_line((x, 0), (x, top), color='gray')
+        for y in range(0, top + 1, self.cell_size):
+            self.graph.draw_line((0, y), (right, y), color='gray')
+
+    def _appearance(self, entity_type, hunger, selected):
+        """Ключ отрисовки: фигура, цвет и, для животных, радиус и толщина обводки"""
+        color = self.colors.get(entity_type, 'black')
+        if entity_type in self.plant_types:
+            return ('rect', color)
+        # Радиус круга зависит от уровня голода
+        scale = min(1.0, hunger / 100.0) if hunger is not None else 1.0
+        return ('circle', color, int(self.cell_size / 2 * scale), 3 if selected else 1)
+
+    def _draw(self, x, y, appearance):
+        pixel_x, pixel_y = x * self.cell_size, y * self.cell_size
+        if appearance[0] == 'rect':
+            return self.graph.draw_rectangle(
+                (pixel_x, pixel_y),
+                (pixel_x + self.cell_size, pixel_y + self.cell_size),
+                fill_color=appearance[1],
+                line_color='black'
+            )
+        return self.graph.draw_circle(
+            (pixel_x + self.cell_size / 2, pixel_y + self.cell_size / 2),
+            appearance[2],
+            fill_color=appearance[1],
+            line_color='black',
+            line_width=appearance[3]
+        )
+
+    def _redraw_cell(self, x, y, cell):
+        """cell - (имя вида, голод или None) или None для пустой клетки"""
+        appearance = None if cell is None else self._appearance(cell[0], cell[1], (x, y) == self.selected)
+        current = self.figures.get((x, y))
+        if current is not None and current[0] == appearance:
+            return
+        if current is not None and appearance is not None and current[0][0] == appearance[0] \
+                and current[0][2:3] == appearance[2:3]:
+            # Та же фигура того же размера: меняем только цвет и обводку
+            options = {'fill': appearance[1]}
+            if appearance[0] == 'circle':
+                options['width'] = appearance[3]
+            self.graph.TKCanvas.itemconfig(current[1], **options)
+            self.figures[(x, y)] = (appearance, current[1])
+            return
+        if current is not None:
+            self.graph.delete_figure(current[1])
+            del self.figures[(x, y)]
+        if appearance is not None:
+            self.figures[(x, y)] = (appearance, self._draw(x, y, appearance))
+
+    def _update_highlights(self, cells):
+        for cell in list(self.highlights):
+            if cell not in cells:
+                self.graph.delete_figure(self.highlights.pop(cell))
+        for x, y in cells:
+            if (x, y) not in self.highlights:
+                pixel_x, pixel_y = x * self.cell_size, y * self.cell_size
+                figure = self.graph.draw_rectangle(
+                    (pixel_x, pixel_y),
+                    (pixel_x + self.cell_size, pixel_y + self.cell_size),
+                    fill_color=self.highlight_color,
+                    line_color=None
+                )
+                # Подсветка лежит под сущностями
+                self.graph.send_figure_to_back(figure)
+                self.highlights[(x, y)] = figure
+
+    def _select(self, selected, action_cells, changed):
+        if selected != self.selected:
+            for cell in (self.selected, selected):
+                if cell is not None:
+                    changed.add(cell)
+            self.selected = selected
+        self._update_highlights(action_cells)
+
+    def update(self, world, selected_entity=None):
+        """Перерисовывает изменившиеся клетки и возвращает их количество"""
+        if world is not self.world or world.dirty is None:
+            # Новый мир (сброс, загрузка, кадр ленты времени): сравниваем все
+            # нарисованные и все занятые клетки, дальше отслеживаем изменения
+            changed = set(self.figures)
+            changed.update((entity.x, entity.y) for entity in world.iter_entities())
+            self.world = world
+        else:
+            changed = world.dirty
+        world.dirty = set()
+
+        selected = None
+        action_cells = []
+        if selected_entity is not None and selected_entity.x is not None:
+            selected = (selected_entity.x, selected_entity.y)
+            action_cells = [(selected[0] + dx, selected[1] + dy)
+                            for dx, dy in world.neighbor_offsets(*selected)]
+        self._select(selected, action_cells, changed)
+
+        for x, y in changed:
+            entity = world.get_entity(x, y)
+            self._redraw_cell(x, y, None if entity is None else
+                              (type(entity).__name__, getattr(entity, 'hunger', None)))
+        return len(changed)
+
+    def draw_frame(self, frame):
+        """
+        Рисует кадр sim_worker.Frame: frame.cells - только изменившиеся клетки,
+        они применяются к копии карты self.cells, мир не читается
+        """
+        cells = self.cells
+        for cell, value in frame.cells.items():
+            if value is None:
+                cells.pop(cell, None)
+            else:
+                cells[cell] = value
+        changed = set(frame.changed)
+        self._select(frame.selected, frame.action_cells, changed)
+        for x, y in changed:
+            self._redraw_cell(x, y, cells.get((x, y)))
+        return len(changed)
@@ -1,7 +1,7 @@
-from logger import setup_logger
+from logger import setup_logger, MOVEMENT, FEEDING, REPRODUCTION, PLANT_SPREAD, GROUPING, LIFECYCLE
 import types
-import copy
-import random
+from collections import namedtuple
+from itertools import accumulate
 
 logger = setup_logger(__name__)
 
@@ -11,22 +11,62 @@ entity_registry = {
     'animals': {}
 }
 
+
+def make_clone(fields):
+    """
+    Генерирует метод clone для класса с заданным набором полей состояния
+    """
+    def clone(self):
+        cls = type(self)
+        new_entity = cls.__new__(cls)
+        for field in fields:
+            setattr(new_entity, field, getattr(self, field))
+        return new_entity
+
+    return clone
+
+
+# Строки таблиц поведения вида в одной фазе (TimeManager.table).
+# capture - {активность соседа: накопленные веса [захват, нет]}
+PlantPhase = namedtuple('PlantPhase', ['active', 'is_growing', 'capture'])
+# active - делает ли животное ход; eat_mode - как оно ест в этой фазе
+AnimalPhase = namedtuple('AnimalPhase', ['active', 'eat_mode'])
+
+# Режимы питания: в активной фазе животное ищет еду при каждом вызове eat,
+# вне ее - только с вероятностью 1/3
+EAT_FORAGE = 0
+EAT_OPPORTUNISTIC = 1
+
+
+def capture_weights(active, neighbor_active):
+    """Накопленные веса захвата соседнего растения: [захват, захват + отказ]"""
+    return list(accumulate([0.5 + 0.25*active - 0.25*neighbor_active,
+                            0.5 - 0.25*active + 0.25*neighbor_active]))
+
+
 class EcosystemMeta(type):
     """
     Базовый метакласс для сущностей в экосистеме
     """
     def __new__(mcs, name, bases, attrs):
+        # Виды (в том числе созданные entity_factory) не заводят __dict__:
+        # состояние особи лежит в слотах Entity, Plant и Animal
+        attrs.setdefault('__slots__', ())
         # Создаем новый класс
         cls = super().__new__(mcs, name, bases, attrs)
         
+        # Генерируем быстрый метод клонирования, если класс не определил свой
+        if 'clone' not in attrs:
+            cls.clone = make_clone(tuple(getattr(cls, 'CLONE_FIELDS', ())))
+        
         # Регистрируем класс в соответствующем реестре
         if name != 'Plant' and name != 'Animal':
             if 'Plant' in [base.__name__ for base in bases]:
                 entity_registry['plants'][name] = cls
-                logger.debug(f"Registered Plant class: {name}")
+                logger.debug("Registered Plant class: %s", name)
             elif 'Animal' in [base.__name__ for base in bases]:
                 entity_registry['animals'][name] = cls
-                logger.debug(f"Registered Animal class: {name}")
+                logger.debug("Registered Animal class: %s", name)
         
         return cls
 
@@ -41,45 +81,62 @@ class EvalPlantMeta(EcosystemMeta):
             active_phases = attrs.get('ACTIVE_PHASES', [])
             semi_active_phases = attrs.get('SEMI_ACTIVE_PHASES', [])
             inactive_phases = attrs.get('INACTIVE_PHASES', [])
+            rows = {}
+            
+            def phase_row(phase):
+                row = rows.get(phase)
+                if row is None:
+                    if phase in active_phases:
+                        active, is_growing = 1, True
+                    elif phase in inactive_phases:
+                        active, is_growing = 0, False
+                    else:
+                        active, is_growing = 0.5, True
+                    # Активность соседа - один из уровней покоя, полуактивности и активности
+                    capture = {level: capture_weights(active, level) for level in (0, 0.5, 1)}
+                    row = rows[phase] = PlantPhase(active, is_growing, capture)
+                return row
             
             def grow(self):
-                if self.timer.current_phase in active_phases:
-                    self.is_growing = True
-                    self.active = 1
-                elif self.timer.current_phase in inactive_phases:
-                    self.is_growing = False
-                    self.active = 0
-                else:
-                    self.is_growing = True
-                    self.active = 0.5
+                was_growing = self.is_growing
+                row = self.timer.tables.get(type(self)) or self.timer.table(type(self))
+                self.is_growing = row.is_growing
+                self.active = row.active
+                if self.world is not None and bool(was_growing) != self.is_growing:
+                    self.world.growing_changed(self, self.is_growing)
                 
                 if self.is_growing:
                     if self.world is not None:
-                        neighbors = self.world.get_neighbors(self.x, self.y)
-                        for neighbor in neighbors:
-                            is_grow = random.choice(range(30))
-                            if neighbor[0] is not None and type(type(neighbor[0])) == EvalPlantMeta and is_grow == 0:
-                                if type(self) != type(neighbor[0]):
-                                    captured = random.choices(
-                                        [True, False], 
-                                        weights=[0.5 + 0.25*self.active - 0.25*neighbor[0].active, 
-                                                0.5 - 0.25*self.active + 0.25*neighbor[0].active]
-                                    )[0]
-                                    if captured:
-                                        x, y = neighbor[0].x, neighbor[0].y
-                                        logger.debug(f"Plant {self.symbol} at ({self.x}, {self.y}) captured {neighbor[0].symbol} at ({x}, {y})")
-                                        self.world.remove_entity(neighbor[0])
-                                        self.world.duplicate_entity(self, x, y)
+                        world = self.world
+                        rng = world.rng
+                        for dx, dy in world.neighbor_offsets(self.x, self.y):
+                            nx, ny = self.x + dx, self.y + dy
+                            neighbor = world.get_entity(nx, ny)
+                            is_grow = rng.below(30)
+                            if neighbor is not None and type(type(neighbor)) == EvalPlantMeta and is_grow == 0:
+                                if type(self) != type(neighbor):
+                                    weights = row.capture.get(neighbor.active)
+                                    if weights is None:
+                                        weights = capture_weights(self.active, neighbor.active)
+                                    if rng.random() * weights[1] < weights[0]:
+                                        x, y = neighbor.x, neighbor.y
+                                        if PLANT_SPREAD.enabled:
+                                            PLANT_SPREAD.log(self, "Plant %s at (%s, %s) captured %s at (%s, %s)", self.symbol, self.x, self.y, neighbor.symbol, x, y)
+                                        world.remove_entity(neighbor)
+                                        world.duplicate_entity(self, x, y)
+                                        world.captures += 1
                                         break
-                            elif neighbor[0] is None and is_grow == 0:
-                                logger.debug(f"Plant {self.symbol} at ({self.x}, {self.y}) spread to empty space at ({neighbor[1]}, {neighbor[2]})")
-                                self.world.duplicate_entity(self, neighbor[1], neighbor[2])
+                            elif neighbor is None and is_grow == 0:
+                                if PLANT_SPREAD.enabled:
+                                    PLANT_SPREAD.log(self, "Plant %s at (%s, %s) spread to empty space at (%s, %s)", self.symbol, self.x, self.y, nx, ny)
+                                world.duplicate_entity(self, nx, ny)
                                 break
 
             def act(self):
                 self.grow()
             
             # Инжектируем методы
+            attrs['phase_row'] = staticmethod(phase_row)
             attrs['grow'] = grow
             attrs['act'] = act
         
@@ -87,9 +144,182 @@ class EvalPlantMeta(EcosystemMeta):
         return super().__new__(mcs, name, bases, attrs)
 
 
+# Направления шага (кортеж не пересоздается на вызов)
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Действия act; номер действия - world.rng.below(len(ACTIONS))
+MOVE, EAT, REPRODUCE, FORM_GROUP = ACTIONS = (0, 1, 2, 3)
+
+# Условия размножения по стратегии и поедания своего вида по чертам поведения.
+# Метакласс кладет их в reproduce_rule и eat_rule вида; действие включается,
+# когда вид присваивает правило своему reproduce_condition или eat_condition
+REPRODUCE_CONDITIONS = {
+    'same_group': lambda n1, n2: n1.group == n2.group,
+    'different_group': lambda n1, n2: n1.group != n2.group,
+}
+ANY_PARTNER = lambda n1, n2: True
+CANNIBAL_EAT = lambda n1, n2: type(n1) == type(n2) and n1.group != n2.group and n2.group.aggression == 0
+GROUP_EAT = lambda n1, n2: type(n1) == type(n2) and n1.group == n2.group
+
+
+def make_move(hungry):
+    """Шаг в случайном направлении; голодное (hungry) животное с голодом < 50 шагает в 1 случае из 3"""
+    def step(self):
+        world = self.world
+        if world is None or self.x is None or self.y is None:
+            return
+        direction = world.rng.choice(DIRECTIONS)
+        new_x, new_y = self.x + direction[0], self.y + direction[1]
+        if MOVEMENT.enabled:
+            MOVEMENT.log(self, "Animal %s at (%s, %s) moved to (%s, %s).", self.symbol, self.x, self.y, new_x, new_y)
+        world.move_entity(self, new_x, new_y)
+
+    if not hungry:
+        return step
+
+    def move(self):
+        if self.world is None or (self.hunger < 50 and self.world.rng.below(3) != 0):
+            return
+        step(self)
+
+    return move
+
+
+def make_eat(food_sources):
+    """
+    Поедание первого подходящего соседа. Источники пищи (имена видов)
+    разрешаются в классы: {класс: съедобен ли} заполняется по реестру при
+    создании вида, а виды, появившиеся позже, добавляются при первой встрече
+    """
+    food_names = frozenset(food_sources)
+    edible = {cls: name in food_names
+              for registry in entity_registry.values() for name, cls in registry.items()}
+
+    def feed(self, world):
+        x, y = self.x, self.y
+        for dx, dy in world.neighbor_offsets(x, y):
+            neighbor = world.get_entity(x + dx, y + dy)
+            if neighbor is None:
+                continue
+            food = edible.get(type(neighbor))
+            if food is None:
+                food = edible[type(neighbor)] = type(neighbor).__name__ in food_names
+            if not food:
+                condition = type(self).eat_condition
+                if condition is None or self.group.aggression != 1 or not condition(self, neighbor):
+                    continue
+            if FEEDING.enabled:
+                FEEDING.log(self, "Animal %s at (%s, %s) ate entity at (%s, %s).", self.symbol, self.x, self.y, neighbor.x, neighbor.y)
+            # Съеденное животное мир выводит из его группы
+            world.remove_entity(neighbor)
+            hunger = self.hunger
+            self.hunger = min(hunger + 100, 100)
+            world.hunger_changed(self, self.hunger - hunger)
+            world.mark_dirty(self.x, self.y)
+            break
+
+    def eat(self):
+        world = self.world
+        if world is None:
+            return
+        row = self.timer.tables.get(type(self)) or self.timer.table(type(self))
+        if row.eat_mode == EAT_OPPORTUNISTIC and world.rng.below(3) != 0:
+            return
+        feed(self, world)
+
+    return eat
+
+
+def reproduce(self):
+    """Рождение в свободной соседней клетке рядом с каждым подходящим партнером"""
+    condition = type(self).reproduce_condition
+    world = self.world
+    if condition is None or world is None:
+        return
+    cls = type(self)
+    for dx, dy in world.neighbor_offsets(self.x, self.y):
+        neighbor = world.get_entity(self.x + dx, self.y + dy)
+        if (type(neighbor) is cls and
+            self.group.aggression == 0 and
+            neighbor.group.aggression == 0 and
+            condition(self, neighbor)):
+            for edx, edy in world.neighbor_offsets(self.x, self.y):
+                ex, ey = self.x + edx, self.y + edy
+                if world.get_entity(ex, ey) is None:
+                    new_entity = self.clone()
+                    self.group.add_member(new_entity)
+                    new_entity.hunger = 100
+                    world.place_entity(new_entity, ex, ey)
+                    if REPRODUCTION.enabled:
+                        REPRODUCTION.log(self, "Animal %s at (%s, %s) reproduced with animal at (%s, %s) and animal at (%s, %s) was born.", self.symbol, self.x, self.y, neighbor.x, neighbor.y, new_entity.x, new_entity.y)
+                    break
+
+
+def form_group(self):
+    world = self.world
+    if world is None:
+        return
+    cls = type(self)
+    for dx, dy in world.neighbor_offsets(self.x, self.y):
+        neighbor = world.get_entity(self.x + dx, self.y + dy)
+        if (type(neighbor) is cls and
+            self.group.aggression == 0 and
+            neighbor.group.aggression == 0):
+            new_group = world.rng.choice((self.group, neighbor.group))
+            # Вступивший уходит из прежней группы, и его group меняется (add_member)
+            if self.group != new_group:
+                new_group.add_member(self)
+            else:
+                new_group.add_member(neighbor)
+            if GROUPING.enabled:
+                GROUPING.log(self, "Animal %s at (%s, %s) formed a group %s with animal at (%s, %s).", self.symbol, self.x, self.y, new_group.group_number, neighbor.x, neighbor.y)
+            break
+
+
+def act(self):
+    if not (self.timer.tables.get(type(self)) or self.timer.table(type(self))).active:
+        return
+    # Особь, выбывшая из мира раньше в этом тике (съедена, вытеснена), уже не ходит
+    # и не трогает группу, из которой вышла
+    world = self.world
+    if world is None:
+        return
+    if self.hunger < 50:
+        self.group.aggression = 1
+    if self.group.get_group_size() > 10:
+        self.group.split()
+
+    # Действия вызываются через атрибуты: профилировщик подменяет методы класса
+    action = world.rng.below(len(ACTIONS))
+    if action == MOVE:
+        self.move()
+    elif action == EAT:
+        self.eat()
+    elif action == REPRODUCE:
+        self.reproduce()
+    else:
+        self.form_group()
+
+    self.move()
+
+    self.hunger -= 1
+    world.hunger_changed(self, -1)
+    # Голод виден на карте (размер круга), поэтому клетка перерисовывается
+    if world.dirty is not None:
+        world.dirty.add((self.x, self.y))
+    if self.hunger <= 0:
+        if LIFECYCLE.enabled:
+            LIFECYCLE.log(self, "Animal %s at (%s, %s) died.", self.symbol, self.x, self.y)
+        world.remove_entity(self)
+        self.group.remove_member(self)
+
+
 class EvalAnimalMeta(EcosystemMeta):
     """
-    Метакласс для животных, который инжектирует методы в зависимости от текущего состояния среды
+    Метакласс для животных, который инжектирует методы в зависимости от текущего состояния среды.
+    Варианты move, eat и условий выбираются один раз при создании класса по
+    паттерну движения, источникам пищи, стратегии размножения и чертам поведения,
+    поэтому в ходе сущности нет сравнений строк
     """
     def __new__(mcs, name, bases, attrs):
         if name != 'Animal':
@@ -98,139 +328,34 @@ class EvalAnimalMeta(EcosystemMeta):
             food_sources = attrs.get('FOOD_SOURCES', [])
             movement_pattern = attrs.get('MOVEMENT_PATTERN', 'normal')
             reproduction_strategy = attrs.get('REPRODUCTION_STRATEGY', 'same_group')
-            \
-            if reproduction_strategy == 'same_group':
-                attrs['reproduce_condition'] = lambda n1, n2: n1.group == n2.group
-            elif reproduction_strategy == 'different_group':
-                attrs['reproduce_condition'] = lambda n1, n2: n1.group != n2.group
-            else:  # any
-                attrs['reproduce_condition'] = lambda n1, n2: True
-                
-            if 'cannibalism' in attrs.get('BEHAVIOR_TRAITS', []):
-                attrs['eat_condition'] = lambda n1, n2: type(n1) == type(n2) and n1.group != n2.group and n2.group.aggression == 0
-            else:
-                attrs['eat_condition'] = lambda n1, n2: type(n1) == type(n2) and n1.group == n2.group
-            
-            def move(self):
-                if movement_pattern == 'hungry' and self.hunger < 50:
-                    if random.choice([0, 1, 2]) == 0:
-                        direction = random.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
-                        if self.x is not None and self.y is not None:
-                            new_x, new_y = self.x + direction[0], self.y + direction[1]
-                            logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) moved to ({new_x}, {new_y}).")
-                            self.world.move_entity(self, new_x, new_y)
-                else:
-                    direction = random.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
-                    if self.x is not None and self.y is not None:
-                        new_x, new_y = self.x + direction[0], self.y + direction[1]
-                        logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) moved to ({new_x}, {new_y}).")
-                        self.world.move_entity(self, new_x, new_y)
+            # Фазы, в которых act что-то делает: по ним планировщик тика пропускает спящих
+            attrs['act_phases'] = frozenset(active_phases)
+            rows = {}
             
-            def eat(self):
-                if self.timer.current_phase not in active_phases:
-                    if random.choice([0, 1, 2]) == 0:
-                        neighbors = self.world.get_neighbors(self.x, self.y)
-                        for neighbor in neighbors:
-                            if (neighbor[0] is not None and 
-                                (type(neighbor[0]).__name__ in food_sources or 
-                                (self.group.aggression == 1 and self.eat_condition(self, neighbor[0])))):
-                                logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) ate entity at ({neighbor[0].x}, {neighbor[0].y}).")
-                                self.world.remove_entity(neighbor[0])
-                                if isinstance(neighbor[0], type(bases[0])):
-                                    neighbor[0].group.remove_member(neighbor[0])
-                                self.hunger += 100
-                                self.hunger = min(self.hunger, 100)
-                                break
-                else:
-                    if self.world is not None:
-                        neighbors = self.world.get_neighbors(self.x, self.y)
-                        for neighbor in neighbors:
-                            is_eat = False
-                            try:
-                                is_eat = self.eat_condition(self, neighbor[0])
-                            except TypeError:
-                                is_eat = False
-                            if (neighbor[0] is not None and 
-                                (type(neighbor[0]).__name__ in food_sources or 
-                                (self.group.aggression == 1 and is_eat))):
-                                logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) ate entity at ({neighbor[0].x}, {neighbor[0].y}).")
-                                self.world.remove_entity(neighbor[0])
-                                if isinstance(neighbor[0], type(bases[0])):
-                                    neighbor[0].group.remove_member(neighbor[0])
-                                self.hunger += 100
-                                self.hunger = min(self.hunger, 100)
-                                break
+            def phase_row(phase):
+                row = rows.get(phase)
+                if row is None:
+                    active = phase in active_phases
+                    row = rows[phase] = AnimalPhase(active, EAT_FORAGE if active else EAT_OPPORTUNISTIC)
+                return row
             
-            def reproduce(self):
-                if self.world is not None:
-                    neighbors = self.world.get_neighbors(self.x, self.y)
-                    for neighbor in neighbors:
-                        is_reproduce = False
-                        try:
-                            is_reproduce = self.reproduce_condition(self, neighbor[0])
-                        except TypeError:
-                            is_reproduce = False
-                        if (type(neighbor[0]) == type(self) and 
-                            self.group.aggression == 0 and 
-                            neighbor[0].group.aggression == 0 and
-                            is_reproduce):
-                            for n in neighbors:
-                                if n[0] is None:
-                                    new_entity = copy.deepcopy(self)
-                                    self.group.add_member(new_entity)
-                                    new_entity.hunger = 100
-                                    self.world.place_entity(new_entity, n[1], n[2])
-                                    logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) reproduced with animal at ({neighbor[0].x}, {neighbor[0].y}) and animal at ({new_entity.x}, {new_entity.y}) was born.")
-                                    break
-            
-            def form_group(self):
-                if self is not None and self.world is not None:
-                    neighbors = self.world.get_neighbors(self.x, self.y)
-                    for neighbor in neighbors:
-                        if (type(neighbor[0]) == type(self) and 
-                            self.group.aggression == 0 and 
-                            neighbor[0].group.aggression == 0):
-                            new_group = random.choice([self.group, neighbor[0].group])
-                            if self.group != new_group:
-                                neighbor[0].group.add_member(self)
-                                self.group.remove_member(self)
-                            else:
-                                self.group.add_member(neighbor[0])
-                                neighbor[0].group.remove_member(neighbor[0])
-                            logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) formed a group {new_group.group_number} with animal at ({neighbor[0].x}, {neighbor[0].y}).")
-                            break
-            
-            def act(self):
-                if self.timer.current_phase in active_phases:
-                    if self.hunger < 50:
-                        self.group.aggression = 1
-                    if self.group.get_group_size() > 10:
-                        self.group.split()
-                    
-                    action = random.choice(["move", "eat", "reproduce", "form_group"])
-                    if action == "move":
-                        self.move()
-                    elif action == "eat":
-                        self.eat()
-                    elif action == "reproduce":
-                        self.reproduce()
-                    elif action == "form_group":
-                        self.form_group()
-                    
-                    self.move()
-                    
-                    self.hunger -= 1
-                    if self.hunger <= 0:
-                        logger.debug(f"Animal {self.symbol} at ({self.x}, {self.y}) died.")
-                        self.world.remove_entity(self)
-                        self.group.remove_member(self)
+            # Константы вида: что он ест и правила по его стратегии. Условия
+            # reproduce_condition и eat_condition остаются None (действие
+            # отключено), если класс не задал их сам
+            attrs.setdefault('eatable_entities', tuple(food_sources))
+            attrs['reproduce_rule'] = REPRODUCE_CONDITIONS.get(reproduction_strategy, ANY_PARTNER)
+            if 'cannibalism' in attrs.get('BEHAVIOR_TRAITS', []):
+                attrs['eat_rule'] = CANNIBAL_EAT
+            else:
+                attrs['eat_rule'] = GROUP_EAT
             
             # Инжектируем сгенерированные методы в класс
-            attrs['move'] = move
-            attrs['eat'] = eat
+            attrs['phase_row'] = staticmethod(phase_row)
+            attrs['move'] = make_move(movement_pattern == 'hungry')
+            attrs['eat'] = make_eat(food_sources)
             attrs['reproduce'] = reproduce
             attrs['form_group'] = form_group
             attrs['act'] = act
         
         # Создаем класс с модифицированными методами
-        return super().__new__(mcs, name, bases, attrs)
\ No newline at end of file
+        return super().__new__(mcs, name, bases, attrs)
@@ -0,0 +1,162 @@
+"""
+Запись временных рядов популяции по тикам
+
+TimeSeriesRecorder хранит метрики тиков в заранее выделенных столбцах NumPy:
+численность каждого вида, средний голод животных, число живых групп, а также
+рождения, гибели и захваты растений за тик. Метрики берутся из накопителя
+world.population_stats(), реестра групп и счетчиков событий мира, поэтому
+запись тика не обходит сетку.
+
+Число строк ограничено capacity, поэтому память не растет с длиной прогона.
+Когда буфер заполняется, старшая половина строк попарно сливается: строка
+покрывает span тиков, значения численности, голода и групп берутся на
+последнем тике строки, события суммируются. Свежие тики остаются
+поштучными, а старые данные огрубляются тем сильнее, чем они старше.
+
+Пример:
+    recorder = TimeSeriesRecorder()
+    for tick in range(1, ticks + 1):
+        world.tick()
+        time_manager.advance_time()
+        recorder.record(tick, world)
+    recorder.to_csv('population.csv')
+"""
+import numpy as np
+import config
+from logger import setup_logger
+
+logger = setup_logger("recorder")
+
+# Счетчики событий мира, накопленные с момента его создания
+EVENTS = ('births', 'deaths', 'captures')
+
+
+def world_events(world):
+    return np.array([getattr(world, name) for name in EVENTS], dtype=np.int64)
+
+
+class TimeSeriesRecorder:
+    def __init__(self, capacity=config.SERIES_CAPACITY, species=()):
+        if capacity < 4:
+            raise ValueError("capacity must be at least 4 rows")
+        self.capacity = capacity
+        self.species = {}  # имя вида -> номер столбца в counts
+        self.tick = np.zeros(capacity, dtype=np.int64)
+        self.span = np.zeros(capacity, dtype=np.int32)
+        self.counts = np.zeros((capacity, 0), dtype=np.int32)
+        self.mean_hunger = np.zeros(capacity, dtype=np.float32)
+        self.groups = np.zeros(capacity, dtype=np.int32)
+        self.events = np.zeros((capacity, len(EVENTS)), dtype=np.int32)
+        self.size = 0
+        self._last_events = None
+        for name in species:
+            self._column(name)
+
+    def nbytes(self):
+        """Объем памяти столбцов; он постоянен, пока не появляются новые виды"""
+        return sum(a.nbytes for a in (self.tick, self.span, self.counts, self.mean_hunger,
+                                      self.groups, self.events))
+
+    def _column(self, name):
+        column = self.species.get(name)
+        if column is None:
+            # Новый вид (например, созданный во время прогона): до его появления численность 0
+            column = self.species[name] = self.counts.shape[1]
+            self.counts = np.hstack([self.counts, np.zeros((self.capacity, 1), dtype=np.int32)])
+        return column
+
+    def clear(self):
+        self.size = 0
+        self._last_events = None
+
+    # --- Запись ---
+
+    def record(self, tick, world):
+        """Записывает состояние мира после тика tick"""
+        events = world_events(world)
+        if self._last_events is None:
+            self._last_events = events
+        if self.size == self.capacity:
+            self._compact()
+        row = self.size
+        self.size += 1
+
+        self.tick[row] = tick
+        self.span[row] = 1
+        self.counts[row] = 0
+        total_hunger, animals = 0, 0
+        for name, species in world.population_stats().items():
+            column = self._column(name)
+            self.counts[row, column] = species.count
+            if not species.is_plant:
+                total_hunger += species.total_hunger
+                animals += species.count
+        self.mean_hunger[row] = total_hunger / animals if animals else 0.0
+        self.groups[row] = len(world.group_registry)
+        self.events[row] = events - self._last_events
+        self._last_events = events
+
+    def _compact(self):
+        """Сливает попарно старшую половину строк, освобождая четверть буфера"""
+        half = self.capacity // 2 - (self.capacity // 2) % 2
+        merged = half // 2
+        later = slice(1, half, 2)
+        # Численность, голод и группы - на последнем тике пары, события и длительность суммируются
+        self.events[:merged] = self.events[0:half:2] + self.events[later]
+        self.span[:merged] = self.span[0:half:2] + self.span[later]
+        for column in (self.tick, self.counts, self.mean_hunger, self.groups):
+            column[:merged] = column[later]
+        for column in (self.tick, self.span, self.counts, self.mean_hunger, self.groups, self.events):
+            column[merged:self.size - merged] = column[half:self.size]
+        self.size -= merged
+
+    def rewind(self, tick, world):
+        """
+        Отбрасывает строки после тика tick (перемотка ленты времени назад);
+        world - мир на тике tick, от его счетчиков считаются следующие события
+        """
+        self.size = int(np.searchsorted(self.tick[:self.size], tick, side='right'))
+        self._last_events = world_events(world)
+
+    # --- Чтение и экспорт ---
+
+    def columns(self):
+        """Возвращает {имя столбца: массив} по записанным строкам (представления, без копий)"""
+        size = self.size
+        columns = {'tick': self.tick[:size], 'span': self.span[:size]}
+        for name, column in self.species.items():
+            columns[name] = self.counts[:size, column]
+        columns['mean_hunger'] = self.mean_hunger[:size]
+        columns['groups'] = self.groups[:size]
+        for i, name in enumerate(EVENTS):
+            columns[name] = self.events[:size, i]
+        return columns
+
+    def chart(self, max_points=200):
+        """
+        Данные для графика численности: (тики, {вид: численность}) не более
+        чем по max_points точкам, последний записанный тик всегда включен.
+        Возвращаются копии, их можно передавать в другой поток
+        """
+        if self.size == 0:
+            return (), {}
+        stride = -(-self.size // max_points)
+        rows = np.arange(self.size - 1, -1, -stride)[::-1]
+        return (self.tick[rows].tolist(),
+                {name: self.counts[rows, column].tolist() for name, column in self.species.items()})
+
+    def to_npz(self, path):
+        """Сохраняет столбцы в .npz; имена видов - в массиве species"""
+        columns = self.columns()
+        np.savez(path, species=np.array(list(self.species), dtype=np.str_),
+                 counts=self.counts[:self.size], **{k: v for k, v in columns.items() if k not in self.species})
+        logger.info("Saved %s time series rows to %s", self.size, path)
+
+    def to_csv(self, path):
+        """Сохраняет столбцы в CSV с заголовком"""
+        columns = self.columns()
+        table = np.column_stack([column.astype(np.float64) for column in columns.values()]) \
+            if self.size else np.zeros((0, len(columns)))
+        formats = ['%.3f' if name == 'mean_hunger' else '%d' for name in columns]
+        np.savetxt(path, table, fmt=formats, delimiter=',', header=','.join(columns), comments='')
+        logger.info("Saved %s time series rows to %s", self.size, path)
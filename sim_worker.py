@@ -0,0 +1,280 @@
+"""
+Поток симуляции, отделенный от цикла событий GUI
+
+Рабочий поток владеет лентой времени (timeline.Timeline) и единственный
+трогает мир. Интерфейс передает ему команды через очередь, а обратно
+получает неизменяемые кадры (Frame) через двойной буфер FrameBuffer и
+рисует самый свежий из них со своей частотой. Кадр несет только клетки,
+изменившиеся с прошлого кадра: интерфейс держит свою копию карты и
+применяет их к ней, поэтому публикация кадра стоит O(изменений), а не
+O(занятых клеток). Скорость задается в тиках в
+секунду; в режиме "как можно быстрее" (ticks_per_sec=None) тики идут без
+пауз, а кадры публикуются не чаще max_fps, промежуточные пропускаются.
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from logger import setup_logger
+
+logger = setup_logger("sim_worker")
+
+# Неизменяемый кадр для интерфейса.
+# cells - {(x, y): (имя вида, голод или None) или None для опустевшей клетки}
+# только для клеток, изменившихся с последнего кадра, забранного интерфейсом,
+# changed - множество этих клеток,
+# stats и series (данные графика recorder.TimeSeriesRecorder.chart() или None)
+# пересчитываются только после тика или команды, иначе переходят из прошлого кадра
+Frame = namedtuple('Frame', [
+    'tick', 'phase', 'running', 'ticks_per_sec', 'cells', 'changed',
+    'selected', 'action_cells', 'info', 'stats', 'series',
+], defaults=(None,))
+
+
+class FrameBuffer:
+    """
+    Двойной буфер кадров: поток симуляции пишет в задний слот и меняет слоты
+    местами, интерфейс забирает передний. Если интерфейс не успел забрать
+    кадр, изменения пропущенного кадра переносятся в следующий, поэтому
+    cells и changed всегда покрывают все изменения с последнего показанного кадра
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = [None, None]
+        self._front = 0
+        self._taken = True
+
+    def publish(self, frame):
+        with self._lock:
+            if not self._taken:
+                missed = self._slots[self._front]
+                cells = dict(missed.cells)
+                cells.update(frame.cells)
+                frame = frame._replace(cells=MappingProxyType(cells), changed=missed.changed | frame.changed)
+            back = 1 - self._front
+            self._slots[back] = frame
+            self._front = back
+            self._taken = False
+
+    def take(self):
+        """Возвращает новый кадр или None, если с прошлого вызова кадров не было"""
+        with self._lock:
+            if self._taken:
+                return None
+            self._taken = True
+            return self._slots[self._front]
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Рабочий поток симуляции. Методы управления (start_running, pause,
+    set_speed, seek, select, submit) можно вызывать из потока интерфейса:
+    они только кладут команду в очередь.
+
+    describe(world, entity) - текст о выбранном животном,
+    stats(world) - текст статистики; обе функции вызываются в этом потоке.
+    recorder - recorder.TimeSeriesRecorder, в который пишется каждый тик
+    """
+    def __init__(self, timeline, describe, stats, ticks_per_sec=5, max_ticks=None, max_fps=60, recorder=None):
+        super().__init__(name='simulation', daemon=True)
+        self.timeline = timeline
+        self.describe = describe
+        self.stats = stats
+        self.ticks_per_sec = ticks_per_sec
+        self.max_ticks = max_ticks
+        self.frame_interval = 1 / max_fps
+        self.frames = FrameBuffer()
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.record(timeline.tick, timeline.world)
+        self.running = False
+        self.selected = None
+        self._commands = queue.Queue()
+        self._stopped = False
+        self._world = None
+        self._occupied = set()   # занятые клетки на момент последнего кадра
+        self._updates = {}       # изменения клеток с последнего кадра
+        self._measured_tps = 0.0
+        # Статистика и график последнего кадра и (мир, тик), для которых они построены
+        self._stats = None
+        self._series = None
+        self._stats_key = None
+
+    # --- Команды из потока интерфейса ---
+
+    def submit(self, command):
+        """Выполняет command(worker) в потоке симуляции между тиками"""
+        self._commands.put(command)
+
+    def start_running(self):
+        self.submit(lambda worker: setattr(worker, 'running', True))
+
+    def pause(self):
+        self.submit(lambda worker: setattr(worker, 'running', False))
+
+    def set_speed(self, ticks_per_sec):
+        """Целевая скорость в тиках в секунду; None - как можно быстрее"""
+        self.submit(lambda worker: setattr(worker, 'ticks_per_sec', ticks_per_sec))
+
+    def seek(self, tick):
+        self.submit(lambda worker: worker.seek_to(tick))
+
+    def select(self, x, y):
+        def command(worker):
+            world = worker.timeline.world
+            entity = world.get_entity(x, y) if world.is_in_bounds(x, y) else None
+            worker.selected = entity if entity is not None and hasattr(entity, 'hunger') else None
+        self.submit(command)
+
+    def stop(self):
+        self._stopped = True
+        self._commands.put(None)
+        self.join()
+
+    # --- Поток симуляции ---
+
+    def step(self):
+        self.timeline.step()
+        if self.recorder is not None:
+            self.recorder.record(self.timeline.tick, self.timeline.world)
+
+    def seek_to(self, tick):
+        """Перематывает ленту; при ходе вперед пропущенные тики попадают во временные ряды"""
+        if tick <= self.timeline.tick:
+            self.timeline.seek(tick)
+            if self.recorder is not None:
+                self.recorder.rewind(self.timeline.tick, self.timeline.world)
+        while self.timeline.tick < tick:
+            self.step()
+
+    def replace_timeline(self, timeline):
+        """Заменяет ленту (сброс или загрузка); временные ряды начинаются заново"""
+        self.timeline = timeline
+        self.selected = None
+        self.running = False
+        if self.recorder is not None:
+            self.recorder.clear()
+            self.recorder.record(timeline.tick, timeline.world)
+
+    def run(self):
+        self.publish()
+        next_tick = time.perf_counter()
+        last_publish = 0.0
+        window_start, window_ticks = time.perf_counter(), 0
+        while not self._stopped:
+            # Ждем команду до времени следующего тика (на паузе - сколько угодно)
+            timeout = None
+            if self.running and self.ticks_per_sec:
+                timeout = max(0.0, next_tick - time.perf_counter())
+            elif self.running:
+                timeout = 0.0
+            if self._execute_commands(timeout):
+                self.publish(refresh=True)
+                last_publish = time.perf_counter()
+                next_tick = time.perf_counter()
+                continue
+            if not self.running:
+                continue
+
+            self.step()
+            window_ticks += 1
+            if self.max_ticks is not None and self.timeline.tick >= self.max_ticks:
+                self.running = False
+
+            now = time.perf_counter()
+            if now - window_start >= 1.0:
+                self._measured_tps = window_ticks / (now - window_start)
+                window_start, window_ticks = now, 0
+            if self.ticks_per_sec:
+                next_tick = max(next_tick + 1 / self.ticks_per_sec, now - 1.0)
+            # Кадры не публикуются чаще max_fps, лишние тики идут без отрисовки
+            if not self.running or now - last_publish >= self.frame_interval:
+                self.publish()
+                last_publish = now
+
+    def _execute_commands(self, timeout):
+        """Выполняет накопившиеся команды; возвращает True, если была хотя бы одна"""
+        try:
+            command = self._commands.get(timeout=timeout) if timeout != 0.0 else self._commands.get_nowait()
+        except queue.Empty:
+            return False
+        while command is not None:
+            try:
+                command(self)
+            except Exception:
+                logger.exception("Simulation command failed")
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                break
+        return True
+
+    def _collect_changes(self, world):
+        updates, occupied = self._updates, self._occupied
+        if world is not self._world or world.dirty is None:
+            # Мир подменен (сброс, загрузка, кадр ленты времени): очищаем все
+            # занятые клетки и заново передаем клетки нового мира
+            for cell in occupied:
+                updates[cell] = None
+            occupied.clear()
+            for entity in world.iter_entities():
+                cell = (entity.x, entity.y)
+                updates[cell] = (type(entity).__name__, getattr(entity, 'hunger', None))
+                occupied.add(cell)
+            self._world = world
+        else:
+            for x, y in world.dirty:
+                entity = world.get_entity(x, y)
+                if entity is None:
+                    updates[(x, y)] = None
+                    occupied.discard((x, y))
+                else:
+                    updates[(x, y)] = (type(entity).__name__, getattr(entity, 'hunger', None))
+                    occupied.add((x, y))
+        world.dirty = set()
+
+    def _follow_selection(self, world):
+        selected = self.selected
+        if selected is None or selected.world is world:
+            return selected
+        if selected.world is None:
+            return None
+        # Лента времени подменила мир: ищем животное в той же клетке нового мира
+        entity = world.get_entity(selected.x, selected.y)
+        return entity if type(entity) == type(selected) else None
+
+    def publish(self, refresh=False):
+        """
+        Собирает кадр из изменений мира и кладет его в буфер. Статистика и
+        график строятся заново, только если мир или тик сменились с прошлого
+        кадра или refresh (после команд интерфейса)
+        """
+        world = self.timeline.world
+        self._collect_changes(world)
+        key = (world, self.timeline.tick)
+        if refresh or key != self._stats_key:
+            self._stats_key = key
+            self._stats = self.stats(world)
+            self._series = None if self.recorder is None else self.recorder.chart()
+        self.selected = self._follow_selection(world)
+        selected = None if self.selected is None else (self.selected.x, self.selected.y)
+        action_cells = () if selected is None else tuple(
+            (selected[0] + dx, selected[1] + dy) for dx, dy in world.neighbor_offsets(*selected))
+
+        frame = Frame(
+            tick=self.timeline.tick,
+            phase=self.timeline.time_manager.current_phase,
+            running=self.running,
+            ticks_per_sec=self._measured_tps,
+            cells=MappingProxyType(self._updates),
+            changed=frozenset(self._updates),
+            selected=selected,
+            action_cells=action_cells,
+            info=None if self.selected is None else self.describe(world, self.selected),
+            stats=self._stats,
+            series=self._series,
+        )
+        # Словарь изменений уходит в кадр, следующий кадр собирает новый
+        self._updates = {}
+        self.frames.publish(frame)
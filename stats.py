@@ -1,110 +1,45 @@
-import PySimpleGUI as sg
-from gui import setup_world, update_canvas, calculate_stats, update_simulation
-from config import GRID_WIDTH, GRID_HEIGHT, SIMULATION_TICKS
 from logger import setup_logger
 
 logger = setup_logger("stats")
 
 def get_detailed_stats(world):
     """
-    Собирает детальную статистику о мире для отображения в GUI
+    Собирает детальную статистику о мире для отображения в GUI.
+    Данные берутся из накопителя world.population_stats() и реестра групп
+    world.group_registry, поэтому клетки не обходятся, а в сводку попадают
+    все виды, в том числе созданные динамически
     """
-    # Количество каждого типа сущностей
-    entity_counts = {}
-    
-    # Дополнительные метрики для животных
-    animal_metrics = {
-        'Pauvre': {
-            'total_hunger': 0,
-            'avg_hunger': 0,
-            'group_sizes': {},
-            'active_count': 0
-        },
-        'Malheureux': {
-            'total_hunger': 0,
-            'avg_hunger': 0,
-            'group_sizes': {},
-            'active_count': 0
-        }
-    }
-    
-    # Счетчики для растений
-    plant_metrics = {
-        'Lumiere': {'growing': 0, 'dormant': 0},
-        'Obscurite': {'growing': 0, 'dormant': 0},
-        'Demi': {'growing': 0, 'dormant': 0}
-    }
-    
-    # Собираем данные
-    for row in world.cells:
-        for cell in row:
-            if cell is not None:
-                entity_type = type(cell).__name__
-                
-                # Обновляем базовые счетчики
-                if entity_type in entity_counts:
-                    entity_counts[entity_type] += 1
-                else:
-                    entity_counts[entity_type] = 1
-                
-                # Собираем метрики для животных
-                if entity_type in ['Pauvre', 'Malheureux']:
-                    animal_metrics[entity_type]['total_hunger'] += cell.hunger
-                    
-                    # Счетчик групп
-                    group_num = cell.group.group_number
-                    if group_num in animal_metrics[entity_type]['group_sizes']:
-                        animal_metrics[entity_type]['group_sizes'][group_num] += 1
-                    else:
-                        animal_metrics[entity_type]['group_sizes'][group_num] = 1
-                    
-                    # Счетчик активных животных
-                    if cell.timer.current_phase in getattr(cell, 'ACTIVE_PHASES', []):
-                        animal_metrics[entity_type]['active_count'] += 1
-                
-                # Собираем метрики для растений
-                if entity_type in ['Lumiere', 'Obscurite', 'Demi']:
-                    if cell.is_growing:
-                        plant_metrics[entity_type]['growing'] += 1
-                    else:
-                        plant_metrics[entity_type]['dormant'] += 1
-    
-    # Вычисляем средние значения
-    for animal_type in animal_metrics:
-        count = entity_counts.get(animal_type, 0)
-        if count > 0:
-            animal_metrics[animal_type]['avg_hunger'] = animal_metrics[animal_type]['total_hunger'] / count
+    population = world.population_stats()
+    group_sizes = world.group_registry.species_sizes()
     
     # Форматируем вывод
     stats_text = "Статистика популяции:\n\n"
     
     # Общие счетчики сущностей
     stats_text += "Количество сущностей:\n"
-    for entity_type, count in entity_counts.items():
-        stats_text += f"{entity_type}: {count}\n"
+    for entity_type, species in population.items():
+        stats_text += f"{entity_type}: {species.count}\n"
     
     stats_text += "\nСтатистика животных:\n"
-    for animal_type, metrics in animal_metrics.items():
-        count = entity_counts.get(animal_type, 0)
-        if count > 0:
+    for animal_type, species in population.items():
+        if not species.is_plant:
             stats_text += f"{animal_type}:\n"
-            stats_text += f"  Средний голод: {metrics['avg_hunger']:.1f}\n"
-            stats_text += f"  Активных: {metrics['active_count']} из {count}\n"
+            stats_text += f"  Средний голод: {species.avg_hunger:.1f}\n"
+            stats_text += f"  Активных: {species.active} из {species.count}\n"
             
             # Информация о группах
             stats_text += f"  Группы: "
             group_info = []
-            for group_num, size in metrics['group_sizes'].items():
+            for group_num, size in group_sizes.get(animal_type, {}).items():
                 group_info.append(f"[Группа {group_num}: {size}]")
             stats_text += ", ".join(group_info) + "\n"
     
     stats_text += "\nСтатистика растений:\n"
-    for plant_type, metrics in plant_metrics.items():
-        count = entity_counts.get(plant_type, 0)
-        if count > 0:
+    for plant_type, species in population.items():
+        if species.is_plant:
             stats_text += f"{plant_type}:\n"
-            stats_text += f"  Растущих: {metrics['growing']} ({metrics['growing']/count*100:.1f}%)\n"
-            stats_text += f"  Спящих: {metrics['dormant']} ({metrics['dormant']/count*100:.1f}%)\n"
+            stats_text += f"  Растущих: {species.growing} ({species.growing/species.count*100:.1f}%)\n"
+            stats_text += f"  Спящих: {species.dormant} ({species.dormant/species.count*100:.1f}%)\n"
     
     return stats_text
 
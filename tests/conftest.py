@@ -0,0 +1,17 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+
+# Лог тестов пишется во временный каталог, а не в каталог запуска pytest.
+# Файловый обработчик открывает файл при первой записи, поэтому достаточно
+# подменить имя до импорта модулей с логгерами
+_log_dir = tempfile.mkdtemp(prefix='simulation-tests-')
+config.LOG_FILE_NAME = os.path.join(_log_dir, 'simulation.log')
+atexit.register(shutil.rmtree, _log_dir, ignore_errors=True)
@@ -0,0 +1,184 @@
+import unittest
+import random
+import numpy as np
+import sys
+import os
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.plants.lumiere import Lumiere
+from entities.plants.demi import Demi
+from entities.plants.obscurite import Obscurite
+from entities.animals.pauvre import Pauvre
+from entities.animals.malheureux import Malheureux
+from entities.group import Group
+from world.time_manager import TimeManager
+from world.array_grid import ArrayGrid
+from world.grid import Grid
+from entity_factory import create_animal_class
+from meta_classes import ANY_PARTNER, CANNIBAL_EAT
+
+
+class TestArrayGrid(unittest.TestCase):
+    
+    def setUp(self):
+        self.time_manager = TimeManager(10)
+        self.grid = ArrayGrid(10, 10)
+        self.group = Group(1)
+    
+    def test_same_interface_as_grid(self):
+        """Проверяем размещение, перемещение и удаление через общий интерфейс Grid"""
+        plant = Lumiere(1, 1, None, self.grid, self.time_manager)
+        self.grid.place_entity(plant, 1, 1)
+        animal = Pauvre(5, 5, self.grid, self.time_manager, self.group)
+        self.grid.place_entity(animal, 5, 5)
+        self.assertEqual(self.grid.count_by_species(), {'Lumiere': 1, 'Pauvre': 1})
+        
+        self.grid.move_entity(animal, 5, 6)
+        self.assertTrue(self.grid.is_empty(5, 5))
+        snapshot = self.grid.get_entity(5, 6)
+        self.assertIs(type(snapshot), Pauvre)
+        self.assertEqual(snapshot.hunger, 100)
+        self.assertIs(snapshot.group, self.group)
+        
+        neighbors = self.grid.get_neighbors(0, 1)
+        self.assertEqual([(type(n[0]), n[1], n[2]) for n in neighbors],
+                         [(Lumiere, 1, 1), (type(None), 0, 0), (type(None), 0, 2)])
+        
+        self.grid.duplicate_entity(plant, 2, 1)
+        self.grid.remove_entity(snapshot)
+        self.assertEqual(self.grid.count_by_species(), {'Lumiere': 2})
+        self.assertEqual(self.grid.group_sizes[0], 0)
+    
+    def test_tick_applies_plant_rules(self):
+        """Проверяем, что тик обновляет состояние растений по фазе"""
+        plant = Demi(3, 3, None, self.grid, self.time_manager)
+        self.grid.place_entity(plant, 3, 3)
+        
+        self.time_manager.current_phase = 'day'
+        random.seed(1)
+        self.grid.tick()
+        snapshot = self.grid.get_entity(3, 3)
+        self.assertFalse(snapshot.is_growing)
+        self.assertEqual(snapshot.active, 0)
+    
+    def test_batched_plant_step_matches_entity_rules(self):
+        """Проверяем, что пакетный и поэлементный шаг растений дают одну частоту распространения"""
+        self.time_manager.current_phase = 'day'
+        expected = 1 - (29 / 30) ** 4
+        random.seed(7)
+        for mode in ('entity', 'batched'):
+            trials, spread = 3000, 0
+            for _ in range(trials):
+                grid = ArrayGrid(5, 5, plant_mode=mode)
+                grid.place_entity(Lumiere(2, 2, None, grid, self.time_manager), 2, 2)
+                grid.tick()
+                spread += grid.count_by_species()['Lumiere'] - 1
+            self.assertAlmostEqual(spread / trials, expected, delta=0.03, msg=mode)
+    
+    def test_batched_plant_trajectories_match_entity_mode(self):
+        """Проверяем, что численность и число растущих растений трех видов по тикам совпадают в обоих режимах"""
+        plants = (Lumiere, Obscurite, Demi)
+        replicates, ticks, size = 40, 24, 24
+
+        def trajectory(mode, seed):
+            random.seed(seed)
+            timer = TimeManager(3)
+            grid = ArrayGrid(size, size, plant_mode=mode, seed=seed, animal_mode='entity')
+            cells = random.sample(range(size * size), 80)
+            for k, cell in enumerate(cells):
+                x, y = cell % size, cell // size
+                if k < 60:
+                    grid.place_entity(plants[k % 3](x, y, None, grid, timer), x, y)
+                else:
+                    grid.place_entity(Pauvre(x, y, grid, timer, self.group), x, y)
+            codes = [grid._species_codes[cls] for cls in plants]
+            rows = []
+            for _ in range(ticks):
+                grid.tick()
+                timer.advance_time()
+                rows.append([grid.species_counts[code] for code in codes] +
+                            [grid.growing_counts[code] for code in codes])
+            return rows
+
+        entity = np.array([trajectory('entity', seed) for seed in range(replicates)], dtype=np.float64)
+        batched = np.array([trajectory('batched', seed) for seed in range(replicates)], dtype=np.float64)
+        # Средние по репликам на каждом тике - в пределах 4 стандартных ошибок разности;
+        # единица страхует ряды с нулевым разбросом (например, рост ночью)
+        error = np.sqrt(entity.var(0, ddof=1) / replicates + batched.var(0, ddof=1) / replicates)
+        difference = np.abs(entity.mean(0) - batched.mean(0))
+        self.assertTrue(np.all(difference <= 4 * error + 1),
+                        f"max deviation {np.max(difference - 4 * error):.1f}")
+    
+    def test_batched_animal_trajectories_match_entity_mode(self):
+        """Проверяем, что численность животных, рождения и число групп по тикам совпадают в обоих режимах"""
+        Lapin = create_animal_class('Lapin', 'L', ['morning', 'day', 'evening'], ['Lumiere'])
+        Lapin.reproduce_condition = ANY_PARTNER
+        Loup = create_animal_class('Loup', 'W', ['day', 'evening', 'night'], ['Lapin'], movement_pattern='hungry')
+        Loup.eat_condition = CANNIBAL_EAT
+        animals = (Pauvre, Malheureux, Lapin, Loup)
+        replicates, ticks, size = 40, 24, 24
+
+        def trajectory(mode, seed):
+            random.seed(seed)
+            timer = TimeManager(3)
+            grid = ArrayGrid(size, size, plant_mode='entity', seed=seed, animal_mode=mode)
+            cells = random.sample(range(size * size), 160)
+            for k, cell in enumerate(cells):
+                x, y = cell % size, cell // size
+                if k < 60:
+                    grid.place_entity(Lumiere(x, y, None, grid, timer), x, y)
+                else:
+                    # Каждая особь в своей группе: группы мирные, пока не сольются
+                    animal = animals[k % 4](x, y, grid, timer, Group(k))
+                    animal.hunger = random.randint(20, 100)
+                    grid.place_entity(animal, x, y)
+            codes = [grid._species_codes[cls] for cls in animals]
+            rows = []
+            for _ in range(ticks):
+                grid.tick()
+                timer.advance_time()
+                rows.append([grid.species_counts[code] for code in codes] +
+                            [grid.births, len(grid.group_registry)])
+            return rows
+
+        entity = np.array([trajectory('entity', seed) for seed in range(replicates)], dtype=np.float64)
+        batched = np.array([trajectory('batched', seed) for seed in range(replicates)], dtype=np.float64)
+        error = np.sqrt(entity.var(0, ddof=1) / replicates + batched.var(0, ddof=1) / replicates)
+        difference = np.abs(entity.mean(0) - batched.mean(0))
+        self.assertTrue(np.all(difference <= 4 * error + 1),
+                        f"max deviation {np.max(difference - 4 * error):.1f}")
+
+    def test_custom_eat_condition(self):
+        """Проверяем, что оба бэкенда вызывают собственное условие поедания вида"""
+        Loup = create_animal_class('Loup', 'W', ['day'], ['Pauvre'])
+        Loup.eat_condition = lambda hunter, prey: type(prey) is Lumiere
+        self.time_manager.current_phase = 'day'
+        for grid in (Grid(10, 10, [[None] * 10 for _ in range(10)]), ArrayGrid(10, 10)):
+            wolf = Loup(5, 5, grid, self.time_manager, self.group)
+            wolf.hunger = 40
+            grid.place_entity(wolf, 5, 5)
+            grid.place_entity(Demi(5, 6, None, grid, self.time_manager), 5, 6)
+            grid.place_entity(Lumiere(4, 5, None, grid, self.time_manager), 4, 5)
+            # Размещение пересчитывает агрессию группы, поэтому задаем ее после
+            self.group.aggression = 1
+            if isinstance(grid, ArrayGrid):
+                grid.group_aggression[grid.group_index(self.group)] = 1
+            if isinstance(grid, ArrayGrid):
+                with grid._cell_views():
+                    grid._animal_eat(5 * 10 + 5, grid.species_table[grid.species_code(wolf)])
+            else:
+                wolf.eat()
+            self.assertIsNone(grid.get_entity(4, 5), type(grid).__name__)
+            self.assertIs(type(grid.get_entity(5, 6)), Demi)
+            self.assertEqual(grid.get_entity(5, 5).hunger, 100)
+    
+    def test_compact_cells(self):
+        """Проверяем, что клетка мира занимает десяток байт"""
+        grid = ArrayGrid(1000, 1000)
+        self.assertLessEqual(grid.nbytes(), 12 * 1000 * 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
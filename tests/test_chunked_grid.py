@@ -0,0 +1,84 @@
+import unittest
+import random
+import sys
+import os
+import io
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.plants.lumiere import Lumiere
+from entities.plants.demi import Demi
+from world.time_manager import TimeManager
+from world.chunked_grid import ChunkedGrid
+from world.snapshot import save_snapshot, load_snapshot
+from ensemble import build_world, default_scenario
+
+
+def state(world):
+    return sorted((e.x, e.y, type(e).__name__, getattr(e, 'hunger', None)) for e in world.iter_entities())
+
+
+class TestChunkedGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.time_manager = TimeManager(10)
+        self.grid = ChunkedGrid(20000, 20000, chunk_size=16)
+
+    def place(self, cls, x, y):
+        entity = cls(x, y, None, self.grid, self.time_manager)
+        self.grid.place_entity(entity, x, y)
+        return entity
+
+    def test_chunks_are_allocated_and_freed(self):
+        """Проверяем, что чанк создается первой сущностью и освобождается последней"""
+        self.assertEqual(len(self.grid.chunks), 0)
+        plant = self.place(Lumiere, 19999, 19999)
+        self.place(Demi, 19998, 19999)
+        self.assertEqual(len(self.grid.chunks), 1)
+        # Переход через границу чанка
+        self.grid.move_entity(plant, 19999, 19983)
+        self.assertEqual(len(self.grid.chunks), 2)
+        self.grid.remove_entity(self.grid.get_entity(19998, 19999))
+        self.assertEqual(len(self.grid.chunks), 1)
+        self.grid.remove_entity(plant)
+        self.assertEqual(self.grid.chunks, {})
+        self.assertEqual(self.grid.count_by_species(), {})
+
+    def test_neighbors_across_chunk_border(self):
+        """Проверяем, что соседи из другого чанка видны так же, как в плотной сетке"""
+        left = self.place(Lumiere, 15, 40)
+        right = self.place(Demi, 16, 40)
+        neighbors = self.grid.get_neighbors(15, 40)
+        self.assertEqual(neighbors[1], [right, 16, 40])
+        self.assertEqual([n[0] for n in self.grid.get_neighbors(16, 40)][0], left)
+        self.assertEqual(self.grid.get_neighbors(0, 0), [[None, 1, 0], [None, 0, 1]])
+        self.grid.duplicate_entity(right, 16, 41)
+        self.assertEqual(self.grid.count_by_species(), {'Lumiere': 1, 'Demi': 2})
+
+    def test_same_run_as_dense_grid(self):
+        """Проверяем, что с тем же сидом разреженная сетка проходит тот же прогон, что и Grid"""
+        runs = []
+        for backend in ('objects', 'chunked'):
+            world, time_manager = build_world(dict(default_scenario(), backend=backend), seed=9)
+            random.seed(3)
+            for _ in range(30):
+                world.tick()
+                time_manager.advance_time()
+            runs.append(state(world))
+        self.assertEqual(runs[0], runs[1])
+
+    def test_snapshot_keeps_backend(self):
+        """Проверяем, что снимок разреженного мира загружается в разреженный мир"""
+        self.place(Lumiere, 12345, 54)
+        stream = io.BytesIO()
+        save_snapshot(stream, self.grid, self.time_manager)
+        stream.seek(0)
+        loaded, _, _ = load_snapshot(stream)
+        self.assertIsInstance(loaded, ChunkedGrid)
+        self.assertEqual(state(loaded), state(self.grid))
+        self.assertEqual(len(loaded.chunks), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
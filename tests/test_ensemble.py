@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import default_scenario, run_replicate, run_ensemble
+
+
+class TestEnsemble(unittest.TestCase):
+    
+    def setUp(self):
+        self.scenario = default_scenario()
+        self.scenario['ticks'] = 5
+    
+    def test_replicate_is_reproducible(self):
+        """Проверяем, что реплика полностью определяется сидом"""
+        _, counts1, hunger1 = run_replicate(self.scenario, 3)
+        _, counts2, hunger2 = run_replicate(self.scenario, 3)
+        np.testing.assert_array_equal(counts1, counts2)
+        np.testing.assert_array_equal(hunger1, hunger2)
+        self.assertEqual(counts1.shape, (6, 5))
+    
+    def test_pool_results_match_serial_runs(self):
+        """Проверяем, что ансамбль на пуле процессов сливает те же сводки, что и последовательный прогон"""
+        stats = run_ensemble(self.scenario, [1, 2, 3], workers=2)
+        self.assertEqual(sorted(stats.seeds), [1, 2, 3])
+        serial = np.stack([run_replicate(self.scenario, seed)[1] for seed in stats.seeds])
+        np.testing.assert_allclose(stats.mean(), serial.mean(axis=0))
+        self.assertEqual(stats.extinction_probability().shape, (6, 5))
+
+
+    def test_rows_streamed_per_tick(self):
+        """Проверяем, что строки сводки приходят из процессов по тикам и совпадают с итоговыми массивами"""
+        rows = {}
+        stats = run_ensemble(self.scenario, [1, 2], workers=2,
+                             on_tick=lambda seed, tick, counts, hunger: rows.setdefault(seed, []).append((tick, counts)))
+        for seed, counts in zip(stats.seeds, stats.counts):
+            self.assertEqual([tick for tick, _ in rows[seed]], list(range(6)))
+            self.assertEqual([row for _, row in rows[seed]], counts.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
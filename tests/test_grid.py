@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.plants.lumiere import Lumiere
+from entities.plants.demi import Demi
+from world.time_manager import TimeManager
+from world.grid import Grid
+from world.neighbors import neighbor_table
+
+
+class TestGridIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.time_manager = TimeManager(10)
+        self.grid = Grid(10, 10, [[None for _ in range(10)] for _ in range(10)])
+    
+    def place(self, cls, x, y):
+        entity = cls(x, y, None, self.grid, self.time_manager)
+        self.grid.place_entity(entity, x, y)
+        return entity
+    
+    def test_index_follows_mutations(self):
+        """Проверяем, что индекс видов обновляется при всех изменениях сетки"""
+        lumiere = self.place(Lumiere, 1, 1)
+        demi = self.place(Demi, 5, 5)
+        self.assertEqual(self.grid.count_by_species(), {'Lumiere': 1, 'Demi': 1})
+        
+        self.grid.duplicate_entity(lumiere, 2, 1)
+        self.assertEqual(self.grid.count_by_species()['Lumiere'], 2)
+        
+        self.grid.move_entity(demi, 5, 6)
+        self.assertEqual(self.grid.count_by_species()['Demi'], 1)
+        
+        self.grid.remove_entity(demi)
+        self.assertEqual(self.grid.count_by_species(), {'Lumiere': 2})
+        
+        live = set(self.grid.iter_entities())
+        scanned = {cell for row in self.grid.cells for cell in row if cell is not None}
+        self.assertEqual(live, scanned)
+    
+    def test_move_onto_occupied_cell_evicts_occupant(self):
+        """Проверяем, что вытесненная при перемещении сущность уходит из индекса"""
+        lumiere = self.place(Lumiere, 1, 1)
+        demi = self.place(Demi, 2, 1)
+        self.grid.move_entity(demi, 1, 1)
+        self.assertIsNone(lumiere.world)
+        self.assertEqual(self.grid.count_by_species(), {'Demi': 1})
+
+
+class TestNeighborTable(unittest.TestCase):
+    
+    def test_offsets_match_bounds_check(self):
+        """Проверяем, что таблица смещений совпадает с прямой проверкой границ"""
+        for width, height in [(1, 1), (1, 5), (4, 3), (10, 10)]:
+            table = neighbor_table(width, height)
+            for y in range(height):
+                for x in range(width):
+                    expected = tuple((dx, dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                                     if 0 <= x + dx < width and 0 <= y + dy < height)
+                    self.assertEqual(table.offsets(x, y), expected)
+    
+    def test_table_is_shared_per_size(self):
+        """Проверяем, что таблица строится один раз на размер сетки"""
+        grid1 = Grid(7, 3, [[None] * 7 for _ in range(3)])
+        grid2 = Grid(7, 3, [[None] * 7 for _ in range(3)])
+        self.assertIs(grid1.neighbors, grid2.neighbors)
+        self.assertIs(grid1.neighbor_offsets(3, 1), grid2.neighbor_offsets(3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
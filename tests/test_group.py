@@ -0,0 +1,119 @@
+import unittest
+import random
+import sys
+import os
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.animals.pauvre import Pauvre
+from entities.animals.malheureux import Malheureux
+from entities.group import Group, GroupRegistry
+from world.time_manager import TimeManager
+from world.grid import Grid
+from world.array_grid import ArrayGrid
+
+
+class TestGroupRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.time_manager = TimeManager(10)
+        self.grid = Grid(10, 10, [[None for _ in range(10)] for _ in range(10)])
+        self.group = Group(3)
+
+    def spawn(self, count, group=None, cls=Pauvre):
+        animals = []
+        for i in range(count):
+            x, y = i % 10, i // 10
+            animal = cls(x, y, self.grid, self.time_manager, group or self.group)
+            self.grid.place_entity(animal, x, y)
+            animals.append(animal)
+        return animals
+
+    def test_world_keeps_membership(self):
+        """Проверяем, что особь вступает в группу при размещении и выходит при удалении из мира"""
+        first, second = self.spawn(2)
+        self.assertEqual(list(self.group.members), [first, second])
+        self.assertEqual(list(self.grid.group_registry), [self.group])
+        # Вытеснение из клетки - тоже уход из мира
+        self.grid.move_entity(first, second.x, second.y)
+        self.assertEqual(list(self.group.members), [first])
+        self.grid.remove_entity(first)
+        self.assertEqual(self.group.get_group_size(), 0)
+        self.assertEqual(len(self.grid.group_registry), 0)
+
+    def test_split_oversized_group(self):
+        """Проверяем деление группы больше 10 особей: вторая половина уходит в новую группу"""
+        animals = self.spawn(13)
+        self.group.split()
+        new_group = animals[-1].group
+        self.assertIsNot(new_group, self.group)
+        self.assertEqual(new_group.group_number, 4)
+        self.assertEqual(list(self.group.members), animals[:6])
+        self.assertEqual(list(new_group.members), animals[6:])
+        self.assertTrue(all(animal.group is new_group for animal in animals[6:]))
+        self.assertEqual(self.grid.group_registry.sizes(), {3: 6, 4: 7})
+        self.assertEqual((self.group.aggression, new_group.aggression), (1, 1))
+
+    def test_bulk_split_and_merge(self):
+        """Проверяем массовое деление по пределу размера и слияние групп"""
+        other = Group(7)
+        self.spawn(25)
+        registry = self.grid.group_registry
+        new_groups = registry.split_oversized(limit=10)
+        self.assertEqual(len(new_groups), 2)
+        self.assertTrue(all(size <= 10 for size in registry.sizes().values()))
+        self.assertEqual(sum(registry.sizes().values()), 25)
+
+        registry.merge(other, list(registry))
+        self.assertEqual(list(registry), [other])
+        self.assertEqual(registry.sizes(), {7: 25})
+        self.assertTrue(all(animal.group is other for animal in other.members))
+
+    def test_species_sizes(self):
+        """Проверяем размеры групп по видам, в том числе в смешанной группе"""
+        self.spawn(3)
+        mixed = Group(9)
+        for x in range(4):
+            animal = Malheureux(x, 5, self.grid, self.time_manager, mixed)
+            self.grid.place_entity(animal, x, 5)
+        animal = Pauvre(5, 5, self.grid, self.time_manager, mixed)
+        self.grid.place_entity(animal, 5, 5)
+        self.assertEqual(self.grid.group_registry.species_sizes(),
+                         {'Pauvre': {3: 3, 9: 1}, 'Malheureux': {9: 4}})
+        self.assertEqual(self.grid.population_stats()['Pauvre'].groups, {3: 3, 9: 1})
+
+    def test_form_group_moves_animal(self):
+        """Проверяем, что при объединении животное меняет группу и уходит из прежней"""
+        other = Group(8)
+        first = self.spawn(1)[0]
+        second = Pauvre(1, 0, self.grid, self.time_manager, other)
+        self.grid.place_entity(second, 1, 0)
+        random.seed(0)
+        first.form_group()
+        self.assertIs(first.group, second.group)
+        self.assertEqual(sorted(len(g.members) for g in (self.group, other)), [0, 2])
+        self.assertEqual(len(self.grid.group_registry), 1)
+
+    def test_split_without_world(self):
+        """Проверяем, что группа вне мира тоже делится"""
+        group = Group(1)
+        animals = [Pauvre(0, 0, None, self.time_manager, group) for _ in range(4)]
+        for animal in animals:
+            group.add_member(animal)
+        group.split()
+        self.assertEqual(group.get_group_size(), 2)
+        self.assertEqual(animals[-1].group.group_number, 2)
+        self.assertIsInstance(group.registry, GroupRegistry)
+
+    def test_array_grid_table(self):
+        """Проверяем, что массивный бэкенд отдает те же размеры групп"""
+        grid = ArrayGrid(10, 10)
+        for x in range(3):
+            grid.place_entity(Pauvre(x, 0, grid, self.time_manager, self.group), x, 0)
+        self.assertEqual(list(grid.group_registry), [self.group])
+        self.assertEqual(grid.group_registry.species_sizes(), {'Pauvre': {3: 3}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import logging
+import os
+import sys
+import tempfile
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from log_writer import start_file_pipeline, segment_paths
+from log_reader import iter_records
+from logger import FILE_FORMAT
+
+
+class TestLogPipeline(unittest.TestCase):
+    
+    def test_rotation_compression_and_filtering(self):
+        """Проверяем, что сегменты сжимаются, а читатель фильтрует их по тикам и сущностям"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'simulation.log')
+            handler = start_file_pipeline(path, logging.Formatter(FILE_FORMAT),
+                                          queue_size=10000, max_bytes=2000)
+            test_logger = logging.Logger('pipeline-test', logging.DEBUG)
+            test_logger.addHandler(handler)
+            
+            for tick in range(1, 51):
+                for entity in ('Pauvre', 'Lumiere'):
+                    test_logger.debug("event", extra={'tick': tick, 'entity': entity})
+            handler.writer_thread.stop()
+            
+            self.assertGreaterEqual(len(segment_paths(path)), 1)
+            lines = list(iter_records(path, from_tick=10, to_tick=19, entity='Pauvre'))
+            self.assertEqual(len(lines), 10)
+            self.assertTrue(all('entity=Pauvre' in line for line in lines))
+            self.assertEqual(len(list(iter_records(path))), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import logging
+import sys
+import os
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logger as sim_logger
+from logger import setup_logger, set_log_level, set_category_enabled, MOVEMENT, FEEDING
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestSimulationLogging(unittest.TestCase):
+    
+    def setUp(self):
+        self.previous_level = sim_logger._level
+        self.handler = RecordingHandler()
+        MOVEMENT.logger.addHandler(self.handler)
+    
+    def tearDown(self):
+        MOVEMENT.logger.removeHandler(self.handler)
+        set_category_enabled('movement', True)
+        set_log_level(self.previous_level)
+    
+    def test_setup_logger_is_idempotent(self):
+        """Проверяем, что повторная настройка логгера не добавляет обработчиков"""
+        first = setup_logger('test_module')
+        handlers = list(first.handlers)
+        second = setup_logger('test_module')
+        self.assertIs(first, second)
+        self.assertEqual(second.handlers, handlers)
+    
+    def test_categories_follow_level_and_switches(self):
+        """Проверяем, что категории включаются только на DEBUG и по отдельности"""
+        set_log_level('INFO')
+        self.assertFalse(MOVEMENT.enabled)
+        
+        set_log_level('DEBUG')
+        self.assertTrue(MOVEMENT.enabled)
+        set_category_enabled('movement', False)
+        self.assertFalse(MOVEMENT.enabled)
+        self.assertTrue(FEEDING.enabled)
+        
+        set_category_enabled('movement', True)
+        MOVEMENT.log(self, "moved to (%s, %s)", 1, 2)
+        self.assertEqual(self.handler.records[-1].getMessage(), "moved to (1, 2)")
+        self.assertEqual(self.handler.records[-1].entity, 'TestSimulationLogging')
+
+
+if __name__ == '__main__':
+    unittest.main()
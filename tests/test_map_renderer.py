@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import random
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from map_renderer import MapRenderer
+from sim_worker import Frame
+
+
+class FakeCanvas:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def itemconfig(self, figure, **options):
+        self.graph.calls.append(('itemconfig', figure))
+
+
+class FakeGraph:
+    """Заменяет sg.Graph: выдает id фигур и запоминает вызовы"""
+    def __init__(self):
+        self.calls = []
+        self.alive = set()
+        self.next_id = 0
+        self.TKCanvas = FakeCanvas(self)
+
+    def _new(self, kind):
+        self.next_id += 1
+        self.alive.add(self.next_id)
+        self.calls.append((kind, self.next_id))
+        return self.next_id
+
+    def draw_line(self, *args, **kwargs):
+        return self._new('line')
+
+    def draw_rectangle(self, *args, **kwargs):
+        return self._new('rect')
+
+    def draw_circle(self, *args, **kwargs):
+        return self._new('circle')
+
+    def delete_figure(self, figure):
+        self.alive.remove(figure)
+        self.calls.append(('delete', figure))
+
+    def send_figure_to_back(self, figure):
+        pass
+
+
+class TestMapRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.world, self.time_manager = build_world(default_scenario(), seed=2)
+        self.graph = FakeGraph()
+        self.renderer = MapRenderer(self.graph, self.world.width, self.world.height, 30,
+                                    {'Lumiere': 'yellow'}, ['Lumiere', 'Obscurite', 'Demi'], 'gray')
+
+    def test_grid_lines_drawn_once(self):
+        """Проверяем, что линии сетки рисуются один раз, а не на каждом кадре"""
+        self.renderer.update(self.world)
+        random.seed(0)
+        for _ in range(5):
+            self.world.tick()
+            self.time_manager.advance_time()
+            self.renderer.update(self.world)
+        lines = [call for call in self.graph.calls if call[0] == 'line']
+        self.assertEqual(len(lines), self.world.width + self.world.height + 2)
+
+    def test_only_changed_cells_are_touched(self):
+        """Проверяем, что после тика трогаются только изменившиеся клетки и фигуры совпадают с миром"""
+        self.renderer.update(self.world)
+        random.seed(1)
+        for _ in range(10):
+            self.world.tick()
+            self.time_manager.advance_time()
+            changed = len(self.world.dirty)
+            self.graph.calls.clear()
+            self.renderer.update(self.world)
+            self.assertLessEqual(len(self.graph.calls), 2 * changed)
+
+        occupied = {(entity.x, entity.y) for entity in self.world.iter_entities()}
+        self.assertEqual(set(self.renderer.figures), occupied)
+        self.assertEqual(len(self.graph.alive), len(occupied) + self.world.width + self.world.height + 2)
+
+    def test_idle_frame_draws_nothing(self):
+        """Проверяем, что кадр без изменений не создает и не удаляет фигур"""
+        self.renderer.update(self.world)
+        self.graph.calls.clear()
+        self.assertEqual(self.renderer.update(self.world), 0)
+        self.assertEqual(self.graph.calls, [])
+
+
+    def test_frame_changes_applied_to_own_map(self):
+        """Проверяем, что кадры с одними изменениями собираются в полную карту и подсветка берет данные из нее"""
+        def frame(cells, selected=None):
+            return Frame(tick=0, phase='day', running=False, ticks_per_sec=0.0, cells=cells,
+                         changed=frozenset(cells), selected=selected, action_cells=(), info=None, stats='')
+
+        self.renderer.draw_frame(frame({(1, 1): ('Pauvre', 100), (2, 2): ('Lumiere', None)}))
+        self.renderer.draw_frame(frame({(2, 2): None}))
+        self.assertEqual(self.renderer.cells, {(1, 1): ('Pauvre', 100)})
+        self.assertEqual(set(self.renderer.figures), {(1, 1)})
+        # Выбор животного перерисовывает его клетку по копии карты, хотя кадр ее не несет
+        self.renderer.draw_frame(frame({}, selected=(1, 1)))
+        self.assertEqual(self.renderer.figures[(1, 1)][0][3], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
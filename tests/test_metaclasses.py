@@ -11,8 +11,11 @@ from entities.plants.obscurite import Obscurite
 from entities.plants.demi import Demi
 from entities.animals.pauvre import Pauvre
 from entities.animals.malheureux import Malheureux
+from entities.animal import Animal
 from world.time_manager import TimeManager
 from world.grid import Grid
+from entities.group import Group
+from entity_factory import create_plant_class, create_animal_class
 
 
 class TestMetaclasses(unittest.TestCase):
@@ -23,29 +26,7 @@ class TestMetaclasses(unittest.TestCase):
         self.grid = Grid(10, 10, [[None for _ in range(10)] for _ in range(10)])
         
         # Создаем временную группу для животных
-        class MockGroup:
-            def __init__(self):
-                self.members = []
-                self.group_number = 1
-                self.aggression = 0
-            
-            def add_member(self, animal):
-                self.members.append(animal)
-            
-            def remove_member(self, animal):
-                if animal in self.members:
-                    self.members.remove(animal)
-            
-            def get_group_size(self):
-                return len(self.members)
-                
-            def split(self):
-                pass
-                
-            def update_aggression_level(self):
-                pass
-        
-        self.mock_group = MockGroup()
+        self.mock_group = Group(1)
     
     def test_registry_creation(self):
         """Проверяем, что классы правильно регистрируются в реестре"""
@@ -117,6 +98,114 @@ class TestMetaclasses(unittest.TestCase):
         # Голод не должен уменьшаться в неактивной фазе
         self.assertEqual(animal.hunger, initial_hunger)
 
+    def test_clone_shares_world_and_copies_state(self):
+        """Проверяем, что клон разделяет мир, таймер и группу, но имеет свое состояние"""
+        animal = Pauvre(1, 1, self.grid, self.time_manager, self.mock_group)
+        self.grid.place_entity(animal, 1, 1)
+        animal.hunger = 42
+        
+        child = animal.clone()
+        self.assertIsNot(child, animal)
+        self.assertIs(type(child), Pauvre)
+        self.assertIs(child.world, self.grid)
+        self.assertIs(child.timer, self.time_manager)
+        self.assertIs(child.group, self.mock_group)
+        self.assertEqual(child.hunger, 42)
+        
+        child.hunger = 100
+        self.assertEqual(animal.hunger, 42)
+        
+        plant = Lumiere(2, 2, None, self.grid, self.time_manager)
+        self.grid.place_entity(plant, 2, 2)
+        self.grid.duplicate_entity(plant, 3, 2)
+        copy = self.grid.cells[2][3]
+        self.assertIs(type(copy), Lumiere)
+        self.assertIs(copy.timer, self.time_manager)
+        self.assertEqual((copy.x, copy.y), (3, 2))
+
+    def test_entities_use_slots(self):
+        """Проверяем, что у особей всех видов, в том числе динамических, нет __dict__"""
+        Fougere = create_plant_class('Fougere', 'F', ['night'], ['day'])
+        Renard = create_animal_class('Renard', 'R', ['night'], ['Pauvre'])
+        entities = [Lumiere(1, 1, None, self.grid, self.time_manager),
+                    Fougere(2, 2, None, self.grid, self.time_manager),
+                    Pauvre(3, 3, self.grid, self.time_manager, self.mock_group),
+                    Renard(4, 4, self.grid, self.time_manager, self.mock_group)]
+        for entity in entities:
+            self.assertFalse(hasattr(entity, '__dict__'), type(entity).__name__)
+            with self.assertRaises(AttributeError):
+                entity.unknown_field = 1
+        # Константы вида лежат в классе
+        self.assertEqual(Renard.eatable_entities, ('Pauvre',))
+        self.assertEqual(Malheureux.eatable_entities, ('Demi', 'Obscurite', 'Pauvre'))
+        self.assertIsNone(entities[3].reproduce_condition)
+
+    def test_legacy_animal_arguments_accepted(self):
+        """Проверяем, что старые аргументы Animal.__init__ принимаются с предупреждением и не меняют констант вида"""
+        class OldStyle(Pauvre):
+            def __init__(self, x, y, world, timer, group):
+                Animal.__init__(self, x, y, 'o', world, timer, group, ['Demi'], None, None, 70)
+
+        with self.assertWarns(DeprecationWarning):
+            animal = OldStyle(1, 1, self.grid, self.time_manager, self.mock_group)
+        self.assertEqual(animal.hunger, 70)
+        self.assertIs(animal.eatable_entities, OldStyle.eatable_entities)
+        self.assertNotIn('Demi', animal.eatable_entities)
+        self.assertIsNone(animal.eat_condition)
+
+    def test_removed_animal_does_not_act(self):
+        """Проверяем, что животное, выбывшее из мира раньше в тике, не ходит и не трогает группу"""
+        self.time_manager.current_phase = 'day'
+        animal = Pauvre(1, 1, self.grid, self.time_manager, self.mock_group)
+        self.grid.place_entity(animal, 1, 1)
+        animal.hunger = 1
+        # Сущность уже в перемешанном списке тика, когда ее съедают или вытесняют
+        self.grid.remove_entity(animal)
+        animal.act()
+        self.assertEqual(animal.hunger, 1)
+        self.assertEqual(self.mock_group.aggression, 0)
+
+    def test_food_resolved_for_species_created_later(self):
+        """Проверяем, что животное ест вид из FOOD_SOURCES, созданный после него"""
+        Chevre = create_animal_class("Chevre", "C", ['morning'], ['Chardon'])
+        Chardon = create_plant_class("Chardon", "h", ['day'], ['night'])
+        goat = Chevre(5, 5, self.grid, self.time_manager, self.mock_group)
+        self.grid.place_entity(goat, 5, 5)
+        goat.hunger = 40
+        self.grid.place_entity(Chardon(5, 6, None, self.grid, self.time_manager), 5, 6)
+        self.grid.place_entity(Lumiere(4, 5, None, self.grid, self.time_manager), 4, 5)
+        goat.eat()
+        self.assertEqual(goat.hunger, 100)
+        self.assertIsNone(self.grid.get_entity(5, 6))
+        self.assertIs(type(self.grid.get_entity(4, 5)), Lumiere)
+
+    def test_none_conditions_disable_actions(self):
+        """Проверяем, что условие None у вида отключает размножение и поедание своего вида"""
+        self.mock_group.aggression = 1
+        first = Malheureux(1, 1, self.grid, self.time_manager, self.mock_group)
+        second = Malheureux(1, 2, self.grid, self.time_manager, self.mock_group)
+        self.grid.place_entity(first, 1, 1)
+        self.grid.place_entity(second, 1, 2)
+        for _ in range(10):
+            first.eat()
+        self.assertIs(self.grid.get_entity(1, 2), second)
+
+        self.mock_group.aggression = 0
+        first.reproduce()
+        self.assertEqual(self.grid.count_by_species()['Malheureux'], 2)
+        # Правило вида (стратегия 'different_group') не пускает партнера из той же группы,
+        # а правило 'same_group' у Pauvre - пускает
+        for cls in (Malheureux, Pauvre):
+            cls.reproduce_condition = cls.reproduce_rule
+            self.addCleanup(setattr, cls, 'reproduce_condition', None)
+        first.reproduce()
+        self.assertEqual(self.grid.count_by_species()['Malheureux'], 2)
+        pauvre = Pauvre(7, 7, self.grid, self.time_manager, self.mock_group)
+        self.grid.place_entity(pauvre, 7, 7)
+        self.grid.place_entity(Pauvre(7, 8, self.grid, self.time_manager, self.mock_group), 7, 8)
+        pauvre.reproduce()
+        self.assertGreater(self.grid.count_by_species()['Pauvre'], 2)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
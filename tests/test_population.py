@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+import io
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.plant import Plant
+from entities.animal import Animal
+from ensemble import build_world, default_scenario
+from world.snapshot import save_snapshot, load_snapshot
+
+
+class Trefle(Plant):
+    """Вид, созданный в тесте: статистика должна учитывать и его"""
+    ACTIVE_PHASES = ['day', 'night']
+    SEMI_ACTIVE_PHASES = []
+    INACTIVE_PHASES = ['morning', 'evening']
+
+    def __init__(self, x, y, symbol, world, timer):
+        super().__init__(x, y, "T", world, timer)
+
+
+class Lievre(Animal):
+    ACTIVE_PHASES = ['morning', 'day', 'evening', 'night']
+    FOOD_SOURCES = ['Trefle', 'Demi']
+
+    def __init__(self, x, y, world, timer, group):
+        super().__init__(x, y, 'H', world, timer, group)
+
+
+def recount(world):
+    """Статистика полным обходом сущностей, как ее считал stats.get_detailed_stats"""
+    result = {}
+    for entity in world.iter_entities():
+        species = result.setdefault(type(entity).__name__, {'count': 0, 'total_hunger': 0, 'groups': {},
+                                                            'growing': 0, 'active': 0})
+        species['count'] += 1
+        if hasattr(entity, 'hunger'):
+            species['total_hunger'] += entity.hunger
+            number = entity.group.group_number
+            species['groups'][number] = species['groups'].get(number, 0) + 1
+        elif entity.is_growing:
+            species['growing'] += 1
+        if entity.timer.current_phase in type(entity).ACTIVE_PHASES:
+            species['active'] += 1
+    return result
+
+
+def accumulated(world):
+    return {name: {'count': s.count, 'total_hunger': s.total_hunger, 'groups': s.groups,
+                   'growing': s.growing, 'active': s.active}
+            for name, s in world.population_stats().items()}
+
+
+def scenario(backend, plant_mode=None):
+    scenario = dict(default_scenario(), backend=backend, ticks_per_phase=3)
+    scenario['plants'] = dict(scenario['plants'], Trefle=60)
+    scenario['animals'] = dict(scenario['animals'], Lievre=15)
+    return scenario
+
+
+class TestPopulationStats(unittest.TestCase):
+
+    def check_run(self, world, time_manager, ticks=24):
+        self.assertEqual(accumulated(world), recount(world))
+        for _ in range(ticks):
+            world.tick()
+            time_manager.advance_time()
+            self.assertEqual(accumulated(world), recount(world))
+
+    def test_objects_backend_matches_full_scan(self):
+        """Проверяем, что накопитель объектного мира совпадает с полным обходом на каждом тике"""
+        world, time_manager = build_world(scenario('objects'), seed=4)
+        self.assertIn('Trefle', world.population_stats())
+        self.check_run(world, time_manager)
+
+    def test_array_backend_matches_full_scan(self):
+        """Проверяем накопитель массивного мира в обоих режимах шага растений"""
+        for plant_mode in ('entity', 'batched'):
+            world, time_manager = build_world(scenario('arrays'), seed=4)
+            world.plant_mode = plant_mode
+            self.check_run(world, time_manager)
+
+    def test_snapshot_restores_accumulator(self):
+        """Проверяем, что загруженный снимок сразу дает верную статистику"""
+        world, time_manager = build_world(scenario('objects'), seed=8)
+        for _ in range(10):
+            world.tick()
+            time_manager.advance_time()
+        stream = io.BytesIO()
+        save_snapshot(stream, world, time_manager)
+        for backend in ('objects', 'arrays'):
+            stream.seek(0)
+            loaded, loaded_time, _ = load_snapshot(stream, backend=backend)
+            self.assertEqual(accumulated(loaded), recount(world))
+            self.check_run(loaded, loaded_time, ticks=6)
+
+    def test_averages(self):
+        """Проверяем средний голод и число спящих растений"""
+        world, _ = build_world(scenario('objects'), seed=1)
+        stats = world.population_stats()
+        self.assertEqual(stats['Pauvre'].avg_hunger, 100)
+        self.assertEqual(stats['Trefle'].dormant, stats['Trefle'].count)
+        self.assertEqual(stats['Lievre'].dormant, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import random
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.animals.pauvre import Pauvre
+from entities.plants.lumiere import Lumiere
+from entities.group import Group
+from world import create_grid
+from world.time_manager import TimeManager
+from world.profiler import TickProfiler, BATCHED_PLANTS, BATCHED_ANIMALS
+
+
+class TestTickProfiler(unittest.TestCase):
+
+    def build(self, backend):
+        random.seed(3)
+        world = create_grid(10, 10, backend)
+        timer = TimeManager(10)
+        timer.current_phase = 'morning'
+        if backend == 'arrays':
+            world.timer = timer
+            world.plant_mode = world.animal_mode = 'entity'
+        group = Group(1)
+        for x in range(5):
+            world.place_entity(Lumiere(x, 0, None, world, timer), x, 0)
+            animal = Pauvre(x, 5, world, timer, group)
+            world.place_entity(animal, x, 5)
+            group.add_member(animal)
+        return world
+
+    def test_counts_actions_per_species(self):
+        """Проверяем, что профилировщик считает act каждого вида на обоих бэкендах"""
+        for backend in ('objects', 'arrays'):
+            world = self.build(backend)
+            profiler = TickProfiler().attach(world)
+            world.tick()
+            self.assertEqual(profiler.ticks, 1)
+            self.assertEqual(profiler.stats[('Lumiere', 'act')][0], 5)
+            self.assertIn(('Pauvre', 'move'), profiler.stats)
+            self.assertIn('Pauvre', profiler.table(last_tick=True))
+            profiler.detach(world)
+
+    def test_batched_steps_recorded(self):
+        """Проверяем, что пакетные шаги растений и животных попадают в таблицу одной строкой"""
+        world = self.build('arrays')
+        world.plant_mode = world.animal_mode = 'batched'
+        profiler = TickProfiler().attach(world)
+        world.tick()
+        self.assertEqual(profiler.stats[(BATCHED_PLANTS, 'plant_step')][0], 1)
+        self.assertEqual(profiler.stats[(BATCHED_ANIMALS, 'animal_step')][0], 1)
+        self.assertNotIn(('Pauvre', 'act'), profiler.stats)
+        profiler.detach(world)
+
+    def test_detach_restores_methods(self):
+        """Проверяем, что после отключения инжектированные методы возвращаются на место"""
+        original = Pauvre.__dict__['move']
+        world = self.build('objects')
+        profiler = TickProfiler().attach(world)
+        world.tick()
+        self.assertIsNot(Pauvre.__dict__['move'], original)
+        profiler.detach(world)
+        self.assertIs(Pauvre.__dict__['move'], original)
+        self.assertIsNone(world.profiler)
+
+
+if __name__ == '__main__':
+    unittest.main()
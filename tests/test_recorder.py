@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from recorder import TimeSeriesRecorder
+from timeline import Timeline
+
+
+class TestTimeSeriesRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.world, self.time_manager = build_world(default_scenario(), seed=2)
+
+    def run_ticks(self, recorder, first, last):
+        for tick in range(first, last + 1):
+            self.world.tick()
+            self.time_manager.advance_time()
+            recorder.record(tick, self.world)
+
+    def test_rows_follow_world(self):
+        """Проверяем, что строка тика совпадает со статистикой мира, а события - с его счетчиками"""
+        recorder = TimeSeriesRecorder(capacity=64)
+        recorder.record(0, self.world)
+        births, deaths = self.world.births, self.world.deaths
+        self.run_ticks(recorder, 1, 30)
+
+        columns = recorder.columns()
+        self.assertEqual(columns['tick'].tolist(), list(range(31)))
+        for name, count in self.world.count_by_species().items():
+            self.assertEqual(columns[name][-1], count)
+        self.assertEqual(columns['births'].sum(), self.world.births - births)
+        self.assertEqual(columns['deaths'].sum(), self.world.deaths - deaths)
+        stats = self.world.population_stats()
+        self.assertEqual(columns['groups'][-1], sum(len(s.groups) for s in stats.values()))
+
+    def test_memory_is_bounded_and_old_rows_are_coarser(self):
+        """Проверяем, что буфер не растет, а огрубление сохраняет события и последний тик"""
+        recorder = TimeSeriesRecorder(capacity=8)
+        recorder.record(0, self.world)
+        births = self.world.births
+        nbytes = recorder.nbytes()
+        self.run_ticks(recorder, 1, 60)
+
+        columns = recorder.columns()
+        self.assertLessEqual(recorder.size, 8)
+        self.assertEqual(recorder.nbytes(), nbytes)
+        self.assertEqual(columns['span'].sum(), 61)
+        self.assertEqual(columns['births'].sum(), self.world.births - births)
+        self.assertEqual(columns['tick'][-1], 60)
+        self.assertEqual(columns['span'][-1], 1)
+        self.assertGreater(columns['span'][0], columns['span'][-1])
+        self.assertTrue(np.all(np.diff(columns['tick']) > 0))
+
+    def test_rewind_with_timeline(self):
+        """Проверяем, что после перемотки назад ряды продолжаются без разрыва в событиях"""
+        timeline = Timeline(self.world, self.time_manager, seed=1, interval=10)
+        recorder = TimeSeriesRecorder(capacity=64)
+        recorder.record(0, timeline.world)
+        for _ in range(25):
+            timeline.step()
+            recorder.record(timeline.tick, timeline.world)
+        births = recorder.columns()['births'][:16].copy()
+
+        timeline.seek(12)
+        recorder.rewind(12, timeline.world)
+        self.assertEqual(recorder.columns()['tick'][-1], 12)
+        for _ in range(3):
+            timeline.step()
+            recorder.record(timeline.tick, timeline.world)
+        self.assertEqual(recorder.columns()['births'].tolist(), births.tolist())
+
+    def test_export(self):
+        """Проверяем экспорт в CSV и .npz"""
+        recorder = TimeSeriesRecorder(capacity=16)
+        recorder.record(0, self.world)
+        self.run_ticks(recorder, 1, 5)
+        directory = tempfile.mkdtemp()
+        csv_path, npz_path = os.path.join(directory, 'series.csv'), os.path.join(directory, 'series.npz')
+        recorder.to_csv(csv_path)
+        recorder.to_npz(npz_path)
+
+        with open(csv_path) as stream:
+            header = stream.readline().strip().split(',')
+        table = np.loadtxt(csv_path, delimiter=',', skiprows=1)
+        self.assertEqual(header[:2], ['tick', 'span'])
+        self.assertEqual(table.shape, (6, len(header)))
+        self.assertEqual(table[:, header.index('Pauvre')].tolist(), recorder.columns()['Pauvre'].tolist())
+
+        with np.load(npz_path) as data:
+            self.assertEqual(data['species'].tolist(), list(recorder.species))
+            self.assertEqual(data['tick'].tolist(), list(range(6)))
+        os.remove(csv_path)
+        os.remove(npz_path)
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import gc
+import sys
+import os
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.plants.lumiere import Lumiere
+from entities.animals.malheureux import Malheureux
+from entities.animals.pauvre import Pauvre
+from entities.group import Group
+from world.time_manager import TimeManager
+from world.grid import Grid
+from world.array_grid import ArrayGrid
+
+
+class TestPhaseScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.time_manager = TimeManager(1)
+        self.grid = Grid(10, 10, [[None for _ in range(10)] for _ in range(10)])
+        self.group = Group(1)
+        self.plant = self.place(Lumiere(0, 0, None, self.grid, self.time_manager))
+        self.pauvre = self.place(Pauvre(4, 4, self.grid, self.time_manager, self.group))
+        self.malheureux = self.place(Malheureux(8, 8, self.grid, self.time_manager, self.group))
+
+    def place(self, entity):
+        self.grid.place_entity(entity, entity.x, entity.y)
+        return entity
+
+    def scheduled(self):
+        return set(self.grid.scheduler.active_entities())
+
+    def test_follows_phase_changes(self):
+        """Проверяем, что после смены фазы в тик попадают только активные виды"""
+        self.assertEqual(self.scheduled(), {self.plant, self.pauvre, self.malheureux})
+        self.time_manager.advance_time()  # day
+        self.assertEqual(self.grid.scheduler.phase, 'day')
+        self.assertEqual(self.scheduled(), {self.plant, self.pauvre})
+        self.time_manager.advance_time()  # evening
+        self.time_manager.advance_time()  # night
+        self.assertEqual(self.scheduled(), {self.plant})
+
+    def test_direct_phase_assignment(self):
+        """Проверяем, что фаза, присвоенная в обход advance_time, тоже учитывается"""
+        self.time_manager.current_phase = 'night'
+        self.assertEqual(self.scheduled(), {self.plant})
+
+    def test_sleeping_animals_are_not_called(self):
+        """Проверяем, что тик не меняет спящих животных"""
+        self.time_manager.current_phase = 'night'
+        hunger = (self.pauvre.hunger, self.malheureux.hunger)
+        position = (self.pauvre.x, self.pauvre.y, self.malheureux.x, self.malheureux.y)
+        self.grid.tick()
+        self.assertEqual((self.pauvre.hunger, self.malheureux.hunger), hunger)
+        self.assertEqual((self.pauvre.x, self.pauvre.y, self.malheureux.x, self.malheureux.y), position)
+
+    def test_timer_does_not_keep_world_alive(self):
+        """Проверяем, что подписка таймера не удерживает выброшенный мир"""
+        # Группа держит своих членов, а они - мир
+        self.grid = self.group = self.plant = self.pauvre = self.malheureux = None
+        gc.collect()
+        self.time_manager.advance_time()
+        self.assertEqual(self.time_manager._listeners, [])
+
+
+class TestArrayGridActiveSet(unittest.TestCase):
+
+    def test_sleeping_animals_are_skipped(self):
+        """Проверяем, что ArrayGrid не ходит спящими видами"""
+        time_manager = TimeManager(10, current_phase='day')
+        world = ArrayGrid(10, 10, seed=1)
+        group = Group(1)
+        world.place_entity(Malheureux(3, 3, world, time_manager, group), 3, 3)
+        world.place_entity(Lumiere(7, 7, None, world, time_manager), 7, 7)
+        before = world.species.copy(), world.hunger.copy()
+        world.tick()
+        self.assertTrue(np.array_equal(world.species, before[0]))
+        self.assertTrue(np.array_equal(world.hunger, before[1]))
+        self.assertTrue(world.growing[7, 7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import time
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from timeline import Timeline
+from sim_worker import Frame, FrameBuffer, SimulationWorker
+from recorder import TimeSeriesRecorder
+
+
+def make_frame(tick, cells):
+    return Frame(tick=tick, phase='morning', running=True, ticks_per_sec=0.0, cells=cells,
+                 changed=frozenset(cells), selected=None, action_cells=(), info=None, stats='')
+
+
+class TestFrameBuffer(unittest.TestCase):
+
+    def test_skipped_frame_changes_are_merged(self):
+        """Проверяем, что изменения пропущенного кадра попадают в следующий"""
+        frames = FrameBuffer()
+        self.assertIsNone(frames.take())
+        frames.publish(make_frame(1, {(0, 0): ('Pauvre', 90), (2, 2): ('Demi', None)}))
+        frames.publish(make_frame(2, {(1, 1): ('Lumiere', None), (2, 2): None}))
+        frame = frames.take()
+        self.assertEqual(frame.tick, 2)
+        self.assertEqual(frame.changed, {(0, 0), (1, 1), (2, 2)})
+        self.assertEqual(dict(frame.cells), {(0, 0): ('Pauvre', 90), (1, 1): ('Lumiere', None), (2, 2): None})
+        self.assertIsNone(frames.take())
+
+
+class TestSimulationWorker(unittest.TestCase):
+
+    def setUp(self):
+        world, time_manager = build_world(default_scenario(), seed=3)
+        self.worker = SimulationWorker(Timeline(world, time_manager, seed=1, interval=10),
+                                       describe=lambda world, entity: 'info',
+                                       stats=lambda world: str(world.count_by_species()),
+                                       ticks_per_sec=None, max_ticks=30,
+                                       recorder=TimeSeriesRecorder(capacity=64))
+        # Копия карты, которую держит интерфейс: кадры несут только изменения
+        self.cells = {}
+        self.worker.start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def wait_for(self, condition, timeout=10):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            frame = self.worker.frames.take()
+            if frame is not None:
+                for cell, value in frame.cells.items():
+                    if value is None:
+                        self.cells.pop(cell, None)
+                    else:
+                        self.cells[cell] = value
+                if condition(frame):
+                    return frame
+            time.sleep(0.005)
+        self.fail("frame not published in time")
+
+    def test_runs_to_max_ticks_and_publishes_world(self):
+        """Проверяем, что поток доходит до max_ticks, останавливается и кадр совпадает с миром"""
+        self.worker.start_running()
+        frame = self.wait_for(lambda frame: frame.tick == 30 and not frame.running)
+        world = self.worker.timeline.world
+        expected = {(e.x, e.y): (type(e).__name__, getattr(e, 'hunger', None)) for e in world.iter_entities()}
+        self.assertEqual(self.cells, expected)
+        self.assertEqual(frame.stats, str(world.count_by_species()))
+
+    def test_frames_carry_changes_only(self):
+        """Проверяем, что кадр без тиков не несет клеток и не пересчитывает статистику"""
+        calls = []
+        stats = self.worker.stats
+        self.worker.stats = lambda world: calls.append(1) or stats(world)
+        self.worker.start_running()
+        self.wait_for(lambda frame: frame.tick == 30 and not frame.running)
+        before = len(calls)
+        self.worker.publish()
+        frame = self.worker.frames.take()
+        self.assertEqual(len(frame.cells), 0)
+        self.assertEqual(len(calls), before)
+        self.assertEqual(frame.stats, str(self.worker.timeline.world.count_by_species()))
+
+    def test_seek_backward(self):
+        """Проверяем, что команда seek перематывает ленту назад"""
+        self.worker.start_running()
+        self.wait_for(lambda frame: frame.tick == 30 and not frame.running)
+        self.worker.seek(12)
+        frame = self.wait_for(lambda frame: frame.tick == 12)
+        self.assertEqual(self.worker.timeline.tick, 12)
+        # График численности тоже перемотан
+        self.assertEqual(frame.series[0], list(range(13)))
+        self.assertEqual(len(self.cells), sum(self.worker.timeline.world.count_by_species().values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
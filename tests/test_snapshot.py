@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from world.snapshot import save_snapshot, load_snapshot, SnapshotError
+
+
+def cells(world):
+    return sorted((e.x, e.y, type(e).__name__, getattr(e, 'hunger', None), getattr(e, 'active', None),
+                   getattr(getattr(e, 'group', None), 'group_number', None),
+                   getattr(getattr(e, 'group', None), 'aggression', None))
+                  for e in world.iter_entities())
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.npz')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def run_ticks(self, world, time_manager, ticks):
+        for _ in range(ticks):
+            world.tick()
+            time_manager.advance_time()
+
+    def test_round_trip_both_backends(self):
+        """Проверяем, что снимок восстанавливает сущности, группы и время в любом бэкенде"""
+        for backend in ('objects', 'arrays'):
+            scenario = dict(default_scenario(), backend=backend)
+            world, time_manager = build_world(scenario, seed=5)
+            self.run_ticks(world, time_manager, 15)
+            save_snapshot(self.path, world, time_manager, tick=15)
+
+            for target in ('objects', 'arrays'):
+                loaded, loaded_time, tick = load_snapshot(self.path, backend=target)
+                self.assertEqual(tick, 15)
+                self.assertEqual(cells(loaded), cells(world))
+                self.assertEqual(loaded.count_by_species(), world.count_by_species())
+                self.assertEqual(loaded_time.current_phase, time_manager.current_phase)
+                self.assertEqual(loaded_time.tick_counter, time_manager.tick_counter)
+
+    def test_loaded_world_continues_identically(self):
+        """Проверяем, что мир после загрузки продолжает прогон так же, как исходный"""
+        world, time_manager = build_world(default_scenario(), seed=11)
+        # После 50 тиков голод поднимает агрессивность и небольших групп
+        self.run_ticks(world, time_manager, 90)
+        aggression = {g.group_number: g.aggression for g in world.group_registry}
+        self.assertTrue(any(g.aggression and g.get_group_size() <= 5 for g in world.group_registry))
+        save_snapshot(self.path, world, time_manager)
+        loaded, loaded_time, _ = load_snapshot(self.path)
+        self.assertEqual({g.group_number: g.aggression for g in loaded.group_registry}, aggression)
+
+        world.rng.seed(99)
+        self.run_ticks(world, time_manager, 10)
+        loaded.rng.seed(99)
+        self.run_ticks(loaded, loaded_time, 10)
+        self.assertEqual(cells(loaded), cells(world))
+
+    def test_unknown_species(self):
+        """Проверяем, что незарегистрированный вид в снимке дает понятную ошибку"""
+        world, time_manager = build_world(default_scenario(), seed=1)
+        save_snapshot(self.path, world, time_manager)
+        with np.load(self.path) as data:
+            arrays = {key: data[key] for key in data.files}
+        arrays['species_names'] = np.array(['Unknown'] * len(arrays['species_names']))
+        np.savez(self.path, **arrays)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import json
+import subprocess
+import sys
+import os
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Безголовое ядро: движок, статистика, фабрика видов и пакетные прогоны.
+# Эти модули не должны тянуть GUI, открывать файлы и запускать потоки при импорте
+CORE_MODULES = [
+    'config', 'logger', 'meta_classes', 'entity_factory', 'stats', 'ensemble', 'timeline', 'recorder', 'main',
+    'world', 'world.grid', 'world.chunked_grid', 'world.array_grid', 'world.snapshot', 'world.tiled_tick',
+    'world.profiler', 'entities.group', 'entities.plants.lumiere', 'entities.plants.obscurite',
+    'entities.plants.demi', 'entities.animals.pauvre', 'entities.animals.malheureux',
+]
+
+# Бюджет импорта ядра в секундах (без NumPy, время импорта которого зависит от сборки)
+IMPORT_BUDGET = 0.5
+
+PROBE = """
+import importlib, json, sys, threading, time
+import numpy
+start = time.perf_counter()
+for name in %r:
+    importlib.import_module(name)
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'gui': sorted(name for name in ('PySimpleGUI', 'gui') if name in sys.modules),
+    'threads': threading.active_count(),
+}))
+""" % (CORE_MODULES,)
+
+
+def probe(cwd):
+    """Импортирует ядро в чистом процессе и возвращает замеры"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestHeadlessStartup(unittest.TestCase):
+
+    def test_core_import_has_no_side_effects(self):
+        """Проверяем, что импорт ядра не загружает GUI, не создает файлов и не запускает потоков"""
+        with tempfile.TemporaryDirectory() as cwd:
+            result = probe(cwd)
+            self.assertEqual(os.listdir(cwd), [])
+        self.assertEqual(result['gui'], [])
+        self.assertEqual(result['threads'], 1)
+
+    def test_core_import_time_budget(self):
+        """Проверяем, что импорт ядра укладывается в бюджет (лучший из трех запусков)"""
+        with tempfile.TemporaryDirectory() as cwd:
+            seconds = min(probe(cwd)['seconds'] for _ in range(3))
+        self.assertLess(seconds, IMPORT_BUDGET, f"core import took {seconds:.3f}s")
+
+
+if __name__ == '__main__':
+    unittest.main()
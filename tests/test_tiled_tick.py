@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from world.tiled_tick import TiledTicker, HALO
+from world.profiler import TickProfiler
+
+
+# Повторы с разными сидами и допустимое отклонение средних в стандартных ошибках
+REPLICATES = 12
+Z_LIMIT = 4
+
+
+def scenario(size=64, per_species=250):
+    result = dict(default_scenario(), backend='arrays', width=size, height=size)
+    result['plants'] = {name: per_species for name in result['plants']}
+    result['animals'] = {name: per_species for name in result['animals']}
+    return result
+
+
+def run_tiled(workers, ticks=8, seed=3):
+    world, time_manager = build_world(scenario(), seed=1)
+    with TiledTicker(world, workers=workers, tile_size=16, seed=seed):
+        for _ in range(ticks):
+            world.tick()
+            time_manager.advance_time()
+    return world
+
+
+class TestTiledTick(unittest.TestCase):
+
+    def test_bookkeeping_matches_arrays(self):
+        """Проверяем, что счетчики, слитые из процессов, совпадают с пересчетом по массивам"""
+        world = run_tiled(workers=2)
+        for code in range(1, len(world.species_table)):
+            cells = world.species == code
+            self.assertEqual(world.species_counts[code], np.count_nonzero(cells))
+            animals = cells & (world.group_id != -1)
+            self.assertEqual(world.hunger_totals[code], int(world.hunger[animals].sum()))
+        for gid in range(len(world.groups)):
+            self.assertEqual(world.group_sizes[gid], np.count_nonzero(world.group_id == gid))
+
+    def test_result_does_not_depend_on_workers(self):
+        """Проверяем, что при одном сиде результат не зависит от числа процессов"""
+        one, two = run_tiled(workers=1), run_tiled(workers=2)
+        self.assertTrue(np.array_equal(one.species, two.species))
+        self.assertTrue(np.array_equal(one.hunger, two.hunger))
+        self.assertTrue(np.array_equal(one.group_id, two.group_id))
+        self.assertEqual(one.group_sizes, two.group_sizes)
+
+    def test_close_restores_private_arrays(self):
+        """Проверяем, что close() возвращает миру обычные массивы и последовательный тик"""
+        world, time_manager = build_world(scenario(), seed=1)
+        tiler = TiledTicker(world, workers=1, tile_size=16)
+        world.tick()
+        time_manager.advance_time()
+        tiler.close()
+        self.assertIsNone(world.tiler)
+        self.assertTrue(world.species.flags.owndata)
+        world.tick()
+        self.assertEqual(sum(world.species_counts[1:]), np.count_nonzero(world.species))
+
+    def test_rejects_small_tiles_and_object_backend(self):
+        """Проверяем проверку аргументов: плитка меньше двух ореолов и объектный мир"""
+        world, _ = build_world(scenario(), seed=1)
+        with self.assertRaises(ValueError):
+            TiledTicker(world, workers=1, tile_size=2 * HALO - 1)
+        objects, _ = build_world(dict(scenario(), backend='objects'), seed=1)
+        with self.assertRaises(ValueError):
+            TiledTicker(objects, workers=1)
+
+    def test_rejects_profiler(self):
+        """Проверяем, что плиточный тик и профилировщик не подключаются к миру вместе"""
+        world, _ = build_world(scenario(), seed=1)
+        profiler = TickProfiler().attach(world)
+        with self.assertRaises(ValueError):
+            TiledTicker(world, workers=1, tile_size=16)
+        profiler.detach(world)
+        with TiledTicker(world, workers=1, tile_size=16):
+            with self.assertRaises(ValueError):
+                TickProfiler().attach(world)
+
+    def test_statistically_close_to_serial(self):
+        """Проверяем, что численность видов по плиткам совпадает с последовательным тиком в пределах погрешности"""
+        species = list(scenario()['plants']) + list(scenario()['animals'])
+        serial, tiled = [], []
+        for seed in range(REPLICATES):
+            for results, workers in ((serial, 0), (tiled, 1)):
+                world, time_manager = build_world(scenario(), seed=seed)
+                # Плитки ходят поэлементно, с ними сравнивается поэлементный тик
+                world.plant_mode = world.animal_mode = 'entity'
+                tiler = TiledTicker(world, workers=workers, tile_size=16, seed=seed) if workers else None
+                for _ in range(8):
+                    world.tick()
+                    time_manager.advance_time()
+                if tiler is not None:
+                    tiler.close()
+                counts = world.count_by_species()
+                results.append([counts.get(name, 0) for name in species])
+        serial, tiled = np.array(serial, dtype=np.float64), np.array(tiled, dtype=np.float64)
+        # Разность средних в пределах Z_LIMIT стандартных ошибок (как t Уэлча в
+        # benchmarks/bench_tiled.py); единица страхует виды с нулевым разбросом
+        error = np.sqrt(serial.var(0, ddof=1) / REPLICATES + tiled.var(0, ddof=1) / REPLICATES)
+        difference = np.abs(serial.mean(0) - tiled.mean(0))
+        for name, d, e in zip(species, difference, error):
+            self.assertLessEqual(d, Z_LIMIT * e + 1, name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import copy
+import sys
+import os
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entities.plants.lumiere import Lumiere
+from entities.animals.malheureux import Malheureux
+from meta_classes import EAT_FORAGE, EAT_OPPORTUNISTIC
+from world.time_manager import TimeManager
+
+
+class TestTimeManager(unittest.TestCase):
+
+    def setUp(self):
+        self.time_manager = TimeManager(2)
+        self.changes = []
+        self.time_manager.subscribe(self.changes.append)
+
+    def test_phase_ids_and_notifications(self):
+        """Проверяем номера фаз, переход по кругу и оповещение только при смене фазы"""
+        self.assertEqual(self.time_manager.phase_id, 0)
+        for _ in range(8):
+            self.time_manager.advance_time()
+        self.assertEqual(self.time_manager.phase_id, 0)
+        self.assertEqual(self.changes, ['day', 'evening', 'night', 'morning'])
+
+    def test_setter_notifies(self):
+        """Проверяем, что прямое присваивание фазы тоже оповещает подписчиков"""
+        self.time_manager.current_phase = 'night'
+        self.time_manager.current_phase = 'night'
+        self.assertEqual(self.time_manager.phase_id, 3)
+        self.assertEqual(self.changes, ['night'])
+        self.time_manager.unsubscribe(self.changes.append)
+        self.time_manager.current_phase = 'day'
+        self.assertEqual(self.changes, ['night'])
+
+    def test_tables_follow_phase(self):
+        """Проверяем, что таблицы видов пересобираются при смене фазы"""
+        lumiere = self.time_manager.table(Lumiere)
+        malheureux = self.time_manager.table(Malheureux)
+        self.assertEqual((lumiere.active, lumiere.is_growing), (0.5, True))
+        self.assertEqual((malheureux.active, malheureux.eat_mode), (True, EAT_FORAGE))
+
+        self.time_manager.current_phase = 'day'
+        lumiere = self.time_manager.tables[Lumiere]
+        malheureux = self.time_manager.tables[Malheureux]
+        self.assertEqual((lumiere.active, lumiere.is_growing), (1, True))
+        self.assertEqual((malheureux.active, malheureux.eat_mode), (False, EAT_OPPORTUNISTIC))
+        # Веса захвата: активное растение против спящего соседа
+        self.assertEqual(lumiere.capture[0], [0.75, 1.0])
+
+    def test_copy_drops_listeners(self):
+        """Проверяем, что таймер копируется, а копия не оповещает подписчиков оригинала"""
+        self.time_manager.subscribe(self.test_copy_drops_listeners)
+        clone = copy.deepcopy(self.time_manager)
+        self.assertEqual((clone.phase_id, clone._listeners), (0, []))
+        clone.current_phase = 'night'
+        self.assertEqual(self.changes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+
+# Добавляем корневую директорию проекта в путь
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ensemble import build_world, default_scenario
+from timeline import Timeline
+
+
+def cells(world):
+    return sorted((e.x, e.y, type(e).__name__, getattr(e, 'hunger', None)) for e in world.iter_entities())
+
+
+class TestTimeline(unittest.TestCase):
+
+    def make_timeline(self, **kwargs):
+        world, time_manager = build_world(default_scenario(), seed=4)
+        return Timeline(world, time_manager, seed=7, interval=10, **kwargs)
+
+    def test_seek_backward_reproduces_states(self):
+        """Проверяем, что перемотка назад и снова вперед дает те же состояния"""
+        timeline = self.make_timeline()
+        seen = {}
+        for tick in (5, 17, 30, 43):
+            world, time_manager = timeline.seek(tick)
+            seen[tick] = (cells(world), time_manager.current_phase)
+
+        for tick in (17, 5, 43, 30, 0):
+            world, time_manager = timeline.seek(tick)
+            self.assertEqual(timeline.tick, tick)
+            if tick in seen:
+                self.assertEqual((cells(world), time_manager.current_phase), seen[tick])
+
+    def test_memory_budget_evicts_keyframes(self):
+        """Проверяем, что кадры вытесняются по бюджету памяти, а начальный кадр остается"""
+        timeline = self.make_timeline(memory_budget=1)
+        timeline.seek(35)
+        expected = cells(timeline.world)
+        self.assertEqual(list(timeline.keyframes), [0])
+        timeline.seek(3)
+        self.assertEqual(cells(timeline.seek(35)[0]), expected)
+
+    def test_same_seed_same_run(self):
+        """Проверяем, что прогон зависит только от сида ленты"""
+        first = cells(self.make_timeline().seek(25)[0])
+        second = cells(self.make_timeline().seek(25)[0])
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Лента времени симуляции для перемотки ползунка тиков в обе стороны
+
+Каждые interval тиков сохраняется ключевой кадр - снимок мира в памяти
+(world/snapshot.py). Перед каждым тиком поток случайных чисел мира world.rng
+засевается ключом из сида ленты и номера тика, поэтому любой тик можно
+восстановить: берется ближайший более ранний кадр и доигрываются
+оставшиеся тики. Кадры хранятся в пределах memory_budget байт и вытесняются
+по давности использования (LRU); начальный кадр не вытесняется никогда.
+"""
+import io
+from collections import OrderedDict
+import config
+from world.snapshot import save_snapshot, load_snapshot
+from logger import setup_logger, set_current_tick
+
+logger = setup_logger("timeline")
+
+
+def tick_seed(seed, tick):
+    """Ключ потока world.rng для тика: зависит только от сида прогона и номера тика"""
+    return seed, tick
+
+
+class Timeline:
+    def __init__(self, world, time_manager, seed=0, start_tick=0,
+                 interval=config.KEYFRAME_INTERVAL, memory_budget=config.KEYFRAME_MEMORY_MB * 2**20):
+        self.seed = seed
+        self.interval = interval
+        self.memory_budget = memory_budget
+        self.start_tick = start_tick
+        self.keyframes = OrderedDict()  # тик -> байты снимка, от давно использованных к недавним
+        self.keyframe_bytes = 0
+        self.world = world
+        self.time_manager = time_manager
+        self.tick = start_tick
+        self._capture()
+
+    # --- Ключевые кадры ---
+
+    def _capture(self):
+        """
+        Сохраняет кадр текущего тика и продолжает прогон с восстановленного
+        из него мира, чтобы ход вперед и повторное проигрывание от кадра
+        были одним и тем же вычислением
+        """
+        stream = io.BytesIO()
+        save_snapshot(stream, self.world, self.time_manager, tick=self.tick)
+        frame = stream.getvalue()
+        old = self.keyframes.pop(self.tick, None)
+        if old is not None:
+            self.keyframe_bytes -= len(old)
+        self.keyframes[self.tick] = frame
+        self.keyframe_bytes += len(frame)
+        self._evict()
+        self._load(frame)
+
+    def _evict(self):
+        for tick in list(self.keyframes):
+            if self.keyframe_bytes <= self.memory_budget:
+                break
+            if tick == self.start_tick:
+                continue
+            self.keyframe_bytes -= len(self.keyframes.pop(tick))
+
+    def _restore(self, tick):
+        self.keyframes.move_to_end(tick)
+        self._load(self.keyframes[tick])
+
+    def _load(self, frame):
+        world, time_manager, self.tick = load_snapshot(io.BytesIO(frame))
+        # Профилировщик переезжает в восстановленный мир вместе со своей статистикой
+        profiler = self.world.profiler
+        if profiler is not None:
+            profiler.detach(self.world)
+            profiler.attach(world)
+        self.world, self.time_manager = world, time_manager
+
+    # --- Движение по ленте ---
+
+    def step(self):
+        """Проигрывает один тик вперед"""
+        self.tick += 1
+        set_current_tick(self.tick)
+        self.world.rng.seed(*tick_seed(self.seed, self.tick))
+        self.world.tick()
+        self.time_manager.advance_time()
+        if self.tick % self.interval == 0:
+            self._capture()
+
+    def seek(self, tick):
+        """
+        Переводит ленту на тик tick и возвращает (world, time_manager).
+        Проигрывается не больше interval - 1 тиков, если нужный кадр
+        не был вытеснен из памяти
+        """
+        tick = max(tick, self.start_tick)
+        keyframe = max(t for t in self.keyframes if t <= tick)
+        # С текущего состояния идти вперед не дальше, чем от ближайшего кадра
+        if not (keyframe <= self.tick <= tick):
+            self._restore(keyframe)
+        while self.tick < tick:
+            self.step()
+        return self.world, self.time_manager
@@ -0,0 +1,19 @@
+import config
+
+
+def create_grid(width, height, backend=None, seed=None):
+    """
+    Создает пустой мир с бэкендом из config.GRID_BACKEND (или переданным явно).
+    seed засевает поток случайных чисел мира (world.rng); None - сид из random
+    """
+    backend = backend or config.GRID_BACKEND
+    if backend == 'objects':
+        from world.grid import Grid
+        return Grid(width, height, [[None for _ in range(width)] for _ in range(height)], seed=seed)
+    if backend == 'chunked':
+        from world.chunked_grid import ChunkedGrid
+        return ChunkedGrid(width, height, seed=seed)
+    if backend == 'arrays':
+        from world.array_grid import ArrayGrid
+        return ArrayGrid(width, height, seed=seed)
+    raise ValueError(f"Unknown grid backend: {backend}")
@@ -0,0 +1,280 @@
+import numpy as np
+from meta_classes import DIRECTIONS, MOVE, EAT, REPRODUCE, CANNIBAL_EAT, GROUP_EAT
+from world.plant_kernel import neighbor_cells
+
+# Правила поедания своего вида и размножения по кодам видов
+EAT_NONE, EAT_CANNIBAL, EAT_GROUP, EAT_CUSTOM = range(4)
+BREED_NONE, BREED_SAME, BREED_DIFFERENT, BREED_ANY, BREED_CUSTOM = range(5)
+
+DX = np.array([dx for dx, dy in DIRECTIONS])
+DY = np.array([dy for dx, dy in DIRECTIONS])
+
+
+class AnimalTables:
+    """Таблицы по кодам видов для текущей фазы: кто ходит, что ест и как размножается"""
+    def __init__(self, grid, phase):
+        size = len(grid.species_table)
+        self.acting = np.zeros(size, dtype=np.bool_)
+        self.hungry_movement = np.zeros(size, dtype=np.bool_)
+        self.food = np.zeros((size, size), dtype=np.bool_)
+        self.eat_rule = np.zeros(size, dtype=np.int8)
+        self.breed_rule = np.zeros(size, dtype=np.int8)
+        for info in grid.species_table[1:]:
+            if info.is_plant:
+                continue
+            code = info.code
+            self.acting[code] = phase in info.active_phases
+            self.hungry_movement[code] = info.hungry_movement
+            self.food[code, list(info.food_codes)] = True
+            if info.eat_condition is None:
+                self.eat_rule[code] = EAT_NONE
+            elif info.eat_condition is CANNIBAL_EAT:
+                self.eat_rule[code] = EAT_CANNIBAL
+            elif info.eat_condition is GROUP_EAT:
+                self.eat_rule[code] = EAT_GROUP
+            else:
+                self.eat_rule[code] = EAT_CUSTOM
+            if info.reproduce_condition is None:
+                self.breed_rule[code] = BREED_NONE
+            elif info.custom_reproduce:
+                self.breed_rule[code] = BREED_CUSTOM
+            else:
+                self.breed_rule[code] = {True: BREED_SAME, False: BREED_DIFFERENT,
+                                         None: BREED_ANY}[info.partner_same_group]
+
+
+def animal_step(grid, phase, rng):
+    """
+    Пакетный шаг всех животных ArrayGrid за одну фазу.
+
+    Правила те же, что у act из EvalAnimalMeta: голодная особь (голод < 50)
+    поднимает агрессию группы, группа больше 10 особей встает в очередь на
+    деление в конце тика, затем особь выбирает одно из четырех действий
+    (шаг, поедание, размножение, объединение в группу), делает еще один шаг
+    и теряет единицу голода.
+
+    Действия выполняются по очереди для всех особей сразу: шаг тех, кто
+    выбрал шаг, поедание, размножение, объединение, второй шаг всех, голод.
+    Внутри действия особи получают места в случайной очереди, и спорные
+    случаи решаются так, как их решил бы поэлементный тик в этом порядке:
+    из нескольких шагов в одну клетку в ней остается последний, а остальные
+    вытеснены; особь, которую раньше по очереди вытеснили или съели, своего
+    действия не делает; едок, у которого перехватили добычу, ищет следующую.
+    Цепочки таких событий длиннее одного звена не прослеживаются, поэтому
+    совпадение с режимом 'entity' статистическое (tests/test_array_grid.py)
+    """
+    species = grid.species.reshape(-1)
+    hunger = grid.hunger.reshape(-1)
+    group_id = grid.group_id.reshape(-1)
+    acted = grid.acted.reshape(-1)
+
+    tables = AnimalTables(grid, phase)
+    cells = np.flatnonzero(species != 0)
+    cells = cells[tables.acting[species[cells]] & ~acted[cells]]
+    if len(cells) == 0:
+        return
+
+    gids = group_id[cells]
+    for gid in np.unique(gids[hunger[cells] < 50]).tolist():
+        grid.group_aggression[gid] = grid.groups[gid].aggression = 1
+    sizes = np.array(grid.group_sizes)
+    grid.queue_splits(np.unique(gids[sizes[gids] > 10]).tolist())
+
+    actions = rng.integers(4, size=len(cells))
+    alive = np.ones(len(cells), dtype=np.bool_)
+    _move(grid, tables, cells, alive, actions == MOVE, rng)
+    _eat(grid, tables, cells, alive, actions == EAT, rng)
+    _reproduce(grid, tables, cells, alive, actions == REPRODUCE, rng)
+    _form_group(grid, cells, alive, actions > REPRODUCE, rng)
+    _move(grid, tables, cells, alive, alive, rng)
+
+    cells = cells[alive]
+    grid.set_hunger(cells, hunger[cells] - 1)
+    acted[cells] = True
+    grid.clear_cells(cells[hunger[cells] <= 0])
+
+
+def _first_claims(targets, rank):
+    """
+    Для каждой заявки - место в очереди первой заявки на ту же клетку.
+    Возвращает также заявки, отсортированные по клетке и месту в очереди
+    """
+    order = np.lexsort((rank, targets))
+    sorted_targets = targets[order]
+    starts = np.flatnonzero(np.diff(sorted_targets, prepend=-1) != 0)
+    first = np.repeat(rank[order][starts], np.diff(np.r_[starts, len(order)]))
+    return order, sorted_targets, first
+
+
+def _overtaken(sources, targets, rank):
+    """
+    Заявки, чью особь раньше по очереди вытеснил или съел тот, кто
+    претендует на ее клетку: такая особь не успевает сделать свою заявку
+    """
+    order, sorted_targets, first = _first_claims(targets, rank)
+    at = np.minimum(np.searchsorted(sorted_targets, sources), len(order) - 1)
+    return (sorted_targets[at] == sources) & (first[at] < rank)
+
+
+def _snapshot(grid, i):
+    """Снимок сущности клетки с плоским индексом i для пользовательских условий вида"""
+    return grid.get_entity(int(i) % grid.width, int(i) // grid.width)
+
+
+def _kill(grid, cells, alive, victims):
+    """Убирает сущности клеток victims и снимает отметку живых с особей шага"""
+    alive &= ~np.isin(cells, victims)
+    grid.clear_cells(victims)
+
+
+def _move(grid, tables, cells, alive, chosen, rng):
+    movers = np.flatnonzero(chosen & alive)
+    if len(movers) == 0:
+        return
+    src = cells[movers]
+    codes = grid.species.reshape(-1)[src]
+    # Голодная особь с MOVEMENT_PATTERN = 'hungry' остается на месте в двух случаях из трех
+    resting = tables.hungry_movement[codes] & (grid.hunger.reshape(-1)[src] < 50)
+    resting &= rng.random(len(src)) * 3 >= 1
+    direction = rng.integers(4, size=len(src))
+    xs = src % grid.width + DX[direction]
+    ys = src // grid.width + DY[direction]
+    ok = ~resting & (xs >= 0) & (xs < grid.width) & (ys >= 0) & (ys < grid.height)
+    movers, src = movers[ok], src[ok]
+    dst = ys[ok] * grid.width + xs[ok]
+    if len(movers) == 0:
+        return
+
+    rank = rng.permutation(len(src))
+    going = ~_overtaken(src, dst, rank)
+    movers, src, dst, rank = movers[going], src[going], dst[going], rank[going]
+    # Шаги в одну клетку идут по очереди: каждый следующий вытесняет предыдущего,
+    # и в клетке остается последний
+    order, sorted_targets, _ = _first_claims(dst, rank)
+    last = np.diff(sorted_targets, append=-1) != 0
+    stays, displaced = order[last], order[~last]
+    # Клетку, которую раньше по очереди освободил другой шагающий, занимают без вытеснения
+    targets = np.unique(dst)
+    victims = np.concatenate([targets[~np.isin(targets, src)], src[displaced]])
+    _kill(grid, cells, alive, victims)
+    grid.move_cells(src[stays], dst[stays])
+    cells[movers[stays]] = dst[stays]
+
+
+def _eat(grid, tables, cells, alive, chosen, rng):
+    eaters = np.flatnonzero(chosen & alive)
+    # Особь, у которой добычу перехватили, ищет следующую, как в поэлементном тике
+    while len(eaters):
+        eaters, prey = _find_food(grid, tables, cells[eaters], eaters)
+        if len(eaters) == 0:
+            return
+        rank = rng.permutation(len(eaters))
+        src = cells[eaters]
+        going = ~_overtaken(src, prey, rank)
+        order, sorted_targets, _ = _first_claims(prey[going], rank[going])
+        first = np.diff(sorted_targets, prepend=-1) != 0
+        done = np.zeros(len(eaters), dtype=np.bool_)
+        done[np.flatnonzero(going)[order[first]]] = True
+        # Съеденный позже по очереди успел поесть
+        fed = src[done & ~np.isin(src, prey[done])]
+        _kill(grid, cells, alive, prey[done])
+        grid.set_hunger(fed, 100)
+        eaters = eaters[~done & alive[eaters]]
+
+
+def _find_food(grid, tables, src, eaters):
+    """Первая по обходу соседей добыча каждой особи; возвращает едоков с добычей и ее клетки"""
+    species = grid.species.reshape(-1)
+    group_id = grid.group_id.reshape(-1)
+    aggression = np.array(grid.group_aggression, dtype=np.int8)
+    codes, gids = species[src], group_id[src]
+    neighbors, valid = neighbor_cells(grid, src)
+    other, other_gids = species[neighbors], group_id[neighbors]
+    occupied = valid & (other != 0)
+
+    is_food = occupied & tables.food[codes[:, None], other]
+    rule = np.where(aggression[gids] == 1, tables.eat_rule[codes], EAT_NONE)[:, None]
+    # Встроенные правила едят только свой вид
+    own = occupied & ~is_food & (other == codes[:, None])
+    is_food |= own & (rule == EAT_CANNIBAL) & (other_gids != gids[:, None]) & (aggression[other_gids] == 0)
+    is_food |= own & (rule == EAT_GROUP) & (other_gids == gids[:, None])
+    for j, k in zip(*np.nonzero(occupied & ~is_food & (rule == EAT_CUSTOM))):
+        condition = grid.species_table[codes[j]].eat_condition
+        if condition(_snapshot(grid, src[j]), _snapshot(grid, neighbors[j, k])):
+            is_food[j, k] = True
+
+    rows = np.flatnonzero(is_food.any(axis=1))
+    return eaters[rows], neighbors[rows, is_food[rows].argmax(axis=1)]
+
+
+def _reproduce(grid, tables, cells, alive, chosen, rng):
+    species = grid.species.reshape(-1)
+    src = cells[chosen & alive]
+    src = src[tables.breed_rule[species[src]] != BREED_NONE]
+    if len(src) == 0:
+        return
+    codes, gids = species[src], grid.group_id.reshape(-1)[src]
+    neighbors, valid = neighbor_cells(grid, src)
+    # Соседи просматриваются по порядку, как в поэлементном тике: каждый
+    # партнер дает потомка в первой пустой соседней клетке, а потомок в
+    # клетке, до которой обход еще не дошел, сам становится партнером
+    for k in range(4):
+        rows = np.flatnonzero(_partners(grid, tables, src, codes, gids, neighbors[:, k], valid[:, k]))
+        while len(rows):
+            empty = valid[rows] & (species[neighbors[rows]] == 0)
+            rows = rows[empty.any(axis=1)]
+            if len(rows) == 0:
+                break
+            targets = neighbors[rows, empty[empty.any(axis=1)].argmax(axis=1)]
+            order = rng.permutation(len(rows))
+            order = order[np.unique(targets[order], return_index=True)[1]]
+            grid.copy_cells(src[rows[order]], targets[order])
+            grid.set_hunger(targets[order], 100)
+            # Родитель, чью клетку занял чужой потомок, пробует следующую пустую
+            rows = np.delete(rows, order)
+
+
+def _partners(grid, tables, src, codes, gids, neighbors, valid):
+    """Маска родителей, для которых сосед из neighbors - подходящий партнер"""
+    species = grid.species.reshape(-1)
+    group_id = grid.group_id.reshape(-1)
+    aggression = np.array(grid.group_aggression, dtype=np.int8)
+    other_gids = group_id[neighbors]
+    rule = tables.breed_rule[codes]
+    partner = (valid & (species[neighbors] == codes) & (aggression[gids] == 0)
+               & (aggression[other_gids] == 0))
+    partner &= (rule != BREED_SAME) | (other_gids == gids)
+    partner &= (rule != BREED_DIFFERENT) | (other_gids != gids)
+    for j in np.flatnonzero(partner & (rule == BREED_CUSTOM)):
+        condition = grid.species_table[codes[j]].reproduce_condition
+        if not condition(_snapshot(grid, src[j]), _snapshot(grid, neighbors[j])):
+            partner[j] = False
+    return partner
+
+
+def _form_group(grid, cells, alive, chosen, rng):
+    members = np.flatnonzero(chosen & alive)
+    if len(members) == 0:
+        return
+    species = grid.species.reshape(-1)
+    group_id = grid.group_id.reshape(-1)
+    aggression = np.array(grid.group_aggression, dtype=np.int8)
+    src = cells[members]
+    codes, gids = species[src], group_id[src]
+    neighbors, valid = neighbor_cells(grid, src)
+    other_gids = group_id[neighbors]
+    candidate = (valid & (species[neighbors] == codes[:, None]) & (aggression[gids] == 0)[:, None]
+                 & (aggression[other_gids] == 0))
+
+    rows = np.flatnonzero(candidate.any(axis=1))
+    if len(rows) == 0:
+        return
+    column = candidate[rows].argmax(axis=1)
+    partner, partner_gids = neighbors[rows, column], other_gids[rows, column]
+    # Как rng.choice((gid, other_gid)): переходит особь или ее сосед
+    own_moves = rng.random(len(rows)) < 0.5
+    joiners = np.where(own_moves, src[rows], partner)
+    new_gids = np.where(own_moves, partner_gids, gids[rows])
+    order = rng.permutation(len(joiners))
+    order = order[np.unique(joiners[order], return_index=True)[1]]
+    grid.regroup_cells(joiners[order], new_gids[order])
@@ -0,0 +1,127 @@
+import config
+from world.grid import Grid
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ChunkedGrid(Grid):
+    """
+    Разреженная сетка для очень больших и почти пустых миров.
+
+    Мир делится на квадратные чанки со стороной chunk_size (степень двойки).
+    Чанк - словарь {смещение клетки в чанке: сущность}; он создается при
+    размещении в нем первой сущности и освобождается, когда из него уходит
+    последняя. Поэтому память зависит от числа сущностей, а не от
+    width * height, даже если редкие сущности разбросаны по всему миру
+    (список клеток на чанк в таком случае занял бы столько же, сколько
+    плотная сетка). Соседи считаются по глобальным координатам, так что
+    граница чанка для сущностей незаметна.
+
+    Публичный интерфейс совпадает с world.grid.Grid; индекс видов, статистика
+    популяции, dirty-клетки и тик наследуются без изменений - тик обходит
+    только живые сущности из индекса и не касается пустых чанков
+    """
+    BACKEND = 'chunked'
+
+    def __init__(self, width, height, cells=None, chunk_size=None, seed=None):
+        chunk_size = chunk_size or config.CHUNK_SIZE
+        if chunk_size & (chunk_size - 1):
+            raise ValueError(f"Chunk size must be a power of two, got {chunk_size}")
+        super().__init__(width, height, [], seed)
+        self.cells = None
+        self.chunk_size = chunk_size
+        self._shift = chunk_size.bit_length() - 1
+        self._mask = chunk_size - 1
+        self._chunk_columns = (width + chunk_size - 1) >> self._shift
+        self.chunks = {}  # номер чанка -> {смещение клетки: сущность}
+        if cells is not None:
+            for y, row in enumerate(cells):
+                for x, cell in enumerate(row):
+                    if cell is not None:
+                        self.place_entity(cell, x, y)
+
+    def _key(self, x, y):
+        return (y >> self._shift) * self._chunk_columns + (x >> self._shift)
+
+    def _offset(self, x, y):
+        return ((y & self._mask) << self._shift) | (x & self._mask)
+
+    def _put_cell(self, x, y, entity):
+        """Записывает сущность в пустую клетку, создавая чанк при необходимости"""
+        key = self._key(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = {}
+        chunk[self._offset(x, y)] = entity
+
+    def _clear_cell(self, x, y):
+        """Очищает занятую клетку; пустой чанк освобождается"""
+        key = self._key(x, y)
+        chunk = self.chunks[key]
+        del chunk[self._offset(x, y)]
+        if not chunk:
+            del self.chunks[key]
+
+    # --- Публичный интерфейс Grid ---
+
+    def is_empty(self, x, y):
+        return self.get_entity(x, y) is None
+
+    def get_entity(self, x, y):
+        chunk = self.chunks.get((y >> self._shift) * self._chunk_columns + (x >> self._shift))
+        if chunk is None:
+            return None
+        return chunk.get(((y & self._mask) << self._shift) | (x & self._mask))
+
+    def place_entity(self, entity, x, y):
+        if self.is_in_bounds(x, y) and self.get_entity(x, y) is None:
+            self._put_cell(x, y, entity)
+            entity.x = x
+            entity.y = y
+            entity.world = self
+            self._index_add(entity)
+            self.mark_dirty(x, y)
+
+    def move_entity(self, entity, new_x, new_y):
+        if self.is_in_bounds(new_x, new_y):
+            occupant = self.get_entity(new_x, new_y)
+            if occupant is entity:
+                return
+            if occupant is not None:
+                # Сущность в целевой клетке вытесняется из мира
+                self.remove_entity(occupant)
+            self._clear_cell(entity.x, entity.y)
+            self._put_cell(new_x, new_y, entity)
+            if self.dirty is not None:
+                self.dirty.add((entity.x, entity.y))
+                self.dirty.add((new_x, new_y))
+            entity.x = new_x
+            entity.y = new_y
+
+    def duplicate_entity(self, entity, new_x, new_y):
+        if self.is_in_bounds(new_x, new_y):
+            occupant = self.get_entity(new_x, new_y)
+            if occupant is not None:
+                self.remove_entity(occupant)
+            new_entity = entity.clone()
+            self._put_cell(new_x, new_y, new_entity)
+            new_entity.x = new_x
+            new_entity.y = new_y
+            new_entity.world = self
+            self._index_add(new_entity)
+            self.mark_dirty(new_x, new_y)
+
+    def remove_entity(self, entity):
+        if entity.x is not None and entity.y is not None:
+            if self.get_entity(entity.x, entity.y) is entity:
+                self._clear_cell(entity.x, entity.y)
+                self.mark_dirty(entity.x, entity.y)
+            self._index_discard(entity)
+            entity.world = None
+            entity.x = None
+            entity.y = None
+
+    def get_neighbors(self, x, y):
+        get = self.get_entity
+        return [[get(x + dx, y + dy), x + dx, y + dy] for dx, dy in self.neighbors.offsets(x, y)]
@@ -1,60 +1,183 @@
-import random
-import copy
+from world.neighbors import neighbor_table
+from world.population import PopulationStats
+from world.scheduler import PhaseScheduler
+from world.rng import RandomService
+from entities.group import GroupRegistry
 from logger import setup_logger
 
 logger = setup_logger(__name__)
 
 class Grid:
-    def __init__(self, width, height, cells):
+    # Имя бэкенда для world.create_grid и снимков мира
+    BACKEND = 'objects'
+
+    def __init__(self, width, height, cells, seed=None):
         self.width = width
         self.height = height
         self.cells = cells
+        self.neighbors = neighbor_table(width, height)
+        # Подключается через world.profiler.TickProfiler.attach
+        self.profiler = None
+        # Клетки (x, y), изменившиеся с последней отрисовки; None - не отслеживать
+        self.dirty = None
+        # Индекс живых сущностей по видам: {класс: {сущность: None}}.
+        # Словарь вместо множества сохраняет порядок добавления
+        self.species_index = {}
+        # Суммы голода и роста, обновляемые приращениями
+        self.population = PopulationStats()
+        # Непустые группы животных мира; особи вступают в группу при размещении
+        # и выходят из нее при удалении
+        self.group_registry = GroupRegistry()
+        # Корзины видов, которые могут ходить в текущей фазе (world/scheduler.py)
+        self.scheduler = PhaseScheduler(self.species_index)
+        # Поток случайных чисел для всех решений хода (world/rng.py)
+        self.rng = RandomService(seed)
+        # Счетчики событий с момента создания мира: появления и исчезновения
+        # сущностей и захваты растений (захват - тоже одна гибель и одно рождение)
+        self.births = 0
+        self.deaths = 0
+        self.captures = 0
+        for row in cells:
+            for cell in row:
+                if cell is not None:
+                    self._index_add(cell)
+
+    def _index_add(self, entity):
+        bucket = self.species_index.get(type(entity))
+        if bucket is None:
+            bucket = self.species_index[type(entity)] = {}
+        bucket[entity] = None
+        self.births += 1
+        if getattr(entity, 'group', None) is not None:
+            self.group_registry.add(entity)
+        if self.scheduler.timer is None and getattr(entity, 'timer', None) is not None:
+            self.scheduler.attach(entity.timer)
+        self.population.add(entity)
+
+    def _index_discard(self, entity):
+        bucket = self.species_index.get(type(entity))
+        if bucket is not None and entity in bucket:
+            del bucket[entity]
+            self.deaths += 1
+            self.population.discard(entity)
+            if getattr(entity, 'group', None) is not None:
+                self.group_registry.discard(entity)
+            if not bucket:
+                del self.species_index[type(entity)]
+
+    def _put_cell(self, x, y, entity):
+        """Записывает сущность в клетку без обновления индекса (для загрузки снимков)"""
+        self.cells[y][x] = entity
+
+    def mark_dirty(self, x, y):
+        if self.dirty is not None:
+            self.dirty.add((x, y))
+
+    # --- Изменения состояния сущностей для статистики популяции ---
+
+    def hunger_changed(self, entity, delta):
+        self.population.hunger_changed(entity, delta)
+
+    def growing_changed(self, entity, is_growing):
+        self.population.growing_changed(entity, is_growing)
+
+    def group_changed(self, entity, old_group):
+        # Состав групп уже обновлен в реестре групп: в объектном мире группа
+        # хранится только в самой особи
+        pass
 
     def is_in_bounds(self, x, y):
         if x is not None or y is not None:
             return (0 <= x and x < self.width) and (0 <= y and y < self.height)
     
+    def is_empty(self, x, y):
+        return self.cells[y][x] is None
+
+    def get_entity(self, x, y):
+        return self.cells[y][x]
+
     def place_entity(self, entity, x, y):
         if self.is_in_bounds(x, y) and self.cells[y][x] is None:
             self.cells[y][x] = entity
             entity.x = x
             entity.y = y
             entity.world = self
+            self._index_add(entity)
+            self.mark_dirty(x, y)
 
     def move_entity(self, entity, new_x, new_y):
         if self.is_in_bounds(new_x, new_y):
+            occupant = self.cells[new_y][new_x]
+            if occupant is not None and occupant is not entity:
+                # Сущность в целевой клетке вытесняется из мира
+                self.remove_entity(occupant)
             self.cells[entity.y][entity.x] = None
             self.cells[new_y][new_x] = entity
+            if self.dirty is not None:
+                self.dirty.add((entity.x, entity.y))
+                self.dirty.add((new_x, new_y))
             entity.x = new_x
             entity.y = new_y
 
     def duplicate_entity(self, entity, new_x, new_y):
         if self.is_in_bounds(new_x, new_y):
-            new_entity = copy.deepcopy(entity)
+            occupant = self.cells[new_y][new_x]
+            if occupant is not None:
+                self.remove_entity(occupant)
+            new_entity = entity.clone()
             self.cells[new_y][new_x] = new_entity
             new_entity.x = new_x
             new_entity.y = new_y
             new_entity.world = self
+            self._index_add(new_entity)
+            self.mark_dirty(new_x, new_y)
 
     def remove_entity(self, entity):
         if entity.x is not None and entity.y is not None:
-            self.cells[entity.y][entity.x] = None
+            if self.cells[entity.y][entity.x] is entity:
+                self.cells[entity.y][entity.x] = None
+                self.mark_dirty(entity.x, entity.y)
+            self._index_discard(entity)
             entity.world = None
             entity.x = None
             entity.y = None
 
+    def neighbor_offsets(self, x, y):
+        """
+        Возвращает заранее построенный кортеж смещений (dx, dy) к соседям клетки
+        с учетом краев сетки; вызов ничего не выделяет. Сущность соседа
+        берется через get_entity(x + dx, y + dy)
+        """
+        return self.neighbors.offsets(x, y)
+
     def get_neighbors(self, x, y):
-        neighbors = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if self.is_in_bounds(nx, ny):
-                neighbors.append([self.cells[ny][nx], nx, ny])
-        return neighbors
-    
+        cells = self.cells
+        return [[cells[y + dy][x + dx], x + dx, y + dy] for dx, dy in self.neighbors.offsets(x, y)]
+
+    def iter_entities(self):
+        """Перебирает живые сущности мира без обхода пустых клеток"""
+        for bucket in self.species_index.values():
+            yield from bucket
+
+    def count_by_species(self):
+        """Возвращает количество живых сущностей каждого вида: {имя класса: количество}"""
+        return {cls.__name__: len(bucket) for cls, bucket in self.species_index.items()}
+
+    def population_stats(self):
+        """Возвращает {имя вида: world.population.SpeciesStats} без обхода сущностей"""
+        return self.population.report(self.species_index, self.group_registry.species_sizes())
+
     def tick(self):
-        entities = [cell for row in self.cells for cell in row if cell is not None]
-        random.shuffle(entities)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_tick(self)
+
+        # Спящие виды в тике не перебираются: их act ничего бы не сделал
+        entities = self.scheduler.active_entities()
+        self.rng.shuffle(entities)
 
         for entity in entities:
             entity.act()
+
+        if profiler is not None:
+            profiler.end_tick()
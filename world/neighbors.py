@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+# Порядок обхода соседей: слева, справа, сверху, снизу
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Биты краев клетки: левый, правый, верхний и нижний край сетки
+LEFT_EDGE, RIGHT_EDGE, TOP_EDGE, BOTTOM_EDGE = 1, 2, 4, 8
+
+
+class NeighborTable:
+    """
+    Таблица смещений соседей для сетки заданного размера.
+
+    Клетка относится к одному из 16 классов по тому, к каким краям сетки она
+    прилегает; для каждого класса заранее построен кортеж смещений (dx, dy)
+    с уже отброшенными выходами за границы. Память - O(width + height), а
+    запрос соседей возвращает готовый общий кортеж без выделения памяти
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.x_edges = [(LEFT_EDGE if x == 0 else 0) | (RIGHT_EDGE if x == width - 1 else 0)
+                        for x in range(width)]
+        self.y_edges = [(TOP_EDGE if y == 0 else 0) | (BOTTOM_EDGE if y == height - 1 else 0)
+                        for y in range(height)]
+        self.classes = [self._build_class(edges) for edges in range(16)]
+
+    @staticmethod
+    def _build_class(edges):
+        blocked = {
+            (-1, 0): edges & LEFT_EDGE,
+            (1, 0): edges & RIGHT_EDGE,
+            (0, -1): edges & TOP_EDGE,
+            (0, 1): edges & BOTTOM_EDGE,
+        }
+        return tuple(direction for direction in DIRECTIONS if not blocked[direction])
+
+    def offsets(self, x, y):
+        """Возвращает кортеж смещений (dx, dy) к соседям клетки (x, y)"""
+        return self.classes[self.x_edges[x] | self.y_edges[y]]
+
+
+@lru_cache(maxsize=16)
+def neighbor_table(width, height):
+    """Возвращает общую для всех сеток данного размера таблицу соседей"""
+    return NeighborTable(width, height)
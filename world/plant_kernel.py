@@ -0,0 +1,98 @@
+import numpy as np
+
+# Вероятность того, что растение попытается занять соседнюю клетку
+# (аналог world.rng.below(30) == 0 в инжектированном grow)
+SPREAD_CHANCE = 1 / 30
+
+
+def phase_tables(grid, phase):
+    """
+    Строит таблицы по кодам видов для текущей фазы: признак растения,
+    индекс активности (0, 0.5, 1 -> 0, 1, 2) и флаг роста
+    """
+    size = len(grid.species_table)
+    is_plant = np.zeros(size, dtype=np.bool_)
+    active = np.zeros(size, dtype=np.int8)
+    growing = np.zeros(size, dtype=np.bool_)
+    for info in grid.species_table[1:]:
+        if not info.is_plant:
+            continue
+        is_plant[info.code] = True
+        if phase in info.active_phases:
+            active[info.code], growing[info.code] = 2, True
+        elif phase in info.inactive_phases:
+            active[info.code], growing[info.code] = 0, False
+        else:
+            active[info.code], growing[info.code] = 1, True
+    return is_plant, active, growing
+
+
+def neighbor_cells(grid, cells):
+    """
+    Соседи клеток cells (плоские индексы) в порядке обхода Grid.get_neighbors:
+    слева, справа, сверху, снизу. Возвращает массив соседей (n, 4), где
+    соседи за краем мира заменены самой клеткой, и маску настоящих соседей
+    """
+    width, height = grid.width, grid.height
+    xs, ys = cells % width, cells // width
+    neighbors = np.stack([cells - 1, cells + 1, cells - width, cells + width], axis=1)
+    valid = np.stack([xs > 0, xs < width - 1, ys > 0, ys < height - 1], axis=1)
+    return np.where(valid, neighbors, cells[:, None]), valid
+
+
+def plant_step(grid, phase, rng):
+    """
+    Пакетный шаг всех растений ArrayGrid за одну фазу.
+
+    Правила те же, что у grow из EvalPlantMeta: каждое растущее растение
+    просматривает соседей слева, справа, сверху и снизу, с вероятностью 1/30
+    на соседа пытается занять клетку, пустую клетку занимает сразу, растение
+    другого вида захватывает с вероятностью 0.5 + 0.25*(a_self - a_neighbor),
+    и останавливается на первом успехе.
+
+    Отличие от поэлементного режима - синхронное обновление: все растения
+    смотрят на состояние мира до шага, а если несколько растений претендуют
+    на одну клетку, победитель выбирается случайно
+    """
+    species = grid.species.reshape(-1)
+    active = grid.active.reshape(-1)
+    growing = grid.growing.reshape(-1)
+
+    is_plant, phase_active, phase_growing = phase_tables(grid, phase)
+    # Таблица видов применяется только к занятым клеткам: в разреженном мире
+    # их намного меньше, чем клеток
+    plant_cells = np.flatnonzero(species != 0)
+    plant_cells = plant_cells[is_plant[species[plant_cells]]]
+    codes = species[plant_cells]
+    active[plant_cells] = phase_active[codes]
+    growing[plant_cells] = phase_growing[codes]
+    # После смены состояния растут либо все растения вида, либо ни одно
+    for code in np.flatnonzero(is_plant).tolist():
+        grid.growing_counts[code] = grid.species_counts[code] if phase_growing[code] else 0
+
+    sources = plant_cells[phase_growing[codes]]
+    if len(sources) == 0:
+        return
+    src_codes = species[sources]
+    src_active = active[sources].astype(np.float32) * 0.5
+    targets, valid = neighbor_cells(grid, sources)
+
+    target_codes = species[targets]
+    triggered = valid & (rng.random(targets.shape) < SPREAD_CHANCE)
+    capture_chance = 0.5 + 0.25 * src_active[:, None] - 0.25 * active[targets] * 0.5
+    captured = (is_plant[target_codes] & (target_codes != src_codes[:, None])
+                & (rng.random(targets.shape) < capture_chance))
+    success = triggered & ((target_codes == 0) | captured)
+
+    winners = np.flatnonzero(success.any(axis=1))
+    if len(winners) == 0:
+        return
+    chosen = targets[winners, success[winners].argmax(axis=1)]
+
+    # Конфликты за одну клетку решаются случайной перестановкой претендентов
+    order = rng.permutation(len(winners))
+    chosen, unique_index = np.unique(chosen[order], return_index=True)
+    winners = sources[winners[order][unique_index]]
+
+    replaced = species[chosen]
+    grid.apply_plant_spread(winners, chosen, replaced)
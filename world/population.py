@@ -0,0 +1,92 @@
+"""
+Статистика популяции, которая поддерживается приращениями
+
+Мир обновляет накопитель при каждом изменении: размещении, удалении и
+вытеснении сущностей, изменении голода и роста растений. Размеры групп
+берутся из реестра групп мира. Поэтому чтение статистики стоит
+O(видов + групп), а не O(клеток). Активность
+животных зависит только от фазы, поэтому она вычисляется при чтении по
+текущей фазе, без обхода особей.
+"""
+from collections import namedtuple
+from meta_classes import EvalPlantMeta
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SpeciesStats(namedtuple('SpeciesStats', [
+        'name', 'is_plant', 'count', 'active', 'total_hunger', 'groups', 'growing'])):
+    """
+    Сводка по одному виду. active - особи, чей вид активен в текущей фазе;
+    groups - {номер группы: число живых членов} (у растений пусто);
+    growing - растущие растения (у животных 0)
+    """
+    __slots__ = ()
+
+    @property
+    def avg_hunger(self):
+        return self.total_hunger / self.count if self.count else 0.0
+
+    @property
+    def dormant(self):
+        return self.count - self.growing if self.is_plant else 0
+
+
+def species_stats(cls, count, phase, total_hunger=0, groups=None, growing=0):
+    """Собирает SpeciesStats для вида cls; phase - текущая фаза или None"""
+    is_plant = type(cls) == EvalPlantMeta
+    active = count if phase in getattr(cls, 'ACTIVE_PHASES', ()) else 0
+    return SpeciesStats(cls.__name__, is_plant, count, active, total_hunger, groups or {}, growing)
+
+
+class PopulationStats:
+    """
+    Накопитель статистики объектного мира (world.grid.Grid) по классам видов.
+    Численность берется из индекса видов мира, размеры групп - из реестра
+    групп (entities.group.GroupRegistry), здесь хранятся суммы голода и
+    число растущих растений среди живых особей
+    """
+    def __init__(self):
+        self.hunger = {}   # класс -> суммарный голод живых особей
+        self.growing = {}  # класс -> число растущих растений
+
+    def add(self, entity):
+        cls = type(entity)
+        hunger = getattr(entity, 'hunger', None)
+        if hunger is None:
+            if entity.is_growing:
+                self.growing[cls] = self.growing.get(cls, 0) + 1
+            return
+        self.hunger[cls] = self.hunger.get(cls, 0) + hunger
+
+    def discard(self, entity):
+        cls = type(entity)
+        hunger = getattr(entity, 'hunger', None)
+        if hunger is None:
+            if entity.is_growing:
+                self.growing[cls] -= 1
+            return
+        self.hunger[cls] -= hunger
+
+    def hunger_changed(self, entity, delta):
+        cls = type(entity)
+        self.hunger[cls] = self.hunger.get(cls, 0) + delta
+
+    def growing_changed(self, entity, is_growing):
+        """Вызывается, когда растение перешло из роста в покой или обратно"""
+        cls = type(entity)
+        self.growing[cls] = self.growing.get(cls, 0) + (1 if is_growing else -1)
+
+    def report(self, species_index, group_sizes):
+        """
+        Возвращает {имя вида: SpeciesStats} по индексу видов мира;
+        group_sizes - {имя вида: {номер группы: размер}} из реестра групп.
+        Фаза берется из таймера любой особи вида
+        """
+        result = {}
+        for cls, bucket in species_index.items():
+            phase = next(iter(bucket)).timer.current_phase
+            result[cls.__name__] = species_stats(cls, len(bucket), phase, self.hunger.get(cls, 0),
+                                                 group_sizes.get(cls.__name__), self.growing.get(cls, 0))
+        return result
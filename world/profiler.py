@@ -0,0 +1,154 @@
+import time
+
+# Действия, которые метаклассы инжектируют в растения и животных
+PLANT_ACTIONS = ('act', 'grow')
+ANIMAL_ACTIONS = ('act', 'move', 'eat', 'reproduce', 'form_group')
+
+# Порты действий ArrayGrid: имя метода -> имя действия в таблице
+ARRAY_ACTIONS = {
+    '_plant_act': 'act',
+    '_animal_act': 'act',
+    '_animal_move': 'move',
+    '_animal_eat': 'eat',
+    '_animal_reproduce': 'reproduce',
+    '_animal_form_group': 'form_group',
+}
+
+# Имена "видов" для пакетных шагов всех растений и всех животных ArrayGrid
+BATCHED_PLANTS = 'plants (batched)'
+BATCHED_ANIMALS = 'animals (batched)'
+
+
+class TickProfiler:
+    """
+    Профилировщик тиков: число вызовов и суммарное время каждого действия
+    по видам, за последний тик и за весь прогон.
+
+    Профилировщик включается явно через attach(world): только тогда действия
+    оборачиваются счетчиками. Пока он не подключен, Grid.tick проверяет
+    один атрибут за тик, а сами действия не меняются.
+
+    Время act включает вложенные move, eat, reproduce, form_group и grow.
+    Для мира 'objects' обертки ставятся на классы сущностей, поэтому пока
+    профилировщик подключен, учитываются вызовы из любых миров процесса
+    """
+    def __init__(self):
+        self.stats = {}       # (вид, действие) -> [вызовы, секунды] за весь прогон
+        self.last_tick = {}   # то же за последний тик
+        self.ticks = 0
+        self.total_time = 0.0
+        self.last_tick_time = 0.0
+        self._tick_start = None
+        self._wrapped = []    # (владелец, имя атрибута, исходное значение или None)
+        self._wrapped_classes = set()
+
+    # --- Подключение ---
+
+    def attach(self, world):
+        if getattr(world, 'tiler', None) is not None:
+            # Плиточный тик идет в копиях мира рабочих процессов, замеры были бы пустыми
+            raise ValueError("TickProfiler cannot be attached to a world with a tiled ticker")
+        world.profiler = self
+        if hasattr(world, 'species_table'):
+            self._instrument_array_grid(world)
+        return self
+
+    def detach(self, world):
+        """Отключает профилировщик и возвращает исходные методы"""
+        world.profiler = None
+        for owner, name, original in reversed(self._wrapped):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._wrapped.clear()
+        self._wrapped_classes.clear()
+
+    def reset(self):
+        self.stats.clear()
+        self.last_tick.clear()
+        self.ticks = 0
+        self.total_time = 0.0
+        self.last_tick_time = 0.0
+
+    def _instrument_class(self, cls):
+        actions = ANIMAL_ACTIONS if hasattr(cls, 'FOOD_SOURCES') else PLANT_ACTIONS
+        for action in actions:
+            original = cls.__dict__.get(action)
+            if original is not None:
+                setattr(cls, action, self._timed(original, lambda *args, name=cls.__name__: name, action))
+                self._wrapped.append((cls, action, original))
+        self._wrapped_classes.add(cls)
+
+    def _instrument_array_grid(self, world):
+        def species_of(i, *args):
+            return world.species_table[world.species.flat[i]].cls.__name__
+
+        for method, action in ARRAY_ACTIONS.items():
+            # Атрибут экземпляра перекрывает метод класса только для этого мира
+            setattr(world, method, self._timed(getattr(world, method), species_of, action))
+            self._wrapped.append((world, method, None))
+        world._plant_step = self._timed(world._plant_step, lambda *args: BATCHED_PLANTS, 'plant_step')
+        self._wrapped.append((world, '_plant_step', None))
+        world._animal_step = self._timed(world._animal_step, lambda *args: BATCHED_ANIMALS, 'animal_step')
+        self._wrapped.append((world, '_animal_step', None))
+
+    def _timed(self, function, species_of, action):
+        record = self.record
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            # Вид определяется до вызова: после хода клетка может опустеть
+            species = species_of(*args)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(species, action, clock() - start)
+
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    # --- Сбор данных ---
+
+    def record(self, species, action, seconds):
+        for table in (self.stats, self.last_tick):
+            entry = table.get((species, action))
+            if entry is None:
+                table[(species, action)] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def begin_tick(self, world):
+        # Виды могут появиться во время прогона (entity_factory), оборачиваем их по мере появления
+        species_index = getattr(world, 'species_index', None)
+        if species_index is not None:
+            for cls in species_index:
+                if cls not in self._wrapped_classes:
+                    self._instrument_class(cls)
+        self.last_tick.clear()
+        self._tick_start = time.perf_counter()
+
+    def end_tick(self):
+        self.last_tick_time = time.perf_counter() - self._tick_start
+        self.total_time += self.last_tick_time
+        self.ticks += 1
+
+    # --- Отчет ---
+
+    def table(self, last_tick=False):
+        """
+        Таблица по видам и действиям: вызовы, суммарное время, среднее время
+        вызова и доля от времени тиков
+        """
+        stats = self.last_tick if last_tick else self.stats
+        tick_time = self.last_tick_time if last_tick else self.total_time
+        title = "last tick" if last_tick else f"{self.ticks} ticks"
+        lines = [f"Tick profile ({title}, {tick_time * 1000:.1f} ms)",
+                 f"{'species':<18} {'action':<11} {'calls':>8} {'total ms':>9} {'mean us':>8} {'tick %':>7}"]
+        for (species, action), (calls, seconds) in sorted(stats.items(), key=lambda item: -item[1][1]):
+            share = seconds / tick_time * 100 if tick_time else 0.0
+            lines.append(f"{species:<18} {action:<11} {calls:>8} {seconds * 1000:>9.2f} "
+                         f"{seconds / calls * 1e6:>8.1f} {share:>6.1f}%")
+        return "\n".join(lines)
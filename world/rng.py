@@ -0,0 +1,71 @@
+"""
+Служба случайных чисел мира (world.rng)
+
+Все случайные решения хода - порядок сущностей, действие животного,
+направление шага, попытка растения занять соседнюю клетку, захват - берутся
+из одного потока мира. Числа генерируются пачками генератором NumPy
+(np.random.Generator) и выдаются из буфера, поэтому решение в ходе сущности
+стоит индексирования списка, а не вызова random с его проверками.
+
+Прогон воспроизводится по одному сиду: мир, созданный с seed, и мир,
+перезапущенный seed(...) с тем же ключом, получают одинаковый поток. Без
+сида поток засевается из random, так что random.seed перед созданием мира
+по-прежнему задает весь прогон.
+"""
+import random
+import numpy as np
+
+# Сколько чисел генерируется за одно обращение к NumPy
+BUFFER_SIZE = 4096
+
+
+class RandomService:
+    def __init__(self, seed=None, buffer_size=BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.seed(seed)
+
+    def seed(self, *key):
+        """
+        Перезапускает поток. Ключ - один или несколько неотрицательных целых
+        (например, сид прогона, номер тика и плитки); None - сид из random
+        """
+        if not key or key == (None,):
+            key = (random.getrandbits(64),)
+        # Генератор для пакетных шагов (world.plant_kernel) и для буфера
+        self.generator = np.random.default_rng(list(key))
+        self._buffer = []
+        self._index = 0
+        self._filled = 0
+
+    def _refill(self):
+        self._buffer = self.generator.random(self.buffer_size).tolist()
+        self._filled = self.buffer_size
+
+    def random(self):
+        """Равномерное число из [0, 1)"""
+        index = self._index
+        if index >= self._filled:
+            self._refill()
+            index = 0
+        self._index = index + 1
+        return self._buffer[index]
+
+    def below(self, n):
+        """Равномерное целое из [0, n)"""
+        index = self._index
+        if index >= self._filled:
+            self._refill()
+            index = 0
+        self._index = index + 1
+        return int(self._buffer[index] * n)
+
+    def choice(self, items):
+        """Случайный элемент непустой последовательности"""
+        return items[self.below(len(items))]
+
+    def shuffle(self, items):
+        """Перемешивает список или массив NumPy на месте одной перестановкой NumPy"""
+        if isinstance(items, np.ndarray):
+            self.generator.shuffle(items)
+        elif len(items) > 1:
+            items[:] = [items[i] for i in self.generator.permutation(len(items)).tolist()]
@@ -0,0 +1,57 @@
+"""
+Планировщик ходов по фазам дня
+
+Животное вне своих ACTIVE_PHASES в act() ничего не делает, поэтому тик
+перемешивает и вызывает только сущности видов, которые могут ходить в
+текущей фазе. Корзинами служат множества индекса видов мира: для фазы
+запоминается список корзин активных видов, а спящие виды в тике не
+перебираются вовсе. Растения ходят в любой фазе (grow переключает их рост
+и покой).
+
+Смену фазы сообщает TimeManager через subscribe - и в advance_time, и при
+прямом присваивании current_phase.
+"""
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def acts_in_phase(cls, phase):
+    """Может ли сущность вида cls сделать ход в фазе phase"""
+    phases = getattr(cls, 'act_phases', None)
+    return phases is None or phase in phases
+
+
+class PhaseScheduler:
+    def __init__(self, species_index):
+        self.species_index = species_index
+        self.timer = None
+        self.phase = None
+        self._acting = {}  # класс -> ходит ли вид в self.phase
+
+    def attach(self, timer):
+        """Подписывается на смену фаз таймера сущностей мира"""
+        if timer is self.timer:
+            return
+        if self.timer is not None:
+            self.timer.unsubscribe(self.phase_changed)
+        self.timer = timer
+        timer.subscribe(self.phase_changed)
+        self.phase_changed(timer.current_phase)
+
+    def phase_changed(self, phase):
+        self.phase = phase
+        self._acting = {}
+
+    def active_entities(self):
+        """Список сущностей, которые могут ходить в текущей фазе, в порядке индекса видов"""
+        acting = self._acting
+        entities = []
+        for cls, bucket in self.species_index.items():
+            active = acting.get(cls)
+            if active is None:
+                # Вид мог появиться во время прогона (entity_factory)
+                active = acting[cls] = acts_in_phase(cls, self.phase)
+            if active:
+                entities.extend(bucket)
+        return entities
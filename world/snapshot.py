@@ -0,0 +1,280 @@
+"""
+Бинарные снимки мира: сетка, группы и TimeManager в виде типизированных массивов NumPy
+
+Снимок - несжатый .npz, где по каждой живой сущности хранятся код вида,
+координаты, голод, номер группы и состояние растения, а по видам и группам -
+небольшие справочные таблицы. Загрузка не проигрывает историю и не
+распаковывает pickle: массивы читаются с allow_pickle=False, а сущности
+объектного мира собираются из одной особи-шаблона на вид.
+
+Пример:
+    save_snapshot('run.npz', world, time_manager, tick=current_tick)
+    world, time_manager, tick = load_snapshot('run.npz')
+"""
+import gc
+import numpy as np
+from entities.group import Group
+# Встроенные виды регистрируются в entity_registry при импорте своих модулей
+from entities.animals.malheureux import Malheureux
+from entities.animals.pauvre import Pauvre
+from entities.plants.lumiere import Lumiere
+from entities.plants.obscurite import Obscurite
+from entities.plants.demi import Demi
+from meta_classes import entity_registry
+from world import create_grid
+from world.time_manager import TimeManager
+from world.array_grid import ACTIVITY_LEVELS, NO_GROUP
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(ValueError):
+    """Снимок имеет неизвестный формат или ссылается на незарегистрированный вид"""
+
+
+def _coordinate_dtype(width, height):
+    return np.uint16 if max(width, height) <= np.iinfo(np.uint16).max else np.uint32
+
+
+def _entity_columns(world):
+    """
+    Возвращает имена видов, символы и столбцы сущностей:
+    (коды видов, x, y, голод, объекты групп по индексам, индексы групп, активность, рост)
+    """
+    if hasattr(world, 'species_table'):
+        return _array_columns(world)
+
+    names, symbols = [], []
+    codes, xs, ys, hunger, group_ids, active, growing = [], [], [], [], [], [], []
+    groups, group_ids_by_object = [], {}
+    for code, (cls, bucket) in enumerate(world.species_index.items()):
+        names.append(cls.__name__)
+        entities = list(bucket)
+        symbols.append(entities[0].symbol)
+        codes.append(np.full(len(entities), code, dtype=np.int16))
+        xs.extend(entity.x for entity in entities)
+        ys.extend(entity.y for entity in entities)
+        if hasattr(cls, 'FOOD_SOURCES'):
+            hunger.extend(entity.hunger for entity in entities)
+            for entity in entities:
+                gid = group_ids_by_object.get(id(entity.group))
+                if gid is None:
+                    gid = group_ids_by_object[id(entity.group)] = len(groups)
+                    groups.append(entity.group)
+                group_ids.append(gid)
+            active.extend([0] * len(entities))
+            growing.extend([False] * len(entities))
+        else:
+            hunger.extend([0] * len(entities))
+            group_ids.extend([NO_GROUP] * len(entities))
+            active.extend(ACTIVITY_LEVELS.index(entity.active) for entity in entities)
+            growing.extend(bool(entity.is_growing) for entity in entities)
+
+    codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int16)
+    return names, symbols, groups, {
+        'species': codes,
+        'x': np.array(xs, dtype=np.int64),
+        'y': np.array(ys, dtype=np.int64),
+        'hunger': np.array(hunger, dtype=np.int16),
+        'group': np.array(group_ids, dtype=np.int32),
+        'active': np.array(active, dtype=np.int8),
+        'growing': np.array(growing, dtype=np.bool_),
+    }
+
+
+def _array_columns(world):
+    ys, xs = np.nonzero(world.species)
+    names = [info.name for info in world.species_table[1:]]
+    symbols = [info.symbol for info in world.species_table[1:]]
+    group_ids = world.group_id[ys, xs]
+    # Сохраняем только группы, в которых есть живые члены, и перенумеровываем их подряд
+    used, group_ids = np.unique(group_ids, return_inverse=True)
+    if len(used) and used[0] == NO_GROUP:
+        used = used[1:]
+        group_ids = group_ids - 1
+    return names, symbols, [world.groups[gid] for gid in used.tolist()], {
+        'species': world.species[ys, xs] - 1,
+        'x': xs,
+        'y': ys,
+        'hunger': world.hunger[ys, xs],
+        'group': group_ids.astype(np.int32),
+        'active': world.active[ys, xs],
+        'growing': world.growing[ys, xs],
+    }
+
+
+def save_snapshot(path, world, time_manager, tick=0):
+    """
+    Сохраняет мир, время и номер тика симуляции в несжатый .npz.
+    path - имя файла или открытый бинарный поток (например, io.BytesIO)
+    """
+    names, symbols, groups, columns = _entity_columns(world)
+    coordinate = _coordinate_dtype(world.width, world.height)
+    columns['x'] = columns['x'].astype(coordinate)
+    columns['y'] = columns['y'].astype(coordinate)
+
+    backend = world.BACKEND
+    arrays = dict(
+        version=np.int32(SNAPSHOT_VERSION),
+        backend=np.array(backend),
+        size=np.array([world.width, world.height], dtype=np.int32),
+        species_names=np.array(names, dtype=np.str_),
+        species_symbols=np.array(symbols, dtype=np.str_),
+        group_numbers=np.array([group.group_number for group in groups], dtype=np.int64),
+        group_aggression=np.array([group.aggression for group in groups], dtype=np.int8),
+        phases=np.array(time_manager.phases, dtype=np.str_),
+        time=np.array([time_manager.phase_id,
+                       time_manager.tick_counter, time_manager.ticks_per_phase, tick], dtype=np.int64),
+        events=np.array([world.births, world.deaths, world.captures], dtype=np.int64),
+        **columns,
+    )
+    if hasattr(path, 'write'):
+        np.savez(path, **arrays)
+        return
+    with open(path, 'wb') as stream:
+        np.savez(stream, **arrays)
+    logger.info("Saved snapshot with %s entities to %s", len(columns['species']), path)
+
+
+def _species_class(name):
+    for kind in ('plants', 'animals'):
+        if name in entity_registry[kind]:
+            return entity_registry[kind][name]
+    raise SnapshotError(f"Snapshot uses unregistered species {name!r}; create the class before loading")
+
+
+def _template(cls, world, time_manager, group):
+    """Особь-шаблон вида: остальные особи получают копию ее состояния"""
+    if hasattr(cls, 'FOOD_SOURCES'):
+        return cls(None, None, world, time_manager, group)
+    return cls(None, None, None, world, time_manager)
+
+
+def load_snapshot(path, backend=None):
+    """
+    Загружает снимок из файла или бинарного потока и возвращает
+    (world, time_manager, tick). По умолчанию мир создается в том же
+    бэкенде, в котором был сохранен
+    """
+    with np.load(path, allow_pickle=False) as data:
+        data = {key: data[key] for key in data.files}
+    if int(data['version']) != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {int(data['version'])}")
+
+    # Пока создаются сотни тысяч объектов, сборщик мусора только тратит время на их обход
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        world, time_manager = _build(data, backend)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    if isinstance(path, str):
+        logger.info("Loaded snapshot with %s entities from %s", len(data['species']), path)
+    return world, time_manager, int(data['time'][3])
+
+
+def _build(data, backend):
+    phase, tick_counter, ticks_per_phase, _ = data['time'].tolist()
+    phases = data['phases'].tolist()
+    time_manager = TimeManager(ticks_per_phase, phases=phases,
+                               current_phase=phases[phase], tick_counter=tick_counter)
+
+    groups = [Group(number) for number in data['group_numbers'].tolist()]
+    for group, aggression in zip(groups, data['group_aggression'].tolist()):
+        group.aggression = aggression
+
+    width, height = data['size'].tolist()
+    world = create_grid(width, height, backend or str(data['backend']))
+    classes = [_species_class(name) for name in data['species_names'].tolist()]
+    if hasattr(world, 'species_table'):
+        _fill_array_grid(world, time_manager, classes, groups, data)
+    else:
+        _fill_grid(world, time_manager, classes, groups, data)
+    # Счетчики событий продолжаются с сохраненных значений (в ранних снимках их нет)
+    if 'events' in data:
+        world.births, world.deaths, world.captures = data['events'].tolist()
+    return world, time_manager
+
+
+def _fill_grid(world, time_manager, classes, groups, data):
+    put = world._put_cell
+    population = world.population
+    # Индекс видов заполняется в обход _index_add, поэтому планировщик подписывается здесь
+    world.scheduler.attach(time_manager)
+    members = [[] for _ in groups]
+    symbols = data['species_symbols'].tolist()
+    codes = data['species']
+    # Сущности одного вида в снимке идут подряд, поэтому столбцы режутся один раз на вид
+    for code, cls in enumerate(classes):
+        rows = np.flatnonzero(codes == code)
+        if len(rows) == 0:
+            continue
+        symbol = symbols[code]
+        # Особь собирается в обход __init__: слоты заполняются прямо из столбцов снимка
+        new = cls.__new__
+        xs = data['x'][rows].tolist()
+        ys = data['y'][rows].tolist()
+        entities = []
+        if hasattr(cls, 'FOOD_SOURCES'):
+            # Статистика популяции собирается по столбцам, а не по особям
+            population.hunger[cls] = int(data['hunger'][rows].sum())
+            for x, y, hunger, gid in zip(xs, ys, data['hunger'][rows].tolist(), data['group'][rows].tolist()):
+                entity = new(cls)
+                entity.x, entity.y, entity.symbol, entity.world, entity.timer = x, y, symbol, world, time_manager
+                entity.hunger, entity.group = hunger, groups[gid]
+                members[gid].append(entity)
+                entities.append(entity)
+                put(x, y, entity)
+        else:
+            population.growing[cls] = int(data['growing'][rows].sum())
+            for x, y, active, growing in zip(xs, ys, data['active'][rows].tolist(), data['growing'][rows].tolist()):
+                entity = new(cls)
+                entity.x, entity.y, entity.symbol, entity.world, entity.timer = x, y, symbol, world, time_manager
+                entity.active, entity.is_growing = ACTIVITY_LEVELS[active], growing
+                entities.append(entity)
+                put(x, y, entity)
+        world.species_index[cls] = dict.fromkeys(entities)
+    # Агрессивность групп берется из снимка (_build), а не пересчитывается по размеру
+    for group, group_members in zip(groups, members):
+        world.group_registry.restore(group, group_members, group.aggression)
+
+
+def _fill_array_grid(world, time_manager, classes, groups, data):
+    world.timer = time_manager
+    symbols = data['species_symbols'].tolist()
+    code_map = np.zeros(len(classes), dtype=np.int16)
+    for code, cls in enumerate(classes):
+        template = _template(cls, world, time_manager, None)
+        template.symbol = symbols[code]
+        code_map[code] = world.species_code(template)
+    group_map = np.array([world.group_index(group) for group in groups] or [0], dtype=np.int32)
+
+    xs, ys, group = data['x'], data['y'], data['group']
+    species = code_map[data['species']]
+    world.species[ys, xs] = species
+    world.hunger[ys, xs] = data['hunger']
+    world.group_id[ys, xs] = np.where(group == NO_GROUP, NO_GROUP, group_map[np.maximum(group, 0)])
+    world.active[ys, xs] = data['active']
+    world.growing[ys, xs] = data['growing']
+
+    world.species_counts[:] = np.bincount(species, minlength=len(world.species_table)).tolist()
+    world.species_counts[0] = 0
+    # У животных в массиве роста может остаться значение от прежнего растения
+    animals = group != NO_GROUP
+    world.growing_counts[:] = np.bincount(species, weights=data['growing'] & ~animals,
+                                          minlength=len(world.species_table)).astype(np.int64).tolist()
+    world.growing_counts[0] = 0
+    world.hunger_totals[:] = np.bincount(species[animals], weights=data['hunger'][animals],
+                                         minlength=len(world.species_table)).astype(np.int64).tolist()
+    group_species = np.zeros(len(groups), dtype=np.int16)
+    group_species[group[animals]] = species[animals]
+    sizes = np.bincount(group[group != NO_GROUP], minlength=len(groups)).tolist()
+    for gid, size, group_object in zip(group_map.tolist(), sizes, groups):
+        world.group_sizes[gid] = size
+        world.group_aggression[gid] = group_object.aggression
+    for gid, code in zip(group_map.tolist(), group_species.tolist()):
+        world.group_species[gid] = code
@@ -0,0 +1,248 @@
+"""
+Многопроцессный тик ArrayGrid по плиткам
+
+Сетка делится на квадратные плитки со стороной tile_size, плитки
+раскрашены в четыре цвета по четности координат (2x2 шахматка). Массивы
+мира переносятся в разделяемую память (multiprocessing.shared_memory), и
+рабочие процессы пишут в них напрямую. Тик состоит из четырех фаз - по одной
+на цвет: в фазе все плитки одного цвета обрабатываются параллельно, а плитки
+остальных цветов служат им ореолом (halo). Между фазами процессы ждут друг
+друга, поэтому изменения ореола становятся видны следующей фазе через
+разделяемую память, без копирования.
+
+Ход сущности дотягивается не дальше чем на HALO клеток от исходной клетки
+(шаг, действие с соседом, еще один шаг), а плитки одного цвета разделены
+целой плиткой другого цвета. Поэтому при tile_size >= 2 * HALO две
+параллельные плитки никогда не трогают одну клетку.
+
+Правила для действий через границу плиток:
+- сущность делает ход в фазе плитки, где стояла в начале фазы; перешедшая
+  в чужую плитку сущность несет флаг acted и второй раз не ходит;
+- рождения, захваты, поедания и перемещения в ореол применяются сразу:
+  ореол в этой фазе никто больше не трогает, а следующая фаза видит
+  результат (выигрывает фаза, которая идет раньше);
+- порядок цветов сдвигается на единицу каждый тик, чтобы ни один цвет не
+  ходил всегда первым;
+- размеры групп и агрессию плитка видит на начало фазы плюс свои
+  изменения; после фазы приращения размеров складываются, а агрессия
+  группы становится 1, если ее подняла хотя бы одна плитка, и 0, если ее
+  сбросила хотя бы одна плитка и ни одна не подняла;
+- деление групп больше 10 особей откладывается до конца фазы и выполняется
+  в основном процессе.
+
+Внутри плитки порядок ходов случаен, а поток world.rng засевается сидом тикера,
+номером тика и номером плитки. Поэтому результат не зависит от числа
+процессов, но в целом отличается от последовательного тика: совпадение
+проверяется статистически (benchmarks/bench_tiled.py). Растения и животные
+ходят поэлементно, как в режимах plant_mode='entity' и animal_mode='entity'.
+
+Нужен запуск процессов через fork: рабочие процессы наследуют таблицы видов
+и групп мира, включая виды, созданные динамически.
+
+Пример:
+    with TiledTicker(world, workers=4):
+        for _ in range(ticks):
+            world.tick()
+            time_manager.advance_time()
+"""
+import multiprocessing
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from entities.group import Group
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Дальность хода сущности в клетках: шаг, действие с соседом и второй шаг
+HALO = 2
+
+# Массивы ArrayGrid, которые переносятся в разделяемую память
+SHARED_ARRAYS = ('species', 'hunger', 'group_id', 'active', 'growing', 'acted')
+
+
+def tile_seed(seed, tick, tile):
+    """Ключ потока world.rng для плитки: не зависит от того, какой процесс ее обрабатывает"""
+    return seed, tick, tile
+
+
+class TiledTicker:
+    def __init__(self, world, workers=None, tile_size=32, seed=0):
+        if not hasattr(world, 'species_table'):
+            raise ValueError("Tiled tick needs the 'arrays' backend")
+        if tile_size < 2 * HALO:
+            raise ValueError(f"Tile size must be at least {2 * HALO} cells")
+        if world.profiler is not None:
+            # Ходы идут в копиях мира рабочих процессов, обертки профилировщика их не видят
+            raise ValueError("Tiled tick cannot be combined with an attached TickProfiler")
+        self.world = world
+        self.workers = workers or os.cpu_count()
+        self.tile_size = tile_size
+        self.seed = seed
+        self.ticks = 0
+        columns = -(-world.width // tile_size)
+        rows = -(-world.height // tile_size)
+        # Плитки по цветам: цвет = четность x + 2 * четность y
+        self.colors = [[] for _ in range(4)]
+        for ty in range(rows):
+            for tx in range(columns):
+                self.colors[tx % 2 + 2 * (ty % 2)].append(ty * columns + tx)
+        self._columns = columns
+        self._memory = []
+        self._processes = []
+        self._connections = []
+        self._share_arrays()
+        self._start_workers()
+        world.tiler = self
+
+    # --- Разделяемая память и процессы ---
+
+    def _share_arrays(self):
+        for name in SHARED_ARRAYS:
+            array = getattr(self.world, name)
+            memory = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+            shared[...] = array
+            setattr(self.world, name, shared)
+            self._memory.append(memory)
+
+    def _start_workers(self):
+        context = multiprocessing.get_context('fork')
+        self._species_known = len(self.world.species_table)
+        for _ in range(self.workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker_loop, args=(self.world, self.tile_size, self._columns, child),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._connections.append(parent)
+
+    def _stop_workers(self):
+        for connection in self._connections:
+            connection.send(None)
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._processes, self._connections = [], []
+
+    def close(self):
+        """Останавливает процессы и возвращает миру собственные массивы"""
+        if self.world.tiler is not self:
+            return
+        self._stop_workers()
+        for name in SHARED_ARRAYS:
+            setattr(self.world, name, np.array(getattr(self.world, name)))
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+        self._memory = []
+        self.world.tiler = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Тик ---
+
+    def tick(self):
+        world = self.world
+        if len(world.species_table) != self._species_known:
+            # Появился новый вид: процессы должны унаследовать его описание заново
+            self._stop_workers()
+            self._start_workers()
+        phase = world.timer.current_phase
+        self.ticks += 1
+        world.acted.fill(False)
+        for k in range(4):
+            tiles = self.colors[(self.ticks + k) % 4]
+            if tiles:
+                self._run_color(tiles, phase)
+        # Изменения клеток в процессах не отслеживаются: отрисовка сравнит весь мир
+        world.dirty = None
+
+    def _run_color(self, tiles, phase):
+        world = self.world
+        sizes = np.array(world.group_sizes, dtype=np.int64)
+        aggression = np.array(world.group_aggression, dtype=np.int8)
+        for n, connection in enumerate(self._connections):
+            connection.send((self.seed, self.ticks, phase, tiles[n::self.workers], sizes, aggression))
+        results = [connection.recv() for connection in self._connections]
+
+        raised, lowered, splits = set(), set(), set()
+        for counts, hunger, growing, events, size_delta, tile_raised, tile_lowered, split_requests in results:
+            for code in range(1, len(counts)):
+                world.species_counts[code] += counts[code]
+                world.hunger_totals[code] += hunger[code]
+                world.growing_counts[code] += growing[code]
+            world.births += events[0]
+            world.deaths += events[1]
+            world.captures += events[2]
+            for gid, delta in size_delta.items():
+                world.group_sizes[gid] += delta
+            raised.update(tile_raised)
+            lowered.update(tile_lowered)
+            splits.update(split_requests)
+        for gid in lowered - raised:
+            world.group_aggression[gid] = world.groups[gid].aggression = 0
+        for gid in raised:
+            world.group_aggression[gid] = world.groups[gid].aggression = 1
+        world.queue_splits(splits)
+        world._split_groups()
+
+
+def _worker_loop(world, tile_size, columns, connection):
+    # Рабочий процесс не пишет лог: его обработчики принадлежат основному процессу
+    logger.disabled = True
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        connection.send(_run_tiles(world, tile_size, columns, *task))
+    connection.close()
+
+
+def _run_tiles(world, tile_size, columns, seed, tick, phase, tiles, sizes, aggression):
+    """
+    Ходы сущностей плиток tiles в копии мира рабочего процесса. Счетчики
+    копии обнуляются, поэтому после хода в них остаются приращения
+    """
+    size = len(world.species_table)
+    world.species_counts = [0] * size
+    world.hunger_totals = [0] * size
+    world.growing_counts = [0] * size
+    world.births = world.deaths = world.captures = 0
+    world.dirty = None
+    sizes, aggression = sizes.tolist(), aggression.tolist()
+    while len(world.groups) < len(sizes):
+        # Новые группы создает основной процесс; здесь нужны только места под их номера
+        world.groups.append(Group(-1))
+    split_requests = world._pending_splits = set()
+
+    size_delta, raised, lowered = {}, set(), set()
+    acting = world._acting_codes(phase)
+    for tile in tiles:
+        # Каждая плитка видит группы на начало фазы, поэтому результат не зависит
+        # от того, какие плитки достались процессу
+        world.group_sizes = list(sizes)
+        world.group_aggression = list(aggression)
+        x0, y0 = tile % columns * tile_size, tile // columns * tile_size
+        ys, xs = np.nonzero(acting[world.species[y0:y0 + tile_size, x0:x0 + tile_size]])
+        order = (ys + y0) * world.width + xs + x0
+        world.rng.seed(*tile_seed(seed, tick, tile))
+        world.rng.shuffle(order)
+        world._act_cells(order.tolist(), phase)
+
+        for gid, (new, old) in enumerate(zip(world.group_sizes, sizes)):
+            if new != old:
+                size_delta[gid] = size_delta.get(gid, 0) + new - old
+        for gid, (new, old) in enumerate(zip(world.group_aggression, aggression)):
+            if new != old:
+                (raised if new else lowered).add(gid)
+
+    events = (world.births, world.deaths, world.captures)
+    return (world.species_counts, world.hunger_totals, world.growing_counts, events,
+            size_delta, raised, lowered, split_requests)
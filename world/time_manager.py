@@ -1,12 +1,72 @@
+import types
+import weakref
+
+
 class TimeManager:
     def __init__(self, ticks_per_phase, phases=['morning', 'day', 'evening', 'night'], current_phase='morning', tick_counter=0):
-        self.current_phase = current_phase
+        self.phases = phases
+        # Номер текущей фазы в phases; current_phase - ее имя
+        self.phase_id = phases.index(current_phase)
         self.tick_counter = tick_counter
         self.ticks_per_phase = ticks_per_phase
-        self.phases = phases
+        # Подписчики на смену фазы; методы объектов хранятся по слабым ссылкам,
+        # чтобы таймер не удерживал выброшенные миры
+        self._listeners = []
+        # Таблицы поведения видов для текущей фазы: {класс вида: строка таблицы}.
+        # Строки строит метакласс вида (phase_row) и пересобирает при смене фазы
+        self.tables = {}
+
+    @property
+    def current_phase(self):
+        return self.phases[self.phase_id]
+
+    @current_phase.setter
+    def current_phase(self, phase):
+        self.set_phase(self.phases.index(phase))
+
+    def set_phase(self, phase_id):
+        """Переключает фазу по номеру; при смене пересобирает таблицы видов и оповещает подписчиков"""
+        if phase_id == self.phase_id:
+            return
+        self.phase_id = phase_id
+        phase = self.phases[phase_id]
+        self.tables = {cls: cls.phase_row(phase) for cls in self.tables}
+        self._notify()
+
+    def table(self, cls):
+        """Строка таблицы поведения вида cls в текущей фазе (строится при первом обращении)"""
+        row = self.tables.get(cls)
+        if row is None:
+            row = self.tables[cls] = cls.phase_row(self.current_phase)
+        return row
+
+    def __getstate__(self):
+        # Копия таймера (copy, pickle) начинает без подписчиков: слабые ссылки не копируются
+        state = self.__dict__.copy()
+        state['_listeners'] = []
+        return state
+
+    def subscribe(self, callback):
+        """Вызывает callback(phase) после каждой смены фазы"""
+        if isinstance(callback, types.MethodType):
+            self._listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._listeners.append(lambda: callback)
+
+    def unsubscribe(self, callback):
+        self._listeners = [ref for ref in self._listeners if ref() not in (None, callback)]
+
+    def _notify(self):
+        alive = []
+        for ref in self._listeners:
+            callback = ref()
+            if callback is not None:
+                alive.append(ref)
+                callback(self.current_phase)
+        self._listeners = alive
 
     def advance_time(self):
         self.tick_counter += 1
         if self.tick_counter >= self.ticks_per_phase:
             self.tick_counter = 0
-            self.current_phase = self.phases[(self.phases.index(self.current_phase) + 1) % len(self.phases)]
+            self.set_phase((self.phase_id + 1) % len(self.phases))